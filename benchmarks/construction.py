@@ -0,0 +1,79 @@
+"""
+Import and construction time of the client
+
+Run from the root of the repository:
+
+    $ python benchmarks/construction.py
+
+Creating the whole entity tree is what every VoipMs() did before the
+entities were attached lazily, it is measured as "construct + all endpoints".
+"""
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from voipms import VoipMs  # noqa: E402
+
+ENDPOINTS = {
+    "general": ("get",),
+    "accounts": ("add", "create", "delete", "get", "set"),
+    "calls": ("delete", "get", "send", "set"),
+    "clients": ("add", "assign", "get", "set"),
+    "dids": ("back_order", "cancel", "connect", "delete", "get", "order", "remove",
+             "search", "send", "set", "unconnect"),
+    "e911": (),
+    "fax": ("cancel", "connect", "delete", "get", "mail", "move", "order", "search",
+            "send", "set", "unconnect"),
+    "lnp": ("add", "get"),
+    "voicemail": ("create", "delete", "get", "mark", "move", "send", "set"),
+}
+
+
+def import_time(runs=10):
+    """
+    Median seconds of `import voipms` in a fresh interpreter, minus the interpreter start
+    """
+    def run(code):
+        times = []
+        for _ in range(runs):
+            started = timeit.default_timer()
+            subprocess.check_call([sys.executable, "-c", code], cwd=os.path.dirname(HERE))
+            times.append(timeit.default_timer() - started)
+        return statistics.median(times)
+    return run("import voipms") - run("pass")
+
+
+def construct():
+    return VoipMs("user", "password")
+
+
+def construct_all_endpoints():
+    client = VoipMs("user", "password")
+    for entity, children in ENDPOINTS.items():
+        parent = getattr(client, entity)
+        for child in children:
+            getattr(parent, child)
+    return client
+
+
+def construct_one_endpoint():
+    return VoipMs("user", "password").dids.send
+
+
+def main():
+    print("import voipms                  {:8.2f} ms".format(import_time() * 1000))
+    for name, function in (("construct", construct),
+                           ("construct + dids.send", construct_one_endpoint),
+                           ("construct + all endpoints", construct_all_endpoints)):
+        number = 2000
+        best = min(timeit.repeat(function, number=number, repeat=5)) / number
+        print("{:<29} {:8.2f} us".format(name, best * 1e6))
+
+
+if __name__ == "__main__":
+    main()
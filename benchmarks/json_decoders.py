@@ -0,0 +1,69 @@
+"""
+Decoding speed of the JSON decoders on CDR responses
+
+Run from the root of the repository:
+
+    $ python benchmarks/json_decoders.py [recorded_getCDR_response.json ...]
+
+Without arguments a getCDR response with 50000 records shaped like the ones
+returned by voip.ms is generated.
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from voipms.decoders import available_decoders, get_decoder  # noqa: E402
+
+
+def cdr_payload(records=50000, seed=1):
+    """
+    A getCDR response body as bytes
+    """
+    rng = random.Random(seed)
+    cdr = []
+    for n in range(records):
+        seconds = rng.randint(0, 3600)
+        cdr.append({
+            "date": "2024-01-{:02d} {:02d}:{:02d}:{:02d}".format(
+                n % 28 + 1, rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)),
+            "callerid": "\"John Smith\" <{}>".format(rng.randint(2000000000, 9999999999)),
+            "destination": str(rng.randint(2000000000, 9999999999)),
+            "description": rng.choice(["Inbound DID", "Outgoing Call", "Canada Long Distance"]),
+            "account": "100001_VoIP",
+            "disposition": rng.choice(["ANSWERED", "NO ANSWER", "BUSY", "FAILED"]),
+            "duration": "{:02d}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60),
+            "seconds": str(seconds),
+            "rate": "0.00900000",
+            "total": "{:.8f}".format(seconds * 0.009 / 60),
+            "uniqueid": str(10000000 + n),
+            "destination_type": rng.choice(["local", "national"]),
+        })
+    return json.dumps({"status": "success", "cdr": cdr}).encode()
+
+
+def main(paths):
+    if paths:
+        payloads = []
+        for path in paths:
+            with open(path, "rb") as payload:
+                payloads.append((os.path.basename(path), payload.read()))
+    else:
+        payloads = [("generated getCDR", cdr_payload())]
+
+    for label, payload in payloads:
+        print("{} ({:.1f} MB)".format(label, len(payload) / 1e6))
+        times = {}
+        for name in available_decoders():
+            loads = get_decoder(name)
+            times[name] = min(timeit.repeat(lambda: loads(payload), number=3, repeat=5)) / 3
+        for name, seconds in times.items():
+            print("    {:<8} {:8.1f} ms  {:4.1f}x json".format(name, seconds * 1000, times["json"] / seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
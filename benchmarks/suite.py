@@ -0,0 +1,351 @@
+"""
+Benchmarks of the hot paths, compared against a stored baseline
+
+Run from the root of the repository:
+
+    $ python benchmarks/suite.py                      # compare with benchmarks/baseline.json
+    $ python benchmarks/suite.py --quick              # CDR at 10k rows only, fewer repeats
+    $ python benchmarks/suite.py --output results.json
+    $ python benchmarks/suite.py --update-baseline    # or --quick --update-baseline
+
+Everything runs against a local voipms.mockserver.MockServer or an in
+process session, no voip.ms account is needed. Every result is the seconds
+per operation of the fastest repeat, lower is better.
+
+Seconds depend on the machine, so they are not what is compared. Before
+every repeat a fixed calibration loop runs, and a result is compared as its
+seconds divided by the seconds of the calibration, which is about the same
+on a fast and a slow machine. A result is a regression when it is slower
+than the baseline by more than --tolerance, or by more than NOISE_FACTOR
+times its spread between repeats when that is larger. The baseline keeps
+the --quick and the full runs apart, each run is only compared with a
+baseline of the same kind.
+
+Recorded responses (for example getCDR bodies saved from the live API) can
+be added to the decode benchmarks with --payload PATH.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import construction  # noqa: E402
+from voipms import VoipMs  # noqa: E402
+from voipms.cassette import Cassette  # noqa: E402
+from voipms.decoders import get_decoder  # noqa: E402
+from voipms.mockserver import MockServer  # noqa: E402
+from voipms.schema import schema_for  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+CDR_SIZES = (10000, 100000, 1000000)
+# A result slower than the baseline by less than this many times the spread
+# of its repeats is noise
+NOISE_FACTOR = 3
+
+
+class _Response(object):
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class StaticSession(object):
+    """
+    Answers every request with the same body without any I/O
+    """
+    def __init__(self, content):
+        self.response = _Response(content)
+
+    def request(self, method, url, **kwargs):
+        return self.response
+
+
+def calibrate():
+    """
+    A fixed amount of the work an API call does: dicts, URL encoding and JSON
+    """
+    body = {"status": "success", "balance": {"current_balance": "25.0000"}}
+    for n in range(200):
+        urlencode({"method": "getBalance", "api_username": "user", "n": n})
+        json.loads(json.dumps(body))
+
+
+def result(times, calibrations):
+    """
+    A result from the seconds of every repeat and of the calibrations run with them
+
+    :returns: :py:class:`dict` with the seconds of the fastest repeat, those
+              seconds relative to the fastest calibration and the spread,
+              how much slower than the fastest the median repeat is
+    """
+    best = min(times)
+    return {
+        "seconds": best,
+        "relative": best / min(calibrations),
+        "spread": (statistics.median(times) - best) / best if best > 0 else 0.0,
+    }
+
+
+def measure(function, number, repeat, per=1):
+    """
+    Seconds of one call of function, divided by per, in the fastest of repeat runs
+
+    The fastest run is the one least disturbed by the rest of the machine.
+    """
+    times, calibrations = [], []
+    for _ in range(repeat):
+        calibrations.append(timeit.timeit(calibrate, number=1))
+        times.append(timeit.timeit(function, number=number) / number / per)
+    return result(times, calibrations)
+
+
+def bench_get_overhead(repeat):
+    """
+    _get without the network: URL building, decoding and the status check
+    """
+    body = json.dumps({"status": "success", "balance": {"current_balance": "25.0000"}}).encode()
+    client = VoipMs("user", "password", session=StaticSession(body))
+    return {
+        "get.overhead": measure(client.general.get.balance, 5000, repeat),
+        "get.overhead+validation": measure(
+            lambda: client.dids.get.sms(date_from="2024-01-01", date_to="2024-01-31", limit=50),
+            5000, repeat),
+    }
+
+
+def bench_validation(repeat):
+    """
+    Schema validation of one setDIDInfo call
+    """
+    schema = schema_for("setDIDInfo")
+    parameters = {"did": 5551234567, "routing": "sys:echo", "pop": 3, "dialtime": 60,
+                  "cnam": True, "billing_type": 1, "note": "main line"}
+    return {"validate.setDIDInfo": measure(lambda: schema.validate(dict(parameters)), 10000, repeat)}
+
+
+def bench_mock_roundtrip(server, repeat):
+    """
+    A full API call over HTTP to the local mock server
+    """
+    client = server.client()
+    client.general.get.balance()
+    return {"get.roundtrip": measure(client.general.get.balance, 200, repeat)}
+
+
+def bench_replay(server, repeat):
+    """
+    An API call served from a cassette recorded against the mock server
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "replay.jsonl.gz")
+        with Cassette(path, mode="record") as cassette:
+            server.client(cassette=cassette).dids.get.dids_info()
+        client = VoipMs("user", "password", cassette=Cassette(path))
+        return {"get.replay": measure(client.dids.get.dids_info, 2000, repeat)}
+
+
+def bench_bulk(server, repeat, messages=500):
+    """
+    Seconds per message of bulk_sms and per DID of concurrent did_info updates
+    """
+    client = server.client()
+    dids = [int(row["did"]) for row in server.dataset.dids[:10]]
+    batch = [(dids[n % len(dids)], 5552000000 + n, "Message {}".format(n)) for n in range(messages)]
+
+    def bulk_sms():
+        for result in client.dids.send.bulk_sms(batch, max_workers=8, did_rate=1e6):
+            assert result["status"] == "success", result
+
+    rows = [{"did": dids[n % len(dids)], "routing": "sys:echo", "pop": 3, "dialtime": 60,
+             "cnam": False, "billing_type": 1} for n in range(messages)]
+
+    def bulk_did_info():
+        schema = schema_for("setDIDInfo")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            valid = [rows[index] for index, _, errors in schema.validate_rows(rows) if not errors]
+            list(executor.map(lambda row: client.dids.set.did_info(**row), valid))
+
+    return {
+        "bulk.sms": measure(bulk_sms, 1, repeat, per=messages),
+        "bulk.did_info": measure(bulk_did_info, 1, repeat, per=messages),
+    }
+
+
+def bench_cdr(sizes, repeat, payloads):
+    """
+    Fetch and decode getCDR responses of the given numbers of rows
+    """
+    results = {}
+    today = datetime.date.today()
+    date_from = str(today - datetime.timedelta(days=31))
+    for size in sizes:
+        with MockServer(size=size) as server:
+            client = server.client()
+            body = json.dumps(server.handlers["getCDR"]("getCDR", {
+                "answered": "1", "noanswer": "1", "busy": "1", "failed": "1"})).encode()
+            payloads.append(("cdr.{}".format(_label(size)), body))
+
+            def fetch():
+                client.calls.get.cdr(date_from, str(today), 0,
+                                     answered=True, noanswer=True, busy=True, failed=True)
+
+            def stream():
+                for _ in client.calls.get.iter_cdr(date_from, str(today), 0, chunk_days=31,
+                                                   answered=True, noanswer=True, busy=True, failed=True):
+                    pass
+
+            runs = max(1, repeat if size < 1000000 else 1)
+            results["cdr.fetch.{}".format(_label(size))] = measure(fetch, 1, runs)
+            results["cdr.stream.{}".format(_label(size))] = measure(stream, 1, runs)
+    return results
+
+
+def bench_decode(payloads, repeat):
+    loads = get_decoder()
+    return {"decode.{}".format(label): measure(lambda: loads(body), 1, repeat)
+            for label, body in payloads}
+
+
+def bench_import(repeat):
+    times, calibrations = [], []
+    for _ in range(3):
+        calibrations.append(timeit.timeit(calibrate, number=1))
+        times.append(construction.import_time(runs=repeat))
+    return result(times, calibrations)
+
+
+def bench_construction(repeat):
+    return {
+        "import": bench_import(repeat),
+        "construct": measure(construction.construct, 2000, repeat),
+        "construct.all_endpoints": measure(construction.construct_all_endpoints, 500, repeat),
+    }
+
+
+def _label(size):
+    return "{}k".format(size // 1000) if size < 1000000 else "{}m".format(size // 1000000)
+
+
+def run(sizes, repeat, payload_paths):
+    payloads = []
+    for path in payload_paths:
+        with open(path, "rb") as payload:
+            payloads.append((os.path.basename(path), payload.read()))
+    results = {}
+    results.update(bench_get_overhead(repeat))
+    results.update(bench_validation(repeat))
+    with MockServer(size=100) as server:
+        results.update(bench_mock_roundtrip(server, repeat))
+        results.update(bench_replay(server, repeat))
+        results.update(bench_bulk(server, repeat))
+    results.update(bench_cdr(sizes, repeat, payloads))
+    results.update(bench_decode(payloads, repeat))
+    results.update(bench_construction(repeat))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print every result next to its baseline
+
+    :returns: Names of the results slower than the baseline beyond their tolerance
+    """
+    regressions = []
+    for name, measured in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            print("{:<28} {:>12}".format(name, _format(measured["seconds"])))
+            continue
+        ratio = measured["relative"] / reference["relative"]
+        allowed = max(tolerance, NOISE_FACTOR * max(measured["spread"], reference["spread"]))
+        flag = ""
+        if ratio > 1 + allowed:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("{:<28} {:>12} {:>12} {:6.2f}x  +{:>4.0%}{}".format(
+            name, _format(measured["seconds"]), _format(reference["seconds"]), ratio, allowed, flag))
+    return regressions
+
+
+def _format(seconds):
+    if seconds >= 1:
+        return "{:.2f} s".format(seconds)
+    if seconds >= 1e-3:
+        return "{:.2f} ms".format(seconds * 1e3)
+    return "{:.2f} us".format(seconds * 1e6)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the voipms client against a local mock server")
+    parser.add_argument("--quick", action="store_true", help="CDR at 10k rows only and fewer repeats")
+    parser.add_argument("--sizes", help="Comma separated CDR sizes (Default: 10000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, help="Repeats per benchmark, the fastest is kept (Default: 5, 3 with --quick)")
+    parser.add_argument("--payload", action="append", default=[], help="Recorded response body to decode")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline to compare with (Default: benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, more for results which vary more (Default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store the results as the new baseline of this mode, --quick or full")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = CDR_SIZES[:1] if args.quick else CDR_SIZES
+    repeat = args.repeat or (3 if args.quick else 5)
+
+    report = run(sizes, repeat, args.payload)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    mode = "quick" if args.quick else "full"
+    stored = {"modes": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            stored = json.load(baseline_file)
+    baseline = stored["modes"].get(mode)
+
+    if args.update_baseline:
+        if baseline is not None:
+            report["results"] = dict(baseline["results"], **report["results"])
+        stored["modes"][mode] = report
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(stored, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        compare(report["results"], {}, args.tolerance)
+        print("{} baseline written to {}".format(mode, args.baseline))
+        return 0
+
+    if baseline is None:
+        print("no {} baseline in {}, run with --update-baseline to record one".format(mode, args.baseline))
+    regressions = compare(report["results"], baseline["results"] if baseline else {}, args.tolerance)
+    if regressions:
+        print("{} regression(s): {}".format(len(regressions), " ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
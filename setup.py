@@ -15,16 +15,30 @@ CLASSIFIERS = [
     'Intended Audience :: Developers',
     'Topic :: Software Development :: Libraries :: Python Modules',
     'License :: OSI Approved :: MIT License',
-    'Programming Language :: Python :: 2.7',
-    'Programming Language :: Python :: 3.4',
-    'Programming Language :: Python :: 3.5',
-    'Programming Language :: Python :: 3.6',
+    'Programming Language :: Python :: 3',
+    'Programming Language :: Python :: 3 :: Only',
     'Programming Language :: Python :: 3.7',
+    'Programming Language :: Python :: 3.8',
+    'Programming Language :: Python :: 3.9',
+    'Programming Language :: Python :: 3.10',
+    'Programming Language :: Python :: 3.11',
 ]
+PYTHON_REQUIRES = '>=3.7'
 INSTALL_REQUIRES = [
     'requests>=2.7.0',
     'validators>=0.21.2',
 ]
+ENTRY_POINTS = {
+    'console_scripts': ['voipms-cache=voipms.cache:main',
+                        'voipms-mockserver=voipms.mockserver:main'],
+}
+EXTRAS_REQUIRE = {
+    'async': ['aiohttp>=3.7'],
+    'streaming': ['ijson>=3.1'],
+    'fast': ['orjson>=3.0'],
+    'columnar': ['numpy>=1.17'],
+    'tracing': ['opentelemetry-api>=1.0'],
+}
 
 ###################################################################
 
@@ -73,5 +87,8 @@ if __name__ == "__main__":
         packages=PACKAGES,
         zip_safe=False,
         classifiers=CLASSIFIERS,
+        python_requires=PYTHON_REQUIRES,
         install_requires=INSTALL_REQUIRES,
+        extras_require=EXTRAS_REQUIRE,
+        entry_points=ENTRY_POINTS,
     )
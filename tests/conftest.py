@@ -0,0 +1,31 @@
+"""
+Run the tests against a local MockServer unless voip.ms credentials are set
+
+With VOIPMS_USERNAME and VOIPMS_PASSWORD in the environment the tests using
+them talk to the live API, as before.
+"""
+import os
+
+from voipms.mockserver import MockServer
+
+_server = None
+
+
+def pytest_configure(config):
+    global _server
+    if "VOIPMS_USERNAME" in os.environ:
+        return
+    _server = MockServer().start()
+    os.environ["VOIPMS_USERNAME"] = _server.voip_user
+    os.environ["VOIPMS_PASSWORD"] = _server.voip_api_password
+    os.environ["VOIPMS_API_URL"] = _server.url
+
+
+def pytest_unconfigure(config):
+    global _server
+    if _server is None:
+        return
+    _server.stop()
+    _server = None
+    for name in ("VOIPMS_USERNAME", "VOIPMS_PASSWORD", "VOIPMS_API_URL"):
+        os.environ.pop(name, None)
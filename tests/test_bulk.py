@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.checkpoint import SendCheckpoint
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class SmsSendSession(FakeSession):
+    """
+    Answers sendSMS with an increasing SMS id, Destination Number 1 is refused
+    and Destination Number 2 times out
+    """
+    def __init__(self):
+        super(SmsSendSession, self).__init__()
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        query = parse_qs(urlsplit(url).query)
+        dst = query["dst"][0]
+        if dst == "1":
+            return FakeResponse({"status": "invalid_dst"})
+        if dst == "2":
+            raise requests.exceptions.ReadTimeout("timed out")
+        self.sent.append((query["did"][0], dst, query["message"][0]))
+        return FakeResponse({"status": "success", "sms": len(self.sent)})
+
+
+class TestBulkSms:
+
+    def test_bulk_sms(self):
+        session = SmsSendSession()
+        client = VoipMs("user", "password", session=session)
+        messages = [(5551234567, 5550000000 + n, "hello {}".format(n)) for n in range(10)]
+        results = sorted(client.dids.send.bulk_sms(messages, max_workers=3, did_rate=1000),
+                         key=lambda result: result["index"])
+        assert [result["status"] for result in results] == ["success"] * 10
+        assert sorted(sms for result in results for sms in result["sms"]) == list(range(1, 11))
+        assert len(session.sent) == 10
+
+    def test_bulk_sms_splits_long_messages(self):
+        session = SmsSendSession()
+        client = VoipMs("user", "password", session=session)
+        message = " ".join(["word"] * 50)
+        result, = client.dids.send.bulk_sms([(5551234567, 5550000000, message)], did_rate=1000)
+        assert result["parts"] == 2
+        assert result["sms"] == [1, 2]
+        assert " ".join(sent[2] for sent in session.sent) == message
+
+    def test_bulk_sms_errors(self):
+        client = VoipMs("user", "password", session=SmsSendSession())
+        messages = [(5551234567, 1, "refused"), (5551234567, 2, "timeout"), ("5551234567", 3, "bad")]
+        results = {result["index"]: result for result in client.dids.send.bulk_sms(messages, did_rate=1000)}
+        assert results[0]["status"] == "invalid_dst"
+        assert results[1]["status"] == "error"
+        assert results[2]["status"] == "invalid"
+
+    def test_bulk_sms_resumes_from_checkpoint(self, tmp_path):
+        path = str(tmp_path / "campaign.jsonl")
+        with SendCheckpoint(path) as checkpoint:
+            checkpoint.begin(0, 0)
+            checkpoint.finish(0, 0, "sent", 7)
+            checkpoint.begin(1, 0)
+            checkpoint.begin(2, 0)
+            checkpoint.finish(2, 0, "failed")
+
+        session = SmsSendSession()
+        client = VoipMs("user", "password", session=session)
+        messages = [(5551234567, 5550000000 + n, "hello") for n in range(4)]
+        results = {result["index"]: result for result in
+                   client.dids.send.bulk_sms(messages, did_rate=1000, checkpoint=path)}
+        assert results[0]["sms"] == [7]
+        assert results[1]["status"] == "unconfirmed"
+        assert results[2]["status"] == results[3]["status"] == "success"
+        assert sorted(sent[1] for sent in session.sent) == ["5550000002", "5550000003"]
+
+        with open(path) as journal:
+            states = [json.loads(line)["state"] for line in journal]
+        assert states.count("sent") == 3
+
+    def test_bulk_sms_opens_checkpoint_lazily(self, tmp_path):
+        path = tmp_path / "campaign.jsonl"
+        client = VoipMs("user", "password", session=SmsSendSession())
+        results = client.dids.send.bulk_sms([(5551234567, 5550000000, "hello")], checkpoint=str(path))
+        assert not path.exists()
+        assert [result["status"] for result in results] == ["success"]
+        assert path.exists()
+
+    def test_bulk_sms_fails_parts_refused_before_sending(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "campaign.jsonl")
+        client = VoipMs("user", "password", session=SmsSendSession())
+
+        def refuse(did, dst, message):
+            raise ValueError("refused")
+
+        monkeypatch.setattr(client.dids.send, "sms", refuse)
+        result, = client.dids.send.bulk_sms([(5551234567, 5550000000, "hello")], checkpoint=path)
+        assert result["status"] == "invalid"
+        assert SendCheckpoint(path).state(0, 0) == ("failed", None)
+
+    def test_bulk_sms_async_checkpoint(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        threads = set()
+        write = SendCheckpoint._write
+
+        def record_thread(self, *args):
+            threads.add(threading.current_thread())
+            write(self, *args)
+
+        monkeypatch.setattr(SendCheckpoint, "_write", record_thread)
+        path = str(tmp_path / "campaign.jsonl")
+        client = AsyncVoipMs("user", "password", session=SmsSendSession())
+        messages = [(5551234567, 5550000000 + n, "hello") for n in range(3)]
+
+        async def run():
+            return [result async for result in
+                    client.dids.send.bulk_sms(messages, did_rate=1000, checkpoint=path)]
+
+        results = asyncio.run(run())
+        assert [result["status"] for result in results] == ["success"] * 3
+        assert threads and threading.main_thread() not in threads
+        with open(path) as journal:
+            states = [json.loads(line)["state"] for line in journal]
+        assert states.count("sent") == 3
+
+    def test_bulk_sms_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = SmsSendSession()
+        client = AsyncVoipMs("user", "password", session=session)
+        messages = [(5551234567 + n % 2, 5550000000 + n, "hello") for n in range(6)]
+
+        async def run():
+            return [result async for result in client.dids.send.bulk_sms(messages, did_rate=1000)]
+
+        results = asyncio.run(run())
+        assert sorted(result["index"] for result in results) == list(range(6))
+        assert len(session.sent) == 6
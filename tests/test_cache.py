@@ -0,0 +1,136 @@
+import multiprocessing
+import time
+
+from voipms import ResponseCache, SQLiteResponseCache, VoipMs
+from voipms.cache import MISSING, main
+
+from test_voipmsclient import FakeSession
+
+
+class TestResponseCache:
+
+    def test_reference_data_is_cached(self):
+        session = FakeSession({"status": "success", "states": [{"state": "CO"}]})
+        cache = ResponseCache()
+        client = VoipMs("user", "password", session=session, cache=cache)
+        first = client.dids.get.states()
+        first["states"].append({"state": "XX"})
+        assert client.dids.get.states() == {"status": "success", "states": [{"state": "CO"}]}
+        assert len(session.urls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_other_methods_are_not_cached(self):
+        session = FakeSession()
+        client = VoipMs("user", "password", session=session, cache=ResponseCache())
+        client.general.get.balance()
+        client.general.get.balance()
+        assert len(session.urls) == 2
+
+    def test_parameters_are_part_of_the_key(self):
+        session = FakeSession()
+        client = VoipMs("user", "password", session=session, cache=ResponseCache())
+        client.dids.get.rate_centers_usa("CO")
+        client.dids.get.rate_centers_usa("CO")
+        client.dids.get.rate_centers_usa("NY")
+        assert len(session.urls) == 2
+
+    def test_expiry_and_lru(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("voipms.cache.time.monotonic", lambda: now[0])
+        cache = ResponseCache(ttls={"getStates": 10, "getProvinces": 10}, maxsize=1)
+        cache.set("getStates", None, {"status": "success"})
+        assert cache.get("getStates") == {"status": "success"}
+        now[0] += 11
+        assert cache.get("getStates") is MISSING
+        cache.set("getStates", None, {"status": "success"})
+        cache.set("getProvinces", None, {"status": "success"})
+        assert cache.get("getStates") is MISSING
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["expired"] == 1
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.set("getRateCentersUSA", {"state": "CO"}, {"status": "success"})
+        cache.set("getRateCentersUSA", {"state": "NY"}, {"status": "success"})
+        cache.set("getStates", None, {"status": "success"})
+        cache.invalidate("getRateCentersUSA", {"state": "CO"})
+        assert cache.stats()["size"] == 2
+        cache.invalidate("getRateCentersUSA")
+        assert cache.stats()["size"] == 1
+        cache.invalidate()
+        assert cache.stats()["size"] == 0
+
+
+
+def fill_cache(path, state):
+    SQLiteResponseCache(path).set("getRateCentersUSA", {"state": state},
+                                  {"status": "success", "state": state})
+
+
+class TestSQLiteResponseCache:
+
+    def test_shared_between_clients(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        session = FakeSession({"status": "success", "servers": []})
+        VoipMs("user", "password", session=session,
+               cache=SQLiteResponseCache(path)).general.get.servers_info()
+        cache = SQLiteResponseCache(path)
+        VoipMs("user", "password", session=session,
+               cache=cache).general.get.servers_info()
+        assert len(session.urls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        SQLiteResponseCache(path)
+        processes = [multiprocessing.Process(target=fill_cache, args=(path, state))
+                     for state in ("CO", "NY", "TX", "WA")]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        cache = SQLiteResponseCache(path)
+        assert cache.stats()["size"] == 4
+        assert cache.get("getRateCentersUSA", {"state": "TX"})["state"] == "TX"
+
+    def test_eviction(self, tmp_path):
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"), maxsize=2)
+        for state in ("CO", "NY", "TX"):
+            cache.set("getRateCentersUSA", {"state": state}, {"status": "success"})
+        assert cache.get("getRateCentersUSA", {"state": "CO"}) is MISSING
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_max_bytes(self, tmp_path):
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=150)
+        for state in ("CO", "NY", "TX", "WA"):
+            cache.set("getRateCentersUSA", {"state": state}, {"status": "success", "data": "x" * 30})
+        cache.set("getRateCentersUSA", {"state": "WA"}, {"status": "success", "data": "x" * 30})
+        assert [entry["parameters"] for entry in cache.entries()] == ["state=TX", "state=WA"]
+        assert cache.stats()["bytes"] == sum(entry["size"] for entry in cache.entries())
+        assert cache.stats()["evictions"] == 2
+
+    def test_hits_touch_rarely(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "cache.sqlite")
+        cache = SQLiteResponseCache(path, touch_interval=60)
+        now = [1000.0]
+        monkeypatch.setattr(time, "time", lambda: now[0])
+        cache.set("getStates", None, {"status": "success"})
+        now[0] += 30
+        cache.get("getStates")
+        assert cache.entries()[0]["accessed"] == 1000.0
+        now[0] += 30
+        cache.get("getStates")
+        assert cache.entries()[0]["accessed"] == 1060.0
+
+    def test_cli(self, tmp_path, capsys):
+        path = str(tmp_path / "cache.sqlite")
+        cache = SQLiteResponseCache(path)
+        cache.set("getStates", None, {"status": "success"})
+        cache.set("getProvinces", None, {"status": "success"})
+        main([path, "list"])
+        assert "getStates" in capsys.readouterr().out
+        main([path, "purge", "--method", "getStates"])
+        assert "purged 1 responses" in capsys.readouterr().out
+        assert cache.stats()["size"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import datetime
+import types
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.helpers import VoipMsError
+from voipms.mockserver import MockServer
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class CdrSession(FakeSession):
+    """
+    Answers getCDR with one call per day, except on the 2nd of the month
+    """
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        query = parse_qs(urlsplit(url).query)
+        day_from = int(query["date_from"][0][-2:])
+        day_to = int(query["date_to"][0][-2:])
+        records = [{"date": "2024-01-{:02d} 10:00:00".format(day), "callerid": str(day)}
+                   for day in reversed(range(day_from, day_to + 1)) if day != 2]
+        if not records:
+            return FakeResponse({"status": "no_cdr"})
+        return FakeResponse({"status": "success", "cdr": records})
+
+
+class TestCallsGet:
+
+    def test_cdr_chunks(self):
+        session = CdrSession()
+        client = VoipMs("user", "password", session=session)
+        result = client.calls.get.cdr("2024-01-01", "2024-01-10", -5,
+                                      answered=True, chunk_days=3, max_workers=2)
+        assert len(session.urls) == 4
+        # The same order as the API without chunk_days, newest first
+        assert [record["callerid"] for record in result["cdr"]] == \
+            ["10", "9", "8", "7", "6", "5", "4", "3", "1"]
+        unchunked = client.calls.get.cdr("2024-01-01", "2024-01-10", -5, answered=True)
+        assert result["cdr"] == unchunked["cdr"]
+        assert all("answered=1" in url and "timezone=-5" in url for url in session.urls)
+
+    def test_reseller_cdr_chunks(self):
+        session = CdrSession()
+        client = VoipMs("user", "password", session=session)
+        result = client.calls.get.reseller_cdr("2024-01-01", "2024-01-03", 561115, -5,
+                                               failed=True, chunk_days=1)
+        assert len(result["cdr"]) == 2
+        assert all("client=561115" in url for url in session.urls)
+
+    def test_no_cdr_in_any_window(self):
+        client = VoipMs("user", "password", session=CdrSession())
+        with pytest.raises(VoipMsError) as e:
+            client.calls.get.cdr("2024-01-02", "2024-01-02", 0, busy=True, chunk_days=1)
+        assert e.value.status == "no_cdr"
+
+    def test_cdr_chunks_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = CdrSession()
+        client = AsyncVoipMs("user", "password", session=session)
+        result = asyncio.run(client.calls.get.cdr("2024-01-01", "2024-01-05", 0,
+                                                  answered=True, chunk_days=2))
+        assert len(session.urls) == 3
+        assert len(result["cdr"]) == 4
+
+    def test_iter_cdr(self):
+        session = CdrSession()
+        client = VoipMs("user", "password", session=session)
+        records = client.calls.get.iter_cdr("2024-01-01", "2024-01-04", 0, answered=True)
+        assert isinstance(records, types.GeneratorType)
+        assert session.urls == []
+        assert next(records)["callerid"] == "1"
+        assert len(session.urls) == 1
+        assert [record["callerid"] for record in records] == ["3", "4"]
+        assert len(session.urls) == 4
+
+    def test_iter_cdr_validates_eagerly(self):
+        client = VoipMs("user", "password", session=CdrSession())
+        with pytest.raises(ValueError):
+            client.calls.get.iter_reseller_cdr("2024-01-01", "2024-01-04", 561115, 0)
+
+    def test_iter_cdr_raises_api_errors(self):
+        session = FakeSession({"status": "invalid_credentials"})
+        client = VoipMs("user", "password", session=session)
+        with pytest.raises(VoipMsError):
+            list(client.calls.get.iter_cdr("2024-01-01", "2024-01-01", 0, answered=True))
+
+    def test_iter_reseller_cdr_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        client = AsyncVoipMs("user", "password", session=CdrSession())
+
+        async def run():
+            return [record async for record in client.calls.get.iter_reseller_cdr(
+                "2024-01-01", "2024-01-03", 561115, 0, answered=True)]
+
+        assert len(asyncio.run(run())) == 2
+
+    def test_iter_cdr_nested_calls_async(self):
+        with MockServer(size=20) as server:
+            client = server.client(AsyncVoipMs, max_concurrency=1)
+            today = datetime.date.today()
+
+            async def run():
+                balances = []
+                async with client:
+                    async for record in client.calls.get.iter_cdr(
+                            str(today - datetime.timedelta(days=31)), str(today), 0, answered=True):
+                        balances.append(await client.general.get.balance())
+                return balances
+
+            balances = asyncio.run(asyncio.wait_for(run(), 10))
+        assert balances and all(balance["status"] == "success" for balance in balances)
+
@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.cassette import Cassette, CassetteMiss
+from voipms.helpers import VoipMsError
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class SequenceSession(FakeSession):
+    """
+    Answers with the given responses one after the other
+    """
+    def __init__(self, *responses):
+        super(SequenceSession, self).__init__()
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(self.responses.pop(0))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "calls.jsonl.gz")
+
+
+class TestCassette:
+
+    def test_record_and_replay(self, path):
+        session = SequenceSession(
+            {"status": "success", "balance": {"current_balance": "1.0000"}},
+            {"status": "success", "balance": {"current_balance": "0.5000"}},
+            {"status": "invalid_did"},
+        )
+        with Cassette(path, mode="record") as cassette:
+            client = VoipMs("api@example.com", "hunter2", session=session, cassette=cassette)
+            client.general.get.balance()
+            client.general.get.balance()
+            with pytest.raises(VoipMsError):
+                client.dids.get.dids_info(did=5551234567)
+        assert len(session.urls) == 3
+
+        client = VoipMs("other@example.com", "password", session=FakeSession(),
+                        cassette=Cassette(path))
+        assert client.general.get.balance()["balance"]["current_balance"] == "1.0000"
+        assert client.general.get.balance()["balance"]["current_balance"] == "0.5000"
+        assert client.general.get.balance()["balance"]["current_balance"] == "0.5000"
+        with pytest.raises(VoipMsError) as e:
+            client.dids.get.dids_info(did=5551234567)
+        assert e.value.status == "invalid_did"
+        with pytest.raises(CassetteMiss):
+            client.dids.get.dids_info(did=5557654321)
+        assert client.session.urls == []
+
+    def test_credentials_are_scrubbed(self, path):
+        session = SequenceSession(
+            {"status": "success", "accounts": [{"account": "100000_VoIP", "password": "subpass"}]},
+            {"status": "success", "account": "100000_new"},
+        )
+        with Cassette(path, mode="record") as cassette:
+            client = VoipMs("api@example.com", "hunter2", session=session, cassette=cassette)
+            client.accounts.get.sub_accounts()
+            client._post("createSubAccount", {"username": "new", "password": "subpass2",
+                                              "description": "for api@example.com"})
+        with gzip.open(path, "rt") as cassette:
+            content = cassette.read()
+        for secret in ("api@example.com", "hunter2", "subpass"):
+            assert secret not in content
+        assert '"http_method": "POST"' in content
+
+        client = VoipMs("api@example.com", "hunter2", session=FakeSession(), cassette=Cassette(path))
+        assert client.accounts.get.sub_accounts()["accounts"][0]["password"] == "[scrubbed]"
+        assert client._post("createSubAccount", {"username": "new", "password": "other",
+                                                 "description": "for api@example.com"})["account"] == "100000_new"
+
+    def test_replay_with_other_credentials(self, path):
+        session = SequenceSession({"status": "success", "accounts": [{"account": "100000_user"}]})
+        with Cassette(path, mode="record") as cassette:
+            client = VoipMs("api@example.com", "hunter2", session=session, cassette=cassette)
+            client.accounts.get.sub_accounts(account="100000_user")
+
+        # The parameters are not scrubbed with the credentials of the replaying client
+        client = VoipMs("user", "password", session=FakeSession(), cassette=Cassette(path))
+        response = client.accounts.get.sub_accounts(account="100000_user")
+        assert response["accounts"][0]["account"] == "100000_user"
+
+    def test_replay_async_and_iter(self, path, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = SequenceSession({"status": "success", "cdr": [{"callerid": "1"}, {"callerid": "2"}]})
+        with Cassette(path, mode="record") as cassette:
+            client = VoipMs("user", "password", session=session, cassette=cassette)
+            rows = list(client.calls.get.iter_cdr("2024-01-01", "2024-01-01", 0, answered=True))
+        assert len(rows) == 2
+
+        client = AsyncVoipMs("user", "password", session=FakeSession(), cassette=Cassette(path))
+
+        async def run():
+            return [row async for row in client.calls.get.iter_cdr(
+                "2024-01-01", "2024-01-01", 0, answered=True)]
+
+        assert asyncio.run(run()) == rows
+
+    def test_replay_speed(self, path):
+        session = SequenceSession({"status": "success", "balance": {"current_balance": "1.0000"}})
+        with Cassette(path, mode="record") as cassette:
+            VoipMs("user", "password", session=session, cassette=cassette).general.get.balance()
+        client = VoipMs("user", "password", cassette=Cassette(path))
+        started = time.monotonic()
+        for _ in range(2000):
+            client.general.get.balance()
+        assert time.monotonic() - started < 1
+
+    def test_mode(self, path):
+        with pytest.raises(ValueError):
+            Cassette(path, mode="rewind")
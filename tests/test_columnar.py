@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+
+from test_callsget import CdrSession
+from test_voipmsclient import FakeSession
+
+numpy = pytest.importorskip("numpy")
+
+ROWS = [
+    {"date": "2024-01-31 10:05:00", "account": "100000_VoIP", "description": "Inbound DID",
+     "disposition": "ANSWERED", "duration": "00:01:03", "seconds": "63",
+     "rate": "0.01000000", "total": "0.01050000"},
+    {"date": "2024-01-31 11:00:00", "account": "100000_Office", "description": "Outgoing to Canada",
+     "disposition": "ANSWERED", "duration": "00:02:00", "seconds": "120",
+     "rate": "0.00900000", "total": "0.01800000"},
+    {"date": "2024-01-31 12:00:00", "account": "100000_VoIP", "description": "Outgoing to Canada",
+     "disposition": "BUSY", "duration": "00:00:00", "seconds": "0",
+     "rate": "0.00900000", "total": "0"},
+]
+
+
+class TestColumnar:
+
+    def test_columns(self):
+        client = VoipMs("user", "password", session=FakeSession({"status": "success", "cdr": ROWS}))
+        columns = client.calls.get.cdr("2024-01-31", "2024-01-31", 0, answered=True, columnar=True)
+        assert len(columns) == 3
+        assert columns.date.dtype == numpy.dtype("datetime64[s]")
+        assert columns.duration.tolist() == [63, 120, 0]
+        assert columns.seconds.dtype == numpy.int64
+        assert columns["total"].sum() == pytest.approx(0.0285)
+        assert list(columns.account.categories) == ["100000_Office", "100000_VoIP"]
+        assert columns.account.codes.tolist() == [1, 0, 1]
+        assert columns.disposition.values().tolist() == ["ANSWERED", "ANSWERED", "BUSY"]
+
+    def test_group_totals(self):
+        client = VoipMs("user", "password", session=FakeSession({"status": "success", "cdr": ROWS}))
+        columns = client.calls.get.cdr("2024-01-31", "2024-01-31", 0, answered=True, columnar=True)
+        per_account = columns.totals_per_account()
+        assert per_account["100000_VoIP"]["calls"] == 2
+        assert per_account["100000_VoIP"]["seconds"] == 63
+        assert per_account["100000_VoIP"]["total"] == pytest.approx(0.0105)
+        assert columns.totals_per_calltype()["Outgoing to Canada"]["seconds"] == 120
+        with pytest.raises(ValueError):
+            columns.group_totals("uniqueid")
+
+    def test_columnar_and_records_exclusive(self):
+        client = VoipMs("user", "password", session=FakeSession({"status": "success", "cdr": ROWS}))
+        with pytest.raises(ValueError):
+            client.calls.get.cdr("2024-01-31", "2024-01-31", 0, answered=True,
+                                 columnar=True, records=True)
+
+    def test_columnar_chunks_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        client = AsyncVoipMs("user", "password", session=CdrSession())
+        columns = asyncio.run(client.calls.get.reseller_cdr(
+            "2024-01-01", "2024-01-04", 561115, 0, answered=True, chunk_days=2, columnar=True))
+        assert columns.callerid.tolist() == ["4", "3", "1"]
+        assert numpy.all(columns.date[:-1] >= columns.date[1:])
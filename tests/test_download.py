@@ -0,0 +1,189 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import random
+import tracemalloc
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.cassette import Cassette
+from voipms.download import Base64Extractor
+from voipms.helpers import VoipMsError
+from voipms.mockserver import MockServer
+
+from test_voipmsclient import FakeSession
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer(file_size=200000) as server:
+        yield server
+
+
+class StreamResponse(object):
+    """
+    A getRecordingFile response generated while it is read
+    """
+    status_code = 200
+    CHUNK = 48 * 1024
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        yield b'{"status": "success", "recording": {"data": "'
+        for _ in range(self.chunks):
+            yield base64.b64encode(os.urandom(self.CHUNK)).replace(b"/", b"\\/")
+        yield b'"}}'
+
+    def close(self):
+        pass
+
+
+class StreamSession(object):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def request(self, method, url, **kwargs):
+        return StreamResponse(self.chunks)
+
+
+class TestBase64Extractor:
+
+    def test_random_chunks(self):
+        rng = random.Random(7)
+        for _ in range(100):
+            content = os.urandom(rng.randint(0, 3000))
+            encoded = base64.b64encode(content).decode()
+            if rng.random() < 0.5:
+                encoded = "\r\n".join(encoded[index:index + 76] for index in range(0, len(encoded), 76))
+            document = {"status": "success", "note": 'say "hi" \\', "recording": [{"data": encoded}]}
+            # PHP escapes every slash
+            body = json.dumps(document).replace("/", "\\/").encode()
+            output = io.BytesIO()
+            extractor = Base64Extractor(("data",), output.write, lambda status: None)
+            position = 0
+            while position < len(body):
+                size = rng.randint(1, 40)
+                extractor.feed(body[position:position + size])
+                position += size
+            assert extractor.close() == len(content)
+            assert output.getvalue() == content
+
+    def test_status(self):
+        def check(status):
+            if status != "success":
+                raise VoipMsError(status)
+
+        extractor = Base64Extractor(("data",), io.BytesIO().write, check)
+        extractor.feed(b'{"status": "no_recording"}')
+        with pytest.raises(VoipMsError):
+            extractor.close()
+
+        extractor = Base64Extractor(("data",), io.BytesIO().write, check)
+        extractor.feed(b'{"status": "success"}')
+        with pytest.raises(ValueError):
+            extractor.close()
+
+
+class TestDownload:
+
+    def test_to_path(self, server, tmp_path):
+        client = server.client()
+        path = tmp_path / "fax.pdf"
+        written = client.fax.get.download_fax_message_pdf_to(12, path)
+        expected = base64.b64decode(client.fax.get.fax_message_pdf(12)["message_base64"])
+        assert written == len(expected) == server.file_size
+        assert path.read_bytes() == expected
+        assert os.listdir(tmp_path) == ["fax.pdf"]
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_file_mode(self, server, tmp_path):
+        client = server.client()
+        umask = os.umask(0o022)
+        try:
+            client.fax.get.download_fax_message_pdf_to(12, tmp_path / "new.pdf")
+        finally:
+            os.umask(umask)
+        assert (tmp_path / "new.pdf").stat().st_mode & 0o777 == 0o644
+
+        path = tmp_path / "shared.pdf"
+        path.write_bytes(b"old")
+        path.chmod(0o664)
+        client.fax.get.download_fax_message_pdf_to(12, path)
+        assert path.stat().st_mode & 0o777 == 0o664
+
+    def test_endpoints(self, server):
+        client = server.client()
+        downloads = [
+            (client.voicemail.get.download_voicemail_message_file_to, (1001, "INBOX", 1)),
+            (client.calls.get.download_recording_to, (100000, "3b6c3a")),
+            (client.dids.get.download_recording_file_to, (7567,)),
+            (client.general.get.download_conference_recording_file_to, (5356, 1543338379)),
+        ]
+        for download, arguments in downloads:
+            output = io.BytesIO()
+            assert download(*(arguments + (output,))) == server.file_size
+
+    def test_failure_keeps_file(self, server, tmp_path):
+        path = tmp_path / "fax.pdf"
+        path.write_bytes(b"old")
+        server.fail("no_message", "getFaxMessagePDF")
+        with pytest.raises(VoipMsError):
+            server.client().fax.get.download_fax_message_pdf_to(12, path)
+        assert path.read_bytes() == b"old"
+        assert os.listdir(tmp_path) == ["fax.pdf"]
+
+        output = io.BytesIO(b"header")
+        output.seek(0, io.SEEK_END)
+        server.fail("no_message", "getFaxMessagePDF")
+        with pytest.raises(VoipMsError):
+            server.client().fax.get.download_fax_message_pdf_to(12, output)
+        assert output.getvalue() == b"header"
+
+    def test_peak_memory(self, tmp_path):
+        session = StreamSession(chunks=256)
+        client = VoipMs("user", "password", session=session)
+        tracemalloc.start()
+        try:
+            written = client.dids.get.download_recording_file_to(7567, tmp_path / "large.wav")
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert written == 256 * StreamResponse.CHUNK
+        assert (tmp_path / "large.wav").stat().st_size == written
+        assert peak < 1024 * 1024
+
+    def test_async(self, server, tmp_path):
+        client = server.client(AsyncVoipMs)
+
+        async def run():
+            async with client:
+                return await client.fax.get.download_fax_message_pdf_to(12, tmp_path / "fax.pdf")
+
+        assert asyncio.run(run()) == server.file_size
+        assert (tmp_path / "fax.pdf").read_bytes() == base64.b64decode(
+            server.client().fax.get.fax_message_pdf(12)["message_base64"])
+
+    def test_async_without_aiohttp(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = FakeSession({"status": "success", "message_base64": base64.b64encode(b"%PDF").decode()})
+        client = AsyncVoipMs("user", "password", session=session)
+        output = io.BytesIO()
+        assert asyncio.run(client.fax.get.download_fax_message_pdf_to(12, output)) == 4
+        assert output.getvalue() == b"%PDF"
+
+    def test_cassette(self, server, tmp_path):
+        path = str(tmp_path / "calls.jsonl.gz")
+        with Cassette(path, mode="record") as cassette:
+            server.client(cassette=cassette).fax.get.download_fax_message_pdf_to(12, tmp_path / "a.pdf")
+        client = VoipMs("user", "password", session=FakeSession(), cassette=Cassette(path))
+        client.fax.get.download_fax_message_pdf_to(12, tmp_path / "b.pdf")
+        assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
@@ -0,0 +1,109 @@
+import asyncio
+import types
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.entities import didsget
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class SmsSession(FakeSession):
+    """
+    Answers getSMS with as many messages per day as the day of the month, newest first
+    """
+    def __init__(self, per_day=None):
+        super(SmsSession, self).__init__()
+        self.per_day = per_day
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        query = parse_qs(urlsplit(url).query)
+        day_from = int(query["from"][0][-2:])
+        day_to = int(query["to"][0][-2:])
+        limit = int(query["limit"][0])
+        messages = [{"id": str(day * 100 + n), "date": "2024-01-{:02d} 10:{:02d}:00".format(day, n)}
+                    for day in reversed(range(day_from, day_to + 1))
+                    for n in reversed(range(self.per_day or day))]
+        if not messages:
+            return FakeResponse({"status": "no_sms"})
+        return FakeResponse({"status": "success", "sms": messages[:limit]})
+
+
+class TestMessages:
+
+    def test_iter_sms(self):
+        session = SmsSession()
+        client = VoipMs("user", "password", session=session)
+        messages = client.dids.get.iter_sms(date_from="2024-01-01", date_to="2024-01-03",
+                                            limit=2, prefetch=0)
+        assert isinstance(messages, types.GeneratorType)
+        assert session.urls == []
+        ids = [message["id"] for message in messages]
+        assert ids == ["302", "301", "300", "201", "200", "100"]
+        # The 3rd is asked again with a bigger limit, the 2nd until a page is not full
+        assert len(session.urls) == 5
+
+    def test_iter_sms_narrows_full_windows(self):
+        session = SmsSession(per_day=2)
+        client = VoipMs("user", "password", session=session)
+        messages = client.dids.get.iter_sms(date_from="2024-01-01", date_to="2024-01-05",
+                                            limit=3, page_days=5, prefetch=0)
+        ids = [message["id"] for message in messages]
+        assert ids == ["501", "500", "401", "400", "301", "300", "201", "200", "101", "100"]
+        queries = [parse_qs(urlsplit(url).query) for url in session.urls]
+        assert [query["to"][0] for query in queries] == \
+            ["2024-01-05", "2024-01-04", "2024-01-03", "2024-01-01"]
+        # The limit only makes room for the messages of the last day already yielded
+        assert [query["limit"][0] for query in queries] == ["3", "4", "5", "4"]
+
+    def test_iter_sms_day_above_max_limit(self, monkeypatch):
+        monkeypatch.setattr(didsget, "MAX_PAGE_LIMIT", 4)
+        client = VoipMs("user", "password", session=SmsSession(per_day=5))
+        messages = client.dids.get.iter_sms(date_from="2024-01-01", date_to="2024-01-01",
+                                            limit=2, prefetch=0)
+        with pytest.raises(ValueError):
+            list(messages)
+
+    def test_iter_mms(self):
+        session = SmsSession()
+        client = VoipMs("user", "password", session=session)
+        messages = client.dids.get.iter_mms(date_from="2024-01-01", date_to="2024-01-02", prefetch=0)
+        # getMMS lists its messages under 'sms'
+        assert [message["id"] for message in messages] == ["201", "200", "100"]
+        assert all("method=getMMS" in url for url in session.urls)
+
+    def test_iter_sms_stops_early(self):
+        session = SmsSession()
+        client = VoipMs("user", "password", session=session)
+        messages = client.dids.get.iter_sms(date_from="2024-01-01", date_to="2024-01-09",
+                                            limit=50, prefetch=0)
+        assert next(messages)["id"] == "908"
+        messages.close()
+        assert len(session.urls) == 1
+
+    def test_iter_sms_prefetch(self):
+        client = VoipMs("user", "password", session=SmsSession())
+        messages = client.dids.get.iter_sms(date_from="2024-01-01", date_to="2024-01-04",
+                                            page_days=2, prefetch=2)
+        assert len(list(messages)) == 10
+
+    def test_iter_mms_validates_eagerly(self):
+        client = VoipMs("user", "password", session=SmsSession())
+        with pytest.raises(ValueError):
+            client.dids.get.iter_mms(date_from="2024-01-05", date_to="2024-01-01")
+        with pytest.raises(ValueError):
+            client.dids.get.iter_mms(sms_type=True)
+
+    def test_iter_sms_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        client = AsyncVoipMs("user", "password", session=SmsSession())
+
+        async def run():
+            return [message["id"] async for message in client.dids.get.iter_sms(
+                date_from="2024-01-01", date_to="2024-01-02", limit=1)]
+
+        assert asyncio.run(run()) == ["201", "200", "100"]
@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import io
+
+import pytest
+import requests
+
+from voipms import AsyncVoipMs, Hooks, MetricsCollector, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.helpers import VoipMsError
+from voipms.mockserver import MockServer
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(("before", event.method, event.http_latency))
+
+    def after_response(self, event):
+        self.calls.append(("after", event.method, event.status))
+
+    def on_error(self, event):
+        self.calls.append(("error", event.method, event.status))
+
+
+class ErrorResponse(FakeResponse):
+    status_code = 500
+
+    def raise_for_status(self):
+        raise requests.HTTPError("500 Server Error")
+
+
+class ErrorSession(FakeSession):
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return ErrorResponse({"status": "error"})
+
+
+class TestHooks:
+
+    def test_events(self):
+        recorder, metrics = Recorder(), MetricsCollector()
+        client = VoipMs("user", "password", session=FakeSession({"status": "success", "balance": {}}),
+                        hooks=[recorder, metrics])
+        client.general.get.balance()
+        assert recorder.calls == [("before", "getBalance", None), ("after", "getBalance", "success")]
+
+        snapshot = metrics.snapshot()["getBalance"]
+        assert snapshot["requests"] == 1
+        assert snapshot["latency_count"] == 1
+        assert snapshot["latency_buckets"][-1] == (float("inf"), 1)
+        assert snapshot["decode_count"] == 1
+        assert snapshot["response_bytes"] == len(b'{"status": "success", "balance": {}}')
+        assert snapshot["parameter_bytes"] == len("method=getBalance")
+        assert snapshot["errors"] == {}
+
+    def test_post_parameters_exclude_credentials(self):
+        metrics = MetricsCollector()
+        client = VoipMs("api@example.com", "hunter2", session=FakeSession(), hooks=metrics)
+        client._post("sendFAX", {"to_number": "5551234567", "file": "x" * 100})
+        assert metrics.snapshot()["sendFAX"]["parameter_bytes"] == len(
+            "method=sendFAX&to_number=5551234567&file=" + "x" * 100)
+
+    def test_errors(self):
+        recorder, metrics = Recorder(), MetricsCollector()
+        client = VoipMs("user", "password", session=FakeSession({"status": "invalid_did"}),
+                        hooks=[recorder, metrics])
+        with pytest.raises(VoipMsError):
+            client.dids.get.dids_info(did=5551234567)
+        assert recorder.calls[-1] == ("error", "getDIDsInfo", "invalid_did")
+
+        client = VoipMs("user", "password", session=ErrorSession(), hooks=metrics)
+        with pytest.raises(requests.HTTPError):
+            client.general.get.balance()
+        assert metrics.snapshot()["getDIDsInfo"]["errors"] == {"invalid_did": 1}
+        assert metrics.snapshot()["getBalance"]["errors"] == {"http_500": 1}
+
+    def test_hook_is_not_called_without_request(self):
+        recorder = Recorder()
+        client = VoipMs("user", "password", session=FakeSession(), hooks=recorder)
+        with pytest.raises(ValueError):
+            client.dids.get.sms(limit="many")
+        assert recorder.calls == []
+
+    def test_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        recorder = Recorder()
+        client = AsyncVoipMs("user", "password", session=FakeSession(), hooks=recorder)
+        asyncio.run(client.general.get.balance())
+        assert recorder.calls == [("before", "getBalance", None), ("after", "getBalance", "success")]
+
+
+class TestStreamedRequests:
+
+    def _check(self, metrics):
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {"getCDR", "getFaxMessagePDF"}
+        for method in snapshot.values():
+            assert method["requests"] == method["latency_count"] >= 1
+            assert method["response_bytes"] > 0
+            assert method["parameter_bytes"] > 0
+        # Days without calls answer no_cdr
+        assert set(snapshot["getCDR"]["errors"]) <= {"no_cdr"}
+        assert snapshot["getFaxMessagePDF"]["requests"] == 1
+        assert snapshot["getFaxMessagePDF"]["errors"] == {}
+
+    def test_iter_cdr_and_download(self):
+        today = datetime.date.today()
+        metrics = MetricsCollector()
+        with MockServer(size=20) as server:
+            client = server.client(hooks=metrics)
+            records = list(client.calls.get.iter_cdr(
+                str(today - datetime.timedelta(days=31)), str(today), 0, answered=True))
+            written = client.fax.get.download_fax_message_pdf_to(12, io.BytesIO())
+        assert records and written == server.file_size
+        self._check(metrics)
+
+    def test_iter_cdr_and_download_async(self):
+        today = datetime.date.today()
+        metrics = MetricsCollector()
+        with MockServer(size=20) as server:
+            client = server.client(AsyncVoipMs, hooks=metrics)
+
+            async def run():
+                async with client:
+                    records = [record async for record in client.calls.get.iter_cdr(
+                        str(today - datetime.timedelta(days=31)), str(today), 0, answered=True)]
+                    written = await client.fax.get.download_fax_message_pdf_to(12, io.BytesIO())
+                return records, written
+
+            records, written = asyncio.run(run())
+        assert records and written == server.file_size
+        self._check(metrics)
+
+    def test_stream_errors(self):
+        recorder, metrics = Recorder(), MetricsCollector()
+        with MockServer(error_rate=1, errors=["api_not_enabled"]) as server:
+            client = server.client(hooks=[recorder, metrics])
+            with pytest.raises(VoipMsError):
+                list(client.calls.get.iter_cdr("2024-01-01", "2024-01-02", 0, answered=True))
+        assert recorder.calls == [("before", "getCDR", None), ("error", "getCDR", "api_not_enabled")]
+        assert metrics.snapshot()["getCDR"]["errors"] == {"api_not_enabled": 1}
+
+
+class TestMetricsCollector:
+
+    def test_render(self):
+        metrics = MetricsCollector(buckets=(0.5, 1))
+        client = VoipMs("user", "password", session=FakeSession({"status": "invalid_did"}), hooks=metrics)
+        for _ in range(2):
+            with pytest.raises(VoipMsError):
+                client.dids.get.dids_info(did=5551234567)
+        text = metrics.render()
+        assert '# TYPE voipms_request_duration_seconds histogram' in text
+        assert 'voipms_requests_total{method="getDIDsInfo"} 2' in text
+        assert 'voipms_request_duration_seconds_bucket{method="getDIDsInfo",le="+Inf"} 2' in text
+        assert 'voipms_request_duration_seconds_count{method="getDIDsInfo"} 2' in text
+        assert 'voipms_errors_total{method="getDIDsInfo",status="invalid_did"} 2' in text
+        assert text.endswith("\n")
+
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_buckets(self):
+        with pytest.raises(ValueError):
+            MetricsCollector(buckets=())
+        with pytest.raises(ValueError):
+            MetricsCollector(buckets=(0, 1))
@@ -0,0 +1,93 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+import requests
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms.helpers import VoipMsError
+from voipms.mockserver import MockServer
+from voipms.retry import RetryPolicy
+
+
+@pytest.fixture
+def server():
+    with MockServer(size=50) as server:
+        yield server
+
+
+class TestMockServer:
+
+    def test_api_url_override(self, server, monkeypatch):
+        monkeypatch.setenv("VOIPMS_API_URL", server.url)
+        client = VoipMs(server.voip_user, server.voip_api_password)
+        assert client.general.get.balance()["status"] == "success"
+        assert server.calls["getBalance"] == 1
+
+    def test_credentials(self, server):
+        client = VoipMs(server.voip_user, "wrong", api_url=server.url)
+        with pytest.raises(VoipMsError) as e:
+            client.general.get.balance()
+        assert e.value.status == "invalid_credentials"
+
+    def test_datasets(self, server):
+        client = server.client()
+        assert len(client.dids.get.dids_info()["dids"]) == 50
+        today = datetime.date.today()
+        date_from = str(today - datetime.timedelta(days=31))
+        cdr = client.calls.get.cdr(date_from, str(today), 0,
+                                   answered=True, noanswer=True, busy=True, failed=True)
+        assert len(cdr["cdr"]) == 50
+        messages = list(client.dids.get.iter_sms(date_from=date_from, date_to=str(today),
+                                                 page_days=7, limit=20))
+        assert len(messages) == 50
+
+    def test_post(self, server):
+        client = server.client()
+        assert client._post("sendSMS", {"did": 5550000000, "dst": 5552000000, "message": "hi"})["sms"] == 1
+
+    def test_error_injection(self, server):
+        client = server.client()
+        server.fail("invalid_did", method="getDIDsInfo", times=2)
+        assert client.general.get.balance()["status"] == "success"
+        for _ in range(2):
+            with pytest.raises(VoipMsError) as e:
+                client.dids.get.dids_info()
+            assert e.value.status == "invalid_did"
+        assert client.dids.get.dids_info()["status"] == "success"
+        with pytest.raises(ValueError):
+            server.fail("not_an_error")
+
+    def test_error_rate(self):
+        with MockServer(error_rate=1, errors=["api_not_enabled"]) as server:
+            with pytest.raises(VoipMsError) as e:
+                server.client().general.get.balance()
+            assert e.value.status == "api_not_enabled"
+
+    def test_rate_limit(self):
+        with MockServer(rate=10, burst=2) as server:
+            client = server.client()
+            client.general.get.balance()
+            client.general.get.balance()
+            with pytest.raises(requests.exceptions.HTTPError) as e:
+                client.general.get.balance()
+            assert e.value.response.status_code == 429
+            assert e.value.response.headers["Retry-After"] == "1"
+            retrying = server.client(retry=RetryPolicy(backoff_factor=0.2, jitter=False))
+            assert retrying.general.get.balance()["status"] == "success"
+
+    def test_latency_async(self):
+        with MockServer(latency=0.05) as server:
+            client = server.client(AsyncVoipMs)
+
+            async def run():
+                async with client:
+                    await client.general.get.balance()
+                    started = time.monotonic()
+                    results = await asyncio.gather(*[client.general.get.balance() for _ in range(4)])
+                    return time.monotonic() - started, results
+
+            elapsed, results = asyncio.run(run())
+            assert 0.05 <= elapsed < 0.15
+            assert all(result["status"] == "success" for result in results)
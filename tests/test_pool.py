@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from voipms import AsyncVoipMs, ClientPool, VoipMs
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class SlowSession(FakeSession):
+    """
+    Holds every request for a moment and records how many are in flight
+    """
+    def __init__(self):
+        super(SlowSession, self).__init__()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.urls.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        return FakeResponse({"status": "success"})
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """
+    Sets a cookie on the response of every request and records the cookies sent
+    """
+    cookies = []
+
+    def do_GET(self):
+        self.cookies.append(self.headers.get("Cookie"))
+        body = json.dumps({"status": "success"}).encode()
+        self.send_response(200)
+        self.send_header("Set-Cookie", "session=acme-secret; Path=/")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientPool:
+
+    def test_clients_share_session(self):
+        pool = ClientPool()
+        pool.session = FakeSession()
+        pool.add("acme", "api@acme.example", "secret")
+        pool.add("globex", "api@globex.example", "hunter2")
+        pool["acme"].general.get.balance()
+        pool["globex"].general.get.balance()
+        assert isinstance(pool["acme"], VoipMs)
+        assert pool["acme"] is pool.client("acme")
+        assert "api_username=api@acme.example" in pool.session.urls[0]
+        assert "api_username=api@globex.example" in pool.session.urls[1]
+        assert pool.stats()["created"] == 2
+
+    def test_cookies_are_not_shared(self):
+        server = HTTPServer(("127.0.0.1", 0), CookieHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = "http://127.0.0.1:{}/api/v1/rest.php".format(server.server_port)
+            pool = ClientPool(api_url=url)
+            pool.add("acme", "api@acme.example", "secret")
+            pool.add("globex", "api@globex.example", "hunter2")
+            pool["acme"].general.get.balance()
+            pool["globex"].general.get.balance()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        assert CookieHandler.cookies == [None, None]
+
+    def test_lru_eviction_keeps_limits(self):
+        pool = ClientPool(max_clients=2, rate=1)
+        for tenant in ("a", "b", "c"):
+            pool.add(tenant, tenant, "secret")
+        client_a = pool["a"]
+        pool["b"]
+        pool["a"]
+        pool["c"]
+        assert pool.stats() == {"tenants": 3, "clients": 2, "created": 3, "evicted": 1}
+        assert pool["a"] is client_a
+        new_b = pool["b"]
+        assert new_b.rate_limiter is pool._tenants["b"].rate_limiter
+        assert pool.stats()["created"] == 4
+
+    def test_idle_eviction(self):
+        pool = ClientPool(idle_timeout=0.01)
+        pool.add("acme", "api@acme.example", "secret")
+        client = pool["acme"]
+        time.sleep(0.02)
+        assert pool["acme"] is not client
+        assert pool.stats()["evicted"] == 1
+
+    def test_concurrency_cap_per_tenant(self):
+        pool = ClientPool(max_concurrency=2)
+        pool.session = SlowSession()
+        pool.add("acme", "api@acme.example", "secret")
+        threads = [threading.Thread(target=pool["acme"].general.get.balance) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(pool.session.urls) == 6
+        assert pool.session.max_in_flight <= 2
+
+    def test_unknown_tenant_and_shared_options(self):
+        pool = ClientPool()
+        with pytest.raises(KeyError):
+            pool["nobody"]
+        with pytest.raises(ValueError):
+            ClientPool(cache=object())
+        with pytest.raises(ValueError):
+            ClientPool(client_class=AsyncVoipMs, max_concurrency=2)
@@ -0,0 +1,45 @@
+import asyncio
+
+from voipms import RateLimiter, VoipMs
+from voipms.ratelimit import TokenBucket
+
+from test_voipmsclient import FakeSession
+
+
+class TestRateLimiter:
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=2, burst=2)
+        now = bucket._updated
+        assert bucket.reserve(now) == 0.0
+        assert bucket.reserve(now) == 0.0
+        assert bucket.reserve(now) == 0.5
+        assert bucket.reserve(now) == 1.0
+        assert bucket.reserve(now + 2.0) == 0.0
+
+    def test_method_limits(self):
+        limiter = RateLimiter(rate=1000, method_limits={"sendSMS": (1, 1)})
+        assert limiter.reserve("sendSMS") == 0.0
+        assert limiter.reserve("sendSMS") > 0.5
+        assert limiter.reserve("getDIDsInfo") == 0.0
+        stats = limiter.stats()
+        assert stats["acquired"] == 3
+        assert stats["throttled"] == 1
+        assert stats["methods"]["sendSMS"]["throttled"] == 1
+        assert stats["methods"]["getDIDsInfo"]["throttled"] == 0
+
+    def test_client_waits(self, monkeypatch):
+        waits = []
+        monkeypatch.setattr("voipms.ratelimit.time.sleep", waits.append)
+        limiter = RateLimiter(method_limits={"setDIDRouting": (1, 1)})
+        client = VoipMs("user", "password", session=FakeSession(),
+                        rate_limiter=limiter)
+        for _ in range(3):
+            client.dids.set.did_routing(5551234567, "account:100000_VoIP")
+        assert len(waits) == 2
+        assert limiter.stats()["throttled"] == 2
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(rate=1000, burst=1)
+        asyncio.run(limiter.acquire_async("getBalance"))
+        assert asyncio.run(limiter.acquire_async("getBalance")) > 0
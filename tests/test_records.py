@@ -0,0 +1,79 @@
+import asyncio
+import datetime
+from decimal import Decimal
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.records import CDR, SMS, VoicemailMessage
+
+from test_callsget import CdrSession
+from test_voipmsclient import FakeSession
+
+CDR_ROW = {
+    "date": "2024-01-31 10:05:00", "callerid": "\"John\" <5551234567>",
+    "destination": "5557654321", "description": "Outgoing to Canada",
+    "account": "100000_VoIP", "disposition": "ANSWERED", "duration": "00:01:03",
+    "seconds": "63", "rate": "0.00900000", "total": "0.01800000",
+    "uniqueid": "12345678", "destination_type": "Local",
+}
+
+
+class TestRecords:
+
+    def test_from_dict_converts_once(self):
+        record = CDR.from_dict(CDR_ROW)
+        assert record.date == datetime.datetime(2024, 1, 31, 10, 5)
+        assert record.seconds == 63
+        assert record.total == Decimal("0.01800000")
+        assert record.as_dict()["account"] == "100000_VoIP"
+        assert not hasattr(record, "__dict__")
+
+    def test_shared_strings_are_interned(self):
+        first = CDR.from_dict(dict(CDR_ROW, disposition="".join(["ANSW", "ERED"])))
+        second = CDR.from_dict(dict(CDR_ROW, disposition="".join(["ANS", "WERED"])))
+        assert first.disposition is second.disposition
+
+    def test_missing_and_empty_fields(self):
+        record = SMS.from_dict({"id": "", "message": "hello"})
+        assert record.id is None and record.date is None
+        assert record == SMS(None, None, None, None, None, "hello")
+
+    def test_cdr_records(self):
+        client = VoipMs("user", "password", session=CdrSession())
+        result = client.calls.get.cdr("2024-01-01", "2024-01-04", 0,
+                                      answered=True, chunk_days=2, records=True)
+        assert all(isinstance(record, CDR) for record in result["cdr"])
+        assert [record.date.day for record in result["cdr"]] == [4, 3, 1]
+
+    def test_iter_cdr_records(self):
+        client = VoipMs("user", "password", session=CdrSession())
+        records = client.calls.get.iter_cdr("2024-01-01", "2024-01-03", 0,
+                                            answered=True, records=True)
+        assert [record.callerid for record in records] == ["1", "3"]
+
+    def test_voicemail_messages_records(self):
+        session = FakeSession({"status": "success", "messages": [
+            {"mailbox": "1001", "folder": "INBOX", "message_num": "0",
+             "date": "2024-01-31 10:05:00", "urgent": "no", "listened": "no"},
+        ]})
+        client = VoipMs("user", "password", session=session)
+        result = client.voicemail.get.voicemail_messages(1001, folder="INBOX", records=True)
+        assert "method=getVoicemailMessages" in session.urls[0]
+        message, = result["messages"]
+        assert isinstance(message, VoicemailMessage)
+        assert message.message_num == 0
+
+    def test_records_async(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        client = AsyncVoipMs("user", "password", session=CdrSession())
+
+        async def run():
+            result = await client.calls.get.cdr("2024-01-01", "2024-01-03", 0,
+                                                answered=True, records=True)
+            rows = [record async for record in client.calls.get.iter_cdr(
+                "2024-01-01", "2024-01-03", 0, answered=True, records=True)]
+            return result["cdr"], rows
+
+        result, rows = asyncio.run(run())
+        assert sorted(record.callerid for record in result) == [record.callerid for record in rows]
+        assert all(isinstance(record, CDR) for record in rows)
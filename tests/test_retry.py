@@ -0,0 +1,68 @@
+import pytest
+import requests
+
+from voipms import VoipMs
+from voipms.retry import Retrier, RetryPolicy
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class FlakySession(FakeSession):
+    def __init__(self, failures):
+        super(FlakySession, self).__init__()
+        self.failures = failures
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        if len(self.urls) <= self.failures:
+            raise requests.exceptions.ConnectionError("connection reset")
+        return FakeResponse(self.payload)
+
+
+class TestRetry:
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        monkeypatch.setattr("voipms.retry.time.sleep", lambda delay: None)
+
+    def test_safe_method_is_retried(self):
+        session = FlakySession(failures=2)
+        retry = Retrier(RetryPolicy(max_attempts=3))
+        client = VoipMs("user", "password", session=session, retry=retry)
+        assert client.general.get.balance() == {"status": "success"}
+        assert len(session.urls) == 3
+        assert retry.stats()["getBalance"] == {
+            "calls": 1, "retries": 2, "recovered": 1, "gave_up": 0}
+
+    def test_unsafe_method_is_not_retried(self):
+        session = FlakySession(failures=1)
+        client = VoipMs("user", "password", session=session,
+                        retry=RetryPolicy())
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.dids.send.sms(5551234567, 5551234568, "hello")
+        assert len(session.urls) == 1
+
+    def test_method_policy(self):
+        session = FlakySession(failures=1)
+        retry = Retrier(method_policies={"sendSMS": RetryPolicy(retry_unsafe=True)})
+        client = VoipMs("user", "password", session=session, retry=retry)
+        client.dids.send.sms(5551234567, 5551234568, "hello")
+        assert len(session.urls) == 2
+
+    def test_gives_up(self):
+        session = FlakySession(failures=5)
+        retry = Retrier(RetryPolicy(max_attempts=2))
+        client = VoipMs("user", "password", session=session, retry=retry)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.dids.get.states()
+        assert len(session.urls) == 2
+        assert retry.stats()["getStates"]["gave_up"] == 1
+
+    def test_status_codes(self):
+        policy = RetryPolicy()
+        response = requests.Response()
+        response.status_code = 503
+        error = requests.exceptions.HTTPError(response=response)
+        assert policy.is_retryable("getCDR", error)
+        response.status_code = 404
+        assert not policy.is_retryable("getCDR", error)
@@ -0,0 +1,61 @@
+import pytest
+
+from voipms import VoipMs
+from voipms.helpers import order
+from voipms.schema import schema_for
+
+from test_voipmsclient import FakeSession
+
+
+class TestSchema:
+
+    def test_validate_converts(self):
+        parameters = schema_for("setClient").validate({
+            "client": 561115, "email": "john@example.com", "password": "secret",
+            "firstname": "John", "lastname": "Smith", "phone_number": "5551234567",
+            "zip_code": "H0H0H0",
+        })
+        assert parameters["zip"] == "H0H0H0"
+        assert "zip_code" not in parameters
+
+    def test_validate_raises_first_error(self):
+        with pytest.raises(ValueError) as e:
+            order(method="orderDID", did="5551234567")
+        assert str(e.value) == "DID to be Ordered needs to be an int (Example: 5552223333)"
+        with pytest.raises(ValueError) as e:
+            order(method="orderDID", did=5551234567, routing="sys:echo", pop=5, dialtime=60, cnam=True)
+        assert str(e.value) == "The parameter billing_type is required"
+        with pytest.raises(ValueError) as e:
+            order(method="orderDID", colour="red")
+        assert str(e.value) == "Parameters not allowed: colour "
+
+    def test_check(self):
+        errors = schema_for("setClient").errors({"email": "not an email"})
+        assert "Client's e-mail is not a correct email syntax" in errors
+        assert "The parameter client is required" in errors
+
+    def test_validate_rows(self):
+        rows = [
+            {"did": 5551234567, "routing": "sys:echo", "pop": 3, "dialtime": 60,
+             "cnam": False, "billing_type": 1},
+            {"did": 5551234567, "routing": "sys:echo", "pop": "3", "dialtime": 60,
+             "cnam": False, "billing_type": 1},
+        ]
+        results = list(schema_for("setDIDInfo").validate_rows(rows))
+        assert results[0] == (0, {"did": 5551234567, "routing": "sys:echo", "pop": 3,
+                                  "dialtime": 60, "cnam": "0", "billing_type": 1}, [])
+        assert results[1][1] is None
+        assert results[1][2] == ["Point of Presence for the DID needs to be an int (Example: 3)"]
+
+    def test_entity_uses_schema(self):
+        session = FakeSession({"status": "success"})
+        client = VoipMs("user", "password", session=session)
+        client.dids.set.did_info(5551234567, "sys:echo", 3, 60, True, 1, note="main line")
+        url, = session.urls
+        assert "method=setDIDInfo" in url
+        assert url.count("method=") == 1
+        assert "cnam=1" in url and "note=main" in url
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            schema_for("sendPigeon")
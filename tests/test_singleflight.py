@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+from voipms import AsyncVoipMs, SingleFlight, VoipMs
+from voipms import asyncvoipmsclient
+
+from test_voipmsclient import FakeResponse, FakeSession
+
+
+class SlowSession(FakeSession):
+    def __init__(self, payload=None):
+        super(SlowSession, self).__init__(payload)
+        self.release = threading.Event()
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        self.release.wait(5)
+        return FakeResponse(self.payload)
+
+
+class TestSingleFlight:
+
+    def test_threads_share_one_call(self):
+        session = SlowSession({"status": "success", "balance": {"current_balance": "1.0"}})
+        single_flight = SingleFlight()
+        client = VoipMs("user", "password", session=session,
+                        single_flight=single_flight)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.general.get.balance()))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while single_flight.stats()["shared"] < 4:
+            time.sleep(0.001)
+        session.release.set()
+        for thread in threads:
+            thread.join()
+        assert len(session.urls) == 1
+        assert len(results) == 5
+        assert all(result == results[0] for result in results)
+
+    def test_errors_are_shared(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise TypeError("Username or Password is incorrect")
+
+        def call():
+            try:
+                single_flight.do(("getBalance", ""), fail)
+            except TypeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        while single_flight.stats()["shared"] < 1:
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+        assert len(errors) == 2
+
+    def test_unsafe_methods_are_not_shared(self):
+        session = FakeSession()
+        client = VoipMs("user", "password", session=session,
+                        single_flight=SingleFlight())
+        client.dids.send.sms(5551234567, 5551234568, "hello")
+        client.dids.send.sms(5551234567, 5551234568, "hello")
+        assert len(session.urls) == 2
+
+    def test_tasks_share_one_call(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = FakeSession()
+        single_flight = SingleFlight()
+        client = AsyncVoipMs("user", "password", session=session,
+                             single_flight=single_flight)
+
+        async def run():
+            return await asyncio.gather(*[client.dids.get.dids_info(did=5551234567)
+                                          for _ in range(5)])
+
+        assert len(asyncio.run(run())) == 5
+        assert len(session.urls) == 1
+        assert single_flight.stats() == {"sent": 1, "shared": 4, "in_flight": 0}
+
+    def test_cancelled_leader(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def balance():
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+            return {"status": "success"}
+
+        async def run():
+            leader = asyncio.ensure_future(single_flight.do_async(("getBalance", ""), balance))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(single_flight.do_async(("getBalance", ""), balance))
+            await asyncio.sleep(0)
+            leader.cancel()
+            result = await asyncio.wait_for(follower, 1)
+            return leader.cancelled(), result
+
+        assert asyncio.run(run()) == (True, {"status": "success"})
+        assert len(calls) == 2
+        assert single_flight.stats()["in_flight"] == 0
+
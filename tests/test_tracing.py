@@ -0,0 +1,117 @@
+import asyncio
+import datetime
+import io
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.entities.didsget import DidsGet
+from voipms.helpers import VoipMsError
+from voipms.mockserver import MockServer
+from voipms.tracing import CLIENT, INTERNAL, OpenTelemetryTracer, SpanRecorder, Tracer
+
+from test_voipmsclient import FakeSession
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer(size=50, seed=3) as server:
+        yield server
+
+
+def _names(spans):
+    return [(span.name, None if span.parent is None else span.parent.name) for span in spans]
+
+
+class TestTracing:
+
+    def test_spans(self):
+        tracer = SpanRecorder()
+        client = VoipMs("api@example.com", "hunter2", session=FakeSession(), tracer=tracer)
+        client.dids.get.dids_info(did=5551234567)
+        assert _names(tracer.spans) == [("getDIDsInfo", "DidsGet.dids_info"), ("DidsGet.dids_info", None)]
+
+        http, entity = tracer.spans
+        assert entity.kind == INTERNAL
+        assert entity.attributes["voipms.parameters"] == "did"
+        assert http.kind == CLIENT
+        assert http.attributes["voipms.method"] == "getDIDsInfo"
+        assert http.attributes["http.response.status_code"] == 200
+        assert http.attributes["voipms.status"] == "success"
+        for span in tracer.spans:
+            for value in span.attributes.values():
+                assert "hunter2" not in str(value)
+                assert "api@example.com" not in str(value)
+
+    def test_error(self):
+        tracer = SpanRecorder()
+        client = VoipMs("user", "password", session=FakeSession({"status": "invalid_did"}), tracer=tracer)
+        with pytest.raises(VoipMsError):
+            client.dids.get.dids_info(did=5551234567)
+        assert [type(span.error) for span in tracer.spans] == [VoipMsError, VoipMsError]
+        assert tracer.spans[0].attributes["voipms.status"] == "invalid_did"
+
+    def test_disabled(self):
+        client = VoipMs("user", "password", session=FakeSession())
+        assert type(client.dids.get) is DidsGet
+        assert client.hooks == ()
+
+    def test_base_tracer(self):
+        client = VoipMs("user", "password", session=FakeSession(), tracer=Tracer())
+        assert client.general.get.balance()["status"] == "success"
+
+    def test_streamed_requests(self, server):
+        tracer = SpanRecorder()
+        client = server.client(tracer=tracer)
+        today = str(datetime.date.today())
+        list(client.calls.get.iter_cdr(today, today, 0, answered=True))
+        client.fax.get.download_fax_message_pdf_to(12, io.BytesIO())
+        cdr, download = [span for span in tracer.spans if span.kind == CLIENT]
+        assert cdr.name == "getCDR"
+        assert download.name == "getFaxMessagePDF"
+        assert download.parent.name == "FaxGet.download_fax_message_pdf_to"
+        assert download.attributes["http.response.status_code"] == 200
+        assert download.attributes["voipms.status"] == "success"
+        assert download.attributes["voipms.response_size"] > server.file_size
+        assert tracer._current.get() is None
+
+    def test_threads(self, server):
+        tracer = SpanRecorder()
+        client = server.client(tracer=tracer)
+        today = datetime.date.today()
+        client.calls.get.cdr(str(today - datetime.timedelta(days=9)), str(today), 0,
+                             answered=True, chunk_days=2, max_workers=4)
+        windows = [span for span in tracer.spans if span.name == "getCDR"]
+        assert len(windows) == 5
+        assert all(span.parent.name == "CallsGet.cdr" for span in windows)
+        assert {span.thread for span in windows} != {tracer.spans[-1].thread}
+
+    def test_asyncio(self, server):
+        tracer = SpanRecorder()
+        client = server.client(AsyncVoipMs, tracer=tracer)
+
+        async def run():
+            async with client:
+                await asyncio.gather(client.general.get.balance(), client.dids.get.dids_info())
+
+        asyncio.run(run())
+        assert sorted(_names(tracer.spans)) == [
+            ("DidsGet.dids_info", None), ("GeneralGet.balance", None),
+            ("getBalance", "GeneralGet.balance"), ("getDIDsInfo", "DidsGet.dids_info")]
+
+    def test_asyncio_executor(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        tracer = SpanRecorder()
+        client = AsyncVoipMs("user", "password", session=FakeSession(), tracer=tracer)
+        asyncio.run(client.general.get.balance())
+        assert _names(tracer.spans) == [("getBalance", "GeneralGet.balance"), ("GeneralGet.balance", None)]
+
+    def test_opentelemetry(self):
+        try:
+            import opentelemetry  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError):
+                OpenTelemetryTracer()
+        else:
+            assert OpenTelemetryTracer().tracer is not None
@@ -0,0 +1,180 @@
+import asyncio
+import base64
+import io
+import os
+import tracemalloc
+
+import pytest
+
+from voipms import AsyncVoipMs, MetricsCollector, VoipMs
+from voipms import asyncvoipmsclient
+from voipms.mockserver import MockServer
+from voipms.upload import Base64File, MultipartBody
+
+from test_voipmsclient import FakeResponse
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer() as server:
+        yield server
+
+
+@pytest.fixture
+def received(server):
+    faxes = []
+
+    def send_fax(method, parameters):
+        faxes.append(parameters)
+        return {"status": "success", "id": len(faxes)}
+
+    server.handlers["sendFaxMessage"] = send_fax
+    yield faxes
+    del server.handlers["sendFaxMessage"]
+
+
+class DrainSession(object):
+    """
+    Reads streamed bodies like a transport would, keeping only their length
+    """
+    def __init__(self):
+        self.methods = []
+        self.sent = []
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        self.methods.append(method)
+        if isinstance(data, dict) or data is None:
+            self.sent.append((headers, None))
+        else:
+            self.sent.append((headers, sum(len(chunk) for chunk in data)))
+        return FakeResponse({"status": "success", "id": 1})
+
+
+class TestBase64File:
+
+    def test_sizes(self):
+        for size in range(10):
+            content = os.urandom(size)
+            upload = Base64File(io.BytesIO(content), chunk_size=3)
+            encoded = b"".join(upload.chunks())
+            assert encoded == base64.b64encode(content)
+            assert len(encoded) == upload.encoded_size
+
+    def test_rereads(self, tmp_path):
+        path = tmp_path / "fax.tif"
+        path.write_bytes(b"II*\x00" * 1000)
+        upload = Base64File(path, chunk_size=1000)
+        assert b"".join(upload.chunks()) == b"".join(upload.chunks()) == base64.b64encode(path.read_bytes())
+        assert repr(upload) == "Base64File('fax.tif', 4000 bytes)"
+
+    def test_not_seekable(self):
+        reader, writer = os.pipe()
+        try:
+            with os.fdopen(reader, "rb") as pipe:
+                with pytest.raises(ValueError):
+                    Base64File(pipe)
+        finally:
+            os.close(writer)
+
+    def test_multipart_length(self):
+        body = MultipartBody({"to_number": 5551234567, "file": Base64File(io.BytesIO(os.urandom(1001)))})
+        assert len(body) == len(b"".join(body))
+        assert body.size(exclude=("file",)) < len(body)
+
+
+class TestFaxUpload:
+
+    def test_path(self, server, received, tmp_path):
+        content = os.urandom(300000)
+        path = tmp_path / "contract.pdf"
+        path.write_bytes(content)
+        response = server.client().fax.send.fax_message(5552341234, "Front desk", 5559876543, path)
+        assert response["status"] == "success"
+        assert base64.b64decode(received[-1]["file"]) == content
+        assert received[-1]["from_name"] == "Front desk"
+
+    def test_file_object_async(self, server, received):
+        content = os.urandom(100000)
+        client = server.client(AsyncVoipMs)
+
+        async def run():
+            async with client:
+                return await client.fax.send.fax_message(5552341234, "Front desk", 5559876543,
+                                                         io.BytesIO(content))
+
+        assert asyncio.run(run())["status"] == "success"
+        assert base64.b64decode(received[-1]["file"]) == content
+
+    def test_async_without_aiohttp(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = DrainSession()
+        client = AsyncVoipMs("user", "password", session=session)
+        asyncio.run(client.fax.send.fax_message(5552341234, "Front desk", 5559876543, io.BytesIO(b"x" * 30)))
+        headers, length = session.sent[0]
+        assert headers["Content-Length"] == str(length)
+
+    def test_peak_memory(self, tmp_path):
+        path = tmp_path / "large.tif"
+        with open(path, "wb") as large:
+            for _ in range(64):
+                large.write(os.urandom(128 * 1024))
+        metrics = MetricsCollector()
+        session = DrainSession()
+        client = VoipMs("user", "password", session=session, hooks=metrics)
+
+        tracemalloc.start()
+        try:
+            client.fax.send.fax_message(5552341234, "Front desk", 5559876543, path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        headers, length = session.sent[0]
+        assert length == int(headers["Content-Length"]) > 8 * 1024 * 1024 * 4 // 3
+        assert peak < 1024 * 1024
+        assert metrics.snapshot()["sendFaxMessage"]["parameter_bytes"] < length
+
+
+class TestRouting:
+
+    def test_threshold(self):
+        session = DrainSession()
+        client = VoipMs("user", "password", session=session, upload_threshold=100)
+        client.dids.set.recording("QUJD" * 10, "greeting")
+        client.dids.set.recording("QUJD" * 30, "greeting")
+        client.dids.get.dids_info(client="x" * 200)
+        assert session.methods == ["GET", "POST", "GET"]
+        assert session.sent[1][0]["Content-Type"].startswith("multipart/form-data")
+
+        session = DrainSession()
+        client = VoipMs("user", "password", session=session, upload_threshold=None)
+        client.dids.set.recording("QUJD" * 1000, "greeting")
+        client.dids.set.recording(b"RIFF", "greeting")
+        assert session.methods == ["GET", "POST"]
+
+    def test_uploads(self, server, received, tmp_path):
+        recordings, messages, files = [], [], []
+        server.handlers["setRecording"] = lambda method, parameters: recordings.append(parameters) or {"status": "success"}
+        server.handlers["sendMMS"] = lambda method, parameters: messages.append(parameters) or {"status": "success"}
+        server.handlers["addLNPFile"] = lambda method, parameters: files.append(parameters) or {"status": "success"}
+        try:
+            client = server.client()
+            wave = os.urandom(5000)
+            client.dids.set.recording(wave, "greeting")
+            assert base64.b64decode(recordings[-1]["file"]) == wave
+
+            path = tmp_path / "photo.png"
+            path.write_bytes(b"\x89PNG" + os.urandom(3000))
+            client.dids.send.mms(5551234567, 5557654321, "Photo", media2=path)
+            prefix, _, encoded = messages[-1]["media2"].partition(",")
+            assert prefix == "data:image/png;base64"
+            assert base64.b64decode(encoded) == path.read_bytes()
+
+            client.dids.send.mms(5551234567, 5557654321, "Photo", media2="data:image/png;base64,iVBORw0K")
+            assert messages[-1]["media2"] == "data:image/png;base64,iVBORw0K"
+
+            client.lnp.add.file("100000", "4321", io.BytesIO(b"%PDF-1.4"))
+            assert files[-1]["portid"] == "4321"
+            assert base64.b64decode(files[-1]["file"]) == b"%PDF-1.4"
+        finally:
+            for method in ("setRecording", "sendMMS", "addLNPFile"):
+                del server.handlers[method]
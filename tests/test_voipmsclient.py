@@ -0,0 +1,159 @@
+import asyncio
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from voipms import AsyncVoipMs, VoipMs
+from voipms import asyncvoipmsclient
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.content = json.dumps(payload).encode()
+        self.raw = io.BytesIO(self.content)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, payload=None):
+        self.payload = payload or {"status": "success"}
+        self.urls = []
+        self.closed = False
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(self.payload)
+
+    def close(self):
+        self.closed = True
+
+
+class TestVoipMsClient:
+
+    def test_entities_share_session(self):
+        session = FakeSession()
+        client = VoipMs("user", "password", session=session)
+        client.general.get.balance()
+        client.dids.get.states()
+        assert len(session.urls) == 2
+        assert client.dids.get._voipms_client.session is session
+
+    def test_session_is_pooled(self):
+        client = VoipMs("user", "password", pool_maxsize=3)
+        adapter = client.session.get_adapter("https://voip.ms")
+        assert adapter._pool_maxsize == 3
+        assert client.session is client.session
+
+    def test_close(self):
+        with VoipMs("user", "password") as client:
+            session = client.session
+        assert client._session is None
+        assert client.session is not session
+
+    def test_close_keeps_foreign_session(self):
+        session = FakeSession()
+        with VoipMs("user", "password", session=session) as client:
+            pass
+        assert not session.closed
+        assert client.session is session
+
+    def test_keep_alive_keeps_foreign_session(self):
+        closed = []
+
+        class Adapter:
+            def close(self):
+                closed.append(self)
+
+        session = FakeSession()
+        session.adapters = {"https://": Adapter()}
+        client = VoipMs("user", "password", session=session, keep_alive=0)
+        client.general.get.balance()
+        client._last_request -= 1
+        client.general.get.balance()
+        assert closed == []
+
+    def test_keep_alive_expires_own_connections(self):
+        client = VoipMs("user", "password", keep_alive=0)
+        adapter = client.session.get_adapter("https://voip.ms")
+        closed = []
+        adapter.close = lambda: closed.append(adapter)
+        client._last_request = 0
+        client._expire_idle_connections()
+        assert closed
+
+    def test_json_decoder(self):
+        bodies = []
+
+        def decode(body):
+            bodies.append(body)
+            return json.loads(body)
+
+        client = VoipMs("user", "password", session=FakeSession(), json_decoder=decode)
+        assert client.general.get.balance() == {"status": "success"}
+        assert bodies == [b'{"status": "success"}']
+        assert VoipMs("user", "password", json_decoder="json").json_decoder is json.loads
+        with pytest.raises(ValueError):
+            VoipMs("user", "password", json_decoder="yaml")
+
+    def test_entities_are_lazy(self):
+        client = VoipMs("user", "password")
+        assert "dids" not in client.__dict__
+        dids_get = client.dids.get
+        assert dids_get is client.dids.get
+        assert dids_get._voipms_client is client
+        assert "send" not in client.dids.__dict__
+
+    def test_import_does_not_load_entities(self):
+        code = ("import sys, voipms; voipms.VoipMs('user', 'password').dids.send; "
+                "print(sorted(m for m in sys.modules if m.startswith(('voipms.entities.', 'aiohttp'))))")
+        output = subprocess.check_output([sys.executable, "-c", code]).decode()
+        assert output.strip() == "['voipms.entities.dids', 'voipms.entities.didssend']"
+
+    def test_entity_classes_are_exported(self):
+        import voipms
+        from voipms.entities.didsget import DidsGet
+        assert voipms.DidsGet is DidsGet
+        with pytest.raises(AttributeError):
+            voipms.DidsFly
+
+
+class TestAsyncVoipMs:
+
+    def test_entities_are_awaitable(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        session = FakeSession()
+        client = AsyncVoipMs("user", "password", session=session)
+
+        async def run():
+            return await asyncio.gather(client.dids.get.states(),
+                                        client.calls.get.call_types(client=1))
+
+        assert asyncio.run(run()) == [{"status": "success"}] * 2
+        assert "method=getStates" in session.urls[0]
+
+    def test_semaphore_per_loop(self, monkeypatch):
+        monkeypatch.setattr(asyncvoipmsclient, "aiohttp", None)
+        client = AsyncVoipMs("user", "password", session=FakeSession(), max_concurrency=1)
+
+        async def run():
+            await asyncio.gather(*[client.general.get.balance() for _ in range(3)])
+            return client._semaphore
+
+        semaphores = [asyncio.run(run()) for _ in range(2)]
+        assert semaphores[0] is not semaphores[1]
+
+    def test_validation_raises_before_await(self):
+        client = AsyncVoipMs("user", "password")
+        with pytest.raises(ValueError):
+            client.dids.send.sms("not a did", 5551234568, "hi")
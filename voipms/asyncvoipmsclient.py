@@ -0,0 +1,362 @@
+import asyncio
+import contextvars
+import functools
+import time
+import weakref
+
+# aiohttp takes longer to import than the rest of the package, it is only
+# imported once an asynchronous client sends its first request
+_UNLOADED = object()
+aiohttp = _UNLOADED
+URL = None
+
+
+def _load_aiohttp():
+    """
+    Import aiohttp on first use
+
+    :returns: The aiohttp module, None if it is not installed
+    """
+    global aiohttp, URL
+    if aiohttp is _UNLOADED:
+        try:
+            import aiohttp as module
+            from yarl import URL
+        except ImportError:
+            module = None
+        aiohttp = module
+    return aiohttp
+
+from .cache import MISSING, make_key
+from .download import CHUNK_SIZE as DOWNLOAD_CHUNK_SIZE, Base64Extractor, decode_document, open_target
+from .helpers import VoipMsError
+from .retry import is_safe_method
+from .streaming import aiter_items
+from .voipmsclient import VoipMsClient
+
+
+class AsyncVoipMsClient(VoipMsClient):
+    """
+    Voip.ms class to communicate with the v1 REST API from asyncio code
+
+    The entities validate their parameters when they are called and return an
+    awaitable for the API call, so errors in the parameters are raised before
+    anything is awaited.
+    """
+    def __init__(self, voip_user, voip_api_password, max_concurrency=10, **kwargs):
+        """
+        Initialize the class with you voip_user and voip_api_password.
+
+        Requests are sent with aiohttp when it is installed. Otherwise the
+        pooled requests session of :class:`VoipMsClient` is run in the default
+        executor of the event loop.
+
+        :param voip_user: voip.ms user id (email)
+        :type voip_user: :py:class:`str`
+        :param voip_api_password: voip.ms API Password
+        :type voip_api_password: :py:class:`str`
+        :param max_concurrency: Maximum number of API calls in flight at the same time per event loop (Default: 10)
+        :type max_concurrency: :py:class:`int`
+        :param **kwargs: Connection pool options of :class:`VoipMsClient`
+        :type **kwargs: :py:class:`dict`
+        """
+        super(AsyncVoipMsClient, self).__init__(voip_user, voip_api_password, **kwargs)
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("Maximum number of API calls in flight needs to be a positive int")
+        self.max_concurrency = max_concurrency
+        # Semaphores belong to the loop they were created in (Python < 3.10), one per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._async_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @property
+    def _semaphore(self):
+        """
+        The semaphore of max_concurrency for the running event loop
+
+        Created on first use in every loop, so a client created outside of
+        a loop can be used with asyncio.run().
+
+        :returns: :py:class:`asyncio.Semaphore`
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    @property
+    def async_session(self):
+        """
+        The pooled aiohttp session shared by all entities, created on first use
+
+        :returns: :py:class:`aiohttp.ClientSession`
+        """
+        if self._async_session is None or self._async_session.closed:
+            _load_aiohttp()
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize,
+                                             limit_per_host=self.pool_maxsize,
+                                             keepalive_timeout=self.keep_alive)
+            timeout = self.timeout
+            if isinstance(timeout, tuple):
+                timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total=timeout)
+            self._async_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._async_session
+
+    async def aclose(self):
+        """
+        Close all pooled connections
+        """
+        session = self._async_session
+        self._async_session = None
+        if session is not None:
+            await session.close()
+        self.close()
+
+    async def _async_handle_response(self, r, event=None):
+        """
+        Verify the aiohttp response and decode its JSON body
+
+        :param r: The HTTP response
+        :type r: :py:class:`aiohttp.ClientResponse`
+        :param event: The request to fill in for the hooks (Default: None)
+        :type event: :py:class:`voipms.hooks.RequestEvent`
+        :returns: The JSON output from the API
+        """
+        r.raise_for_status()
+        if r.status == 204:
+            return None
+        content = await r.read()
+        if event is None:
+            return self._check_status(self.json_decoder(content))
+        event.http_latency = time.perf_counter() - event.started
+        return self._check_status(self._decode(content, event))
+
+    async def _send(self, method, http_method, url, **kwargs):
+        """
+        Send a single HTTP request for an API method
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param http_method: 'GET' or 'POST'
+        :type http_method: :py:class:`str`
+        :param url: The url of the request
+        :type url: :py:class:`str`
+        :param **kwargs: Additional arguments for the HTTP request
+        :type **kwargs: :py:class:`dict`
+        :returns: The JSON output from the API
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(method)
+
+        async with self._semaphore:
+            event = self._request_started(method, http_method, url, kwargs.get('data'))
+            try:
+                if _load_aiohttp() is None:
+                    self._expire_idle_connections()
+                    loop = asyncio.get_running_loop()
+                    # The executor does not copy the context, spans of the request follow anyway
+                    r = await loop.run_in_executor(None, functools.partial(
+                        contextvars.copy_context().run, self.session.request, http_method, url,
+                        timeout=self.timeout, **kwargs))
+                    if event is not None:
+                        event.http_latency = time.perf_counter() - event.started
+                        event.http_status = r.status_code
+                    r_json = self._handle_response(r, event)
+                else:
+                    if http_method == 'GET':
+                        # The url is already encoded the way voip.ms expects it
+                        url = URL(url, encoded=True)
+                    async with self.async_session.request(http_method, url, **kwargs) as r:
+                        if event is not None:
+                            event.http_status = r.status
+                        r_json = await self._async_handle_response(r, event)
+            except Exception as e:
+                self._request_finished(event, e)
+                raise
+            self._request_finished(event)
+            return r_json
+
+    async def _request(self, method, http_method, url, **kwargs):
+        """
+        Send an API call, retrying it as configured
+
+        Takes the same arguments as :meth:`_send`.
+
+        :returns: The JSON output from the API
+        """
+        if self.retry is not None:
+            return await self.retry.call_async(method, self._send, method, http_method, url, **kwargs)
+        return await self._send(method, http_method, url, **kwargs)
+
+    async def _open_stream(self, method, url):
+        """
+        Send a single GET request without reading the response body
+
+        A slot of max_concurrency is only held until the headers arrived,
+        the caller may make other API calls while it reads the body. The
+        caller ends the event with :meth:`_stream_finished`.
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param url: The url of the request
+        :type url: :py:class:`str`
+        :returns: :py:class:`tuple` of the :py:class:`aiohttp.ClientResponse` with an unread body and the event of the request
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(method)
+        async with self._semaphore:
+            event = self._request_started(method, 'GET', url)
+            try:
+                r = await self.async_session.get(URL(url, encoded=True))
+            except Exception as e:
+                self._request_finished(event, e)
+                raise
+        if event is not None:
+            event.http_status = r.status
+        try:
+            r.raise_for_status()
+        except aiohttp.ClientResponseError as e:
+            r.release()
+            self._stream_finished(event, 0, e)
+            raise
+        return r, event
+
+    async def _iter_get(self, method, parameters, key):
+        """
+        Handle authenticated GET requests returning a long list
+
+        Yields the items of the list one by one while the response is still
+        being read. Without aiohttp the response of the call is decoded at
+        once.
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The query string parameters
+        :type parameters: :py:class:`dict`
+        :param key: Key of the list in the JSON output (Example: 'cdr')
+        :type key: :py:class:`str`
+        :returns: Asynchronous generator of the items of the list
+        """
+        if self.cassette is not None or _load_aiohttp() is None:
+            r_json = await self._get(method, parameters)
+            for item in (r_json or {}).get(key, []):
+                yield item
+            return
+
+        url = self._build_url(method, parameters)
+        if self.retry is not None:
+            r, event = await self.retry.call_async(method, self._open_stream, method, url)
+        else:
+            r, event = await self._open_stream(method, url)
+        error = None
+        try:
+            async with r:
+                if r.status != 204:
+                    async for item in aiter_items(r.content, key, self._stream_status(event)):
+                        yield item
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._stream_finished(event, r.content.total_bytes, error)
+
+    async def _download(self, method, parameters, keys, target):
+        """
+        Handle authenticated GET requests returning a base64 encoded file
+
+        Takes the same arguments as :meth:`VoipMsClient._download`. Without
+        aiohttp the response is decoded at once and only the file is
+        written in chunks.
+
+        :returns: :py:class:`int` bytes written
+        """
+        with open_target(target) as output:
+            if self.cassette is not None or _load_aiohttp() is None:
+                return decode_document(await self._get(method, parameters), keys, output.write)
+
+            url = self._build_url(method, parameters)
+            if self.retry is not None:
+                r, event = await self.retry.call_async(method, self._open_stream, method, url)
+            else:
+                r, event = await self._open_stream(method, url)
+            error = None
+            try:
+                async with r:
+                    extractor = Base64Extractor(keys, output.write, self._stream_status(event))
+                    async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        extractor.feed(chunk)
+                    return extractor.close()
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                self._stream_finished(event, r.content.total_bytes, error)
+
+    async def _get(self, method, parameters=None):
+        """
+        Handle authenticated GET requests
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The query string parameters
+        :type parameters: :py:class:`str`
+        :returns: The JSON output from the API
+        """
+        if isinstance(method, tuple):
+            method, parameters = method
+
+        if parameters and not is_safe_method(method) and self._is_upload(parameters):
+            return await self._post(method, parameters)
+
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, parameters)
+
+        if self.cache is not None:
+            r_json = self.cache.get(method, parameters)
+            if r_json is not MISSING:
+                return r_json
+
+        url = self._build_url(method, parameters)
+        try:
+            if self.single_flight is not None and is_safe_method(method):
+                r_json = await self.single_flight.do_async(make_key(method, parameters),
+                                                           self._request, method, 'GET', url)
+            else:
+                r_json = await self._request(method, 'GET', url)
+        except VoipMsError as e:
+            self._record(method, parameters, {"status": e.status})
+            raise
+        self._record(method, parameters, r_json)
+        if self.cache is not None:
+            self.cache.set(method, parameters, r_json)
+        return r_json
+
+    async def _post(self, method, parameters=None):
+        """
+        Handle authenticated POST requests
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The POST parameters
+        :type parameters: :py:class:`str`
+        :returns: The JSON output from the API
+        """
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, parameters)
+
+        data = self._build_post_data(method, parameters)
+        try:
+            r_json = await self._request(method, 'POST', self.post_url, **self._post_arguments(data))
+        except VoipMsError as e:
+            self._record(method, parameters, {"status": e.status}, 'POST')
+            raise
+        self._record(method, parameters, r_json, 'POST')
+        return r_json
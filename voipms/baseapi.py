@@ -1,3 +1,6 @@
+import importlib
+
+
 class BaseApi(object):
     """
     Simple class to buid path for entities
@@ -11,3 +14,48 @@ class BaseApi(object):
         """
         super(BaseApi, self).__init__()
         self._voipms_client = voipms_client
+
+
+class LazyEntity(object):
+    """
+    Attach an entity to a client or to a parent entity on first access
+
+    The module of the entity is imported and the entity is created the first
+    time the attribute is read, afterwards the instance is stored on the
+    owner and the descriptor is not involved any more. Clients with a
+    tracer get an entity with a span around every method.
+    """
+    def __init__(self, module, name):
+        """
+        :param module: Module of the entity (Example: 'voipms.entities.didsget')
+        :type module: :py:class:`str`
+        :param name: Class of the entity (Example: 'DidsGet')
+        :type name: :py:class:`str`
+        """
+        super(LazyEntity, self).__init__()
+        self.module = module
+        self.name = name
+        self.attribute = None
+
+    def __set_name__(self, owner, attribute):
+        self.attribute = attribute
+
+    def load(self):
+        """
+        Import the class of the entity
+
+        :returns: The entity class
+        """
+        return getattr(importlib.import_module(self.module), self.name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        client = instance._voipms_client if isinstance(instance, BaseApi) else instance
+        cls = self.load()
+        if getattr(client, "tracer", None) is not None:
+            from voipms.tracing import traced_class
+            cls = traced_class(cls)
+        entity = cls(client)
+        # Another thread may have been faster, everybody gets the same entity
+        return instance.__dict__.setdefault(self.attribute, entity)
@@ -0,0 +1,498 @@
+import argparse
+import copy
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+
+ONE_DAY = 24 * 60 * 60
+# Least recently used responses read at once when the on disk cache is full
+EVICT_STEP = 64
+
+# Reference data which changes rarely, in seconds
+DEFAULT_TTLS = {
+    # Accounts
+    "getAllowedCodecs": ONE_DAY,
+    "getAuthTypes": ONE_DAY,
+    "getDTMFModes": ONE_DAY,
+    "getDeviceTypes": ONE_DAY,
+    "getLockInternational": ONE_DAY,
+    "getNAT": ONE_DAY,
+    "getProtocols": ONE_DAY,
+    "getReportEstimatedHoldTime": ONE_DAY,
+    "getRoutes": ONE_DAY,
+    # Calls
+    "getCallBilling": ONE_DAY,
+    # Dids
+    "getCarriers": ONE_DAY,
+    "getDIDCountries": ONE_DAY,
+    "getInternationalTypes": ONE_DAY,
+    "getJoinWhenEmptyTypes": ONE_DAY,
+    "getProvinces": ONE_DAY,
+    "getRateCentersCAN": ONE_DAY,
+    "getRateCentersUSA": ONE_DAY,
+    "getRingStrategies": ONE_DAY,
+    "getStates": ONE_DAY,
+    "getVoicemailAttachmentFormats": ONE_DAY,
+    # Fax
+    "getFaxProvinces": ONE_DAY,
+    "getFaxRateCentersCAN": ONE_DAY,
+    "getFaxRateCentersUSA": ONE_DAY,
+    "getFaxStates": ONE_DAY,
+    # General
+    "getCountries": ONE_DAY,
+    "getLanguages": ONE_DAY,
+    "getLocales": ONE_DAY,
+    "getServersInfo": ONE_DAY,
+    # Voicemail
+    "getPlayInstructions": ONE_DAY,
+    "getTimezones": ONE_DAY,
+}
+
+MISSING = object()
+
+
+def make_key(method, parameters=None):
+    """
+    Cache key of an API call, independent of the order of the parameters
+
+    >>> make_key("getRateCentersUSA", {"state": "CO"})
+    ('getRateCentersUSA', 'state=CO')
+
+    :param method: The method call for the API
+    :type method: :py:class:`str`
+    :param parameters: The parameters of the call
+    :type parameters: :py:class:`dict`
+    :returns: :py:class:`tuple` of the method and the encoded parameters
+    """
+    return method, urlencode(sorted((parameters or {}).items()))
+
+
+class ResponseCache(object):
+    """
+    In memory LRU cache for API responses with a time to live per method
+
+    Only methods with a TTL are cached. Cached responses are copied on the way
+    out, so callers can modify what they get back.
+    """
+    def __init__(self, ttls=None, default_ttl=None, maxsize=1024):
+        """
+        :param ttls: Seconds to keep the responses of each method (Default: DEFAULT_TTLS)
+        :type ttls: :py:class:`dict`
+        :param default_ttl: Seconds to keep the responses of get* methods without their own TTL (Default: None, not cached)
+        :type default_ttl: :py:class:`float`
+        :param maxsize: Maximum number of responses kept (Default: 1024)
+        :type maxsize: :py:class:`int`
+        """
+        super(ResponseCache, self).__init__()
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("Maximum number of cached responses needs to be an int of at least 1")
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def ttl_for(self, method):
+        """
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :returns: Seconds to keep a response, None if the method is not cached
+        """
+        ttl = self.ttls.get(method)
+        if ttl is None and method.startswith("get"):
+            ttl = self.default_ttl
+        return ttl
+
+    def get(self, method, parameters=None):
+        """
+        Look up a cached response
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :returns: The cached JSON output or :data:`MISSING`
+        """
+        if self.ttl_for(method) is None:
+            return MISSING
+        key = make_key(method, parameters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def set(self, method, parameters, value):
+        """
+        Store a response if its method is cached
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :param value: The JSON output from the API
+        :type value: :py:class:`dict`
+        """
+        ttl = self.ttl_for(method)
+        if ttl is None:
+            return
+        key = make_key(method, parameters)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, method=None, parameters=None):
+        """
+        Drop cached responses
+
+        - Drops everything if no method is provided
+        - Drops all responses of a method if no parameters are provided
+        - Drops a single response if method and parameters are provided
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        """
+        with self._lock:
+            if method is None:
+                self._entries.clear()
+            elif parameters is None:
+                for key in [key for key in self._entries if key[0] == method]:
+                    del self._entries[key]
+            else:
+                self._entries.pop(make_key(method, parameters), None)
+
+    def clear(self):
+        """
+        Drop all cached responses
+        """
+        self.invalidate()
+
+    def reset_stats(self):
+        """
+        Reset all counters
+        """
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._expired = 0
+            self._evictions = 0
+
+    def stats(self):
+        """
+        Snapshot of the counters
+
+        :returns: :py:class:`dict` with the keys hits, misses, expired, evictions and size
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+            }
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On disk cache for API responses, shared by all processes using the same file
+
+    Uses the same keys and TTLs as :class:`ResponseCache`. Every thread gets
+    its own connection and SQLite serializes the writers, so concurrent
+    processes can read and fill the cache at the same time. A hit only
+    writes to the file when the last access time of the response is older
+    than touch_interval, so readers rarely wait for each other.
+    """
+    def __init__(self, path, ttls=None, default_ttl=None, maxsize=10000,
+                 max_bytes=None, busy_timeout=10.0, touch_interval=60.0):
+        """
+        :param path: Path of the SQLite database, created if it does not exist
+        :type path: :py:class:`str`
+        :param ttls: Seconds to keep the responses of each method (Default: DEFAULT_TTLS)
+        :type ttls: :py:class:`dict`
+        :param default_ttl: Seconds to keep the responses of get* methods without their own TTL (Default: None, not cached)
+        :type default_ttl: :py:class:`float`
+        :param maxsize: Maximum number of responses kept (Default: 10000)
+        :type maxsize: :py:class:`int`
+        :param max_bytes: Maximum total size of the stored responses in bytes (Default: None, no limit)
+        :type max_bytes: :py:class:`int`
+        :param busy_timeout: Seconds to wait for a lock held by another process (Default: 10.0)
+        :type busy_timeout: :py:class:`float`
+        :param touch_interval: Seconds before a hit updates the last access time used to evict responses again (Default: 60.0)
+        :type touch_interval: :py:class:`float`
+        """
+        super(SQLiteResponseCache, self).__init__(ttls, default_ttl, maxsize)
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+            raise ValueError("Maximum size of the cache in bytes needs to be a positive int")
+        if touch_interval < 0:
+            raise ValueError("Seconds between updates of the access time can not be negative")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "method TEXT NOT NULL, parameters TEXT NOT NULL, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL, "
+                "PRIMARY KEY (method, parameters))")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+            # Number and size of the responses, kept up to date by triggers so
+            # a set does not scan the table
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS totals ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), count INTEGER NOT NULL, size INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN "
+                "UPDATE totals SET count = count + 1, size = size + new.size; END")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN "
+                "UPDATE totals SET count = count - 1, size = size - old.size; END")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN "
+                "UPDATE totals SET size = size - old.size + new.size; END")
+            conn.execute("INSERT OR IGNORE INTO totals "
+                         "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _connection(self):
+        """
+        The SQLite connection of the current thread
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """
+        Close the connection of the current thread
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def get(self, method, parameters=None):
+        """
+        Look up a cached response
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :returns: The cached JSON output or :data:`MISSING`
+        """
+        if self.ttl_for(method) is None:
+            return MISSING
+        method, encoded = make_key(method, parameters)
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires, accessed FROM responses WHERE method = ? AND parameters = ?",
+                           (method, encoded)).fetchone()
+        with self._lock:
+            if row is None or row[1] < now:
+                self._misses += 1
+                if row is not None:
+                    self._expired += 1
+                return MISSING
+            self._hits += 1
+        if now - row[2] >= self.touch_interval:
+            with conn:
+                conn.execute("UPDATE responses SET accessed = ? WHERE method = ? AND parameters = ?",
+                             (now, method, encoded))
+        return json.loads(row[0])
+
+    def set(self, method, parameters, value):
+        """
+        Store a response if its method is cached and evict what no longer fits
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :param value: The JSON output from the API
+        :type value: :py:class:`dict`
+        """
+        ttl = self.ttl_for(method)
+        if ttl is None:
+            return
+        method, encoded = make_key(method, parameters)
+        data = json.dumps(value)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            # Not INSERT OR REPLACE, the rows it replaces do not fire the delete trigger
+            conn.execute("DELETE FROM responses WHERE method = ? AND parameters = ?", (method, encoded))
+            conn.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                         (method, encoded, data, len(data), now + ttl, now))
+            evicted = self._evict(conn, now)
+        with self._lock:
+            self._evictions += evicted
+
+    def _over_limits(self, count, size):
+        return count > self.maxsize or (self.max_bytes is not None and size > self.max_bytes)
+
+    def _evict(self, conn, now):
+        """
+        Drop expired responses and the least recently used ones above the limits
+
+        The least recently used responses are read EVICT_STEP at a time from
+        the index on the access time, never the whole table.
+
+        :returns: Number of dropped responses which had not expired
+        """
+        conn.execute("DELETE FROM responses WHERE expires < ?", (now,))
+        evicted = 0
+        count, size = conn.execute("SELECT count, size FROM totals").fetchone()
+        while self._over_limits(count, size):
+            rows = conn.execute("SELECT rowid, size FROM responses ORDER BY accessed LIMIT ?",
+                                (max(count - self.maxsize, EVICT_STEP),)).fetchall()
+            if not rows:
+                break
+            dropped = []
+            for rowid, row_size in rows:
+                if not self._over_limits(count, size):
+                    break
+                dropped.append((rowid,))
+                count -= 1
+                size -= row_size
+            conn.executemany("DELETE FROM responses WHERE rowid = ?", dropped)
+            evicted += len(dropped)
+        return evicted
+
+    def invalidate(self, method=None, parameters=None):
+        """
+        Drop cached responses
+
+        - Drops everything if no method is provided
+        - Drops all responses of a method if no parameters are provided
+        - Drops a single response if method and parameters are provided
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :returns: Number of dropped responses
+        """
+        conn = self._connection()
+        with conn:
+            if method is None:
+                cursor = conn.execute("DELETE FROM responses")
+            elif parameters is None:
+                cursor = conn.execute("DELETE FROM responses WHERE method = ?", (method,))
+            else:
+                cursor = conn.execute("DELETE FROM responses WHERE method = ? AND parameters = ?",
+                                      make_key(method, parameters))
+        return cursor.rowcount
+
+    def purge_expired(self):
+        """
+        Drop all expired responses
+
+        :returns: Number of dropped responses
+        """
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),)).rowcount
+
+    def entries(self, method=None):
+        """
+        List the cached responses without their content
+
+        :param method: Only list responses of this method
+        :type method: :py:class:`str`
+        :returns: :py:class:`list` of dicts with the keys method, parameters, size, expires and accessed
+        """
+        query = "SELECT method, parameters, size, expires, accessed FROM responses"
+        arguments = ()
+        if method is not None:
+            query += " WHERE method = ?"
+            arguments = (method,)
+        query += " ORDER BY method, parameters"
+        keys = ("method", "parameters", "size", "expires", "accessed")
+        return [dict(zip(keys, row)) for row in self._connection().execute(query, arguments)]
+
+    def stats(self):
+        """
+        Snapshot of the counters of this process and the size of the shared cache
+
+        :returns: :py:class:`dict` with the keys hits, misses, expired, evictions, size and bytes
+        """
+        count, size = self._connection().execute("SELECT count, size FROM totals").fetchone()
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "size": count,
+                "bytes": size,
+            }
+
+
+def main(argv=None):
+    """
+    Inspect and purge an on disk response cache
+
+    Usage: python -m voipms.cache PATH {stats,list,purge} [--method METHOD] [--expired]
+    """
+    parser = argparse.ArgumentParser(prog="python -m voipms.cache",
+                                     description="Inspect and purge a voipms SQLite response cache")
+    parser.add_argument("path", help="Path of the SQLite database")
+    parser.add_argument("command", choices=("stats", "list", "purge"))
+    parser.add_argument("--method", help="Only list or purge responses of this API method")
+    parser.add_argument("--expired", action="store_true", help="Only purge expired responses")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error("{} does not exist".format(args.path))
+    cache = SQLiteResponseCache(args.path)
+    if args.command == "stats":
+        stats = cache.stats()
+        print("responses: {}\nbytes: {}".format(stats["size"], stats["bytes"]))
+    elif args.command == "list":
+        now = time.time()
+        for entry in cache.entries(args.method):
+            print("{method}\t{parameters}\t{size}\t{ttl}".format(
+                ttl=int(entry["expires"] - now), **entry))
+    elif args.expired:
+        print("purged {} expired responses".format(cache.purge_expired()))
+    else:
+        print("purged {} responses".format(cache.invalidate(args.method)))
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Record the API calls of a client and replay them without network
+
+A cassette is a gzip compressed file with one JSON document per line and
+per API call: the method, its parameters and the decoded response. Error
+statuses are recorded too and raised again on replay. The credentials of
+the client and parameters like passwords are scrubbed before anything is
+written.
+
+    with Cassette("incident.jsonl.gz", mode="record") as cassette:
+        client = VoipMs(user, password, cassette=cassette)
+        client.dids.get.dids_info()
+
+    client = VoipMs("user", "password", cassette=Cassette("incident.jsonl.gz"))
+    client.dids.get.dids_info()  # served from the cassette
+
+Replayed calls skip the rate limiter, the retries and the network, so a
+client replaying a cassette serves many thousands of calls per second.
+"""
+import gzip
+import json
+import threading
+
+from .cache import make_key
+
+MODES = ("record", "replay")
+
+SCRUBBED = "[scrubbed]"
+# Parameters and response fields which are never written
+SCRUBBED_KEYS = frozenset(("api_username", "api_password", "password"))
+
+
+class CassetteMiss(KeyError):
+    """
+    A replayed API call which is not on the cassette
+    """
+
+
+def _scrub(value, secrets):
+    """
+    Copy of a decoded JSON document without credentials
+
+    >>> _scrub({"account": "100000_VoIP", "password": "hunter2", "note": "hunter2"}, ("hunter2",))
+    {'account': '100000_VoIP', 'password': '[scrubbed]', 'note': '[scrubbed]'}
+    """
+    if isinstance(value, dict):
+        return {key: SCRUBBED if key in SCRUBBED_KEYS else _scrub(item, secrets)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub(item, secrets) for item in value]
+    if isinstance(value, str):
+        for secret in secrets:
+            value = value.replace(secret, SCRUBBED)
+    return value
+
+
+class Cassette(object):
+    """
+    Recorded API calls, keyed by method and normalized parameters
+
+    Calls are replayed in the order they were recorded. A call made more
+    often than it was recorded gets the last recorded response again.
+
+    :param path: Path of the cassette file (Example: 'fixtures/cdr.jsonl.gz')
+    :type path: :py:class:`str`
+    :param mode: 'record' to write a new cassette, 'replay' to serve one (Default: 'replay')
+    :type mode: :py:class:`str`
+    """
+    def __init__(self, path, mode="replay"):
+        super(Cassette, self).__init__()
+        if mode not in MODES:
+            raise ValueError("Mode of the cassette needs to be one of: {}".format(", ".join(MODES)))
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._file = None
+        # key -> [position of the next replay, response bodies]
+        self._calls = {}
+        if mode == "record":
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return sum(len(bodies) for _, bodies in self._calls.values())
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                call = json.loads(line)
+                key = make_key(call["method"], call["parameters"])
+                body = json.dumps(call["response"]).encode("utf-8")
+                self._calls.setdefault(key, [0, []])[1].append(body)
+
+    def _normalize(self, parameters, secrets):
+        """
+        The parameters as written to the cassette: scrubbed and as str
+        """
+        parameters = _scrub(dict(parameters or {}), secrets)
+        return {key: str(value) for key, value in parameters.items()}
+
+    def record(self, method, parameters, response, http_method="GET", secrets=()):
+        """
+        Write one API call
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :param response: The decoded JSON output, or {'status': error} for an error status
+        :type response: :py:class:`dict`
+        :param http_method: 'GET' or 'POST' (Default: 'GET')
+        :type http_method: :py:class:`str`
+        :param secrets: Strings replaced everywhere, like the API user and password
+        :type secrets: :py:class:`tuple`
+        """
+        if self._file is None:
+            raise ValueError("Cassette {} is not recording".format(self.path))
+        secrets = [secret for secret in secrets if secret]
+        line = json.dumps({
+            "method": method,
+            "http_method": http_method,
+            "parameters": self._normalize(parameters, secrets),
+            "response": _scrub(response, secrets),
+        }, sort_keys=True)
+        with self._lock:
+            self._file.write(line + "\n")
+            # Keep every call readable if the process dies before close()
+            self._file.flush()
+
+    def play(self, method, parameters, secrets=()):
+        """
+        The recorded response body of an API call
+
+        The call is looked up with its parameters as they are, the
+        credentials of the replaying client are not scrubbed from them, they
+        can be anything (Example: 'user' and 'password'). Only a call that
+        is not found is looked up again with secrets scrubbed, for parameters
+        which held the credentials of the recording client.
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :param secrets: The credentials of the replaying client
+        :type secrets: :py:class:`tuple`
+        :returns: :py:class:`bytes` of the JSON output
+        :raises CassetteMiss: If the call was not recorded
+        """
+        key = make_key(method, self._normalize(parameters, ()))
+        secrets = [secret for secret in secrets if secret]
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is None and secrets:
+                entry = self._calls.get(make_key(method, self._normalize(parameters, secrets)))
+            if entry is None:
+                raise CassetteMiss("No recorded response for {} {}".format(*key))
+            position, bodies = entry
+            if position < len(bodies) - 1:
+                entry[0] = position + 1
+        return bodies[position]
+
+    def rewind(self):
+        """
+        Replay every call from its first recorded response again
+        """
+        with self._lock:
+            for entry in self._calls.values():
+                entry[0] = 0
+
+    def close(self):
+        """
+        Finish writing a recorded cassette
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+class SendCheckpoint(object):
+    """
+    Journal of a bulk send, so an interrupted run can resume where it stopped
+
+    Every message part is recorded as sending before it is sent and as sent
+    or failed afterwards. Each record is flushed to disk before the API call
+    goes out, so a part that was sending when the run crashed is never sent
+    again, it is reported as unconfirmed instead. Failed parts are sent again.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "campaign.jsonl")
+    >>> with SendCheckpoint(path) as checkpoint:
+    ...     checkpoint.begin(0, 0)
+    ...     checkpoint.finish(0, 0, SENT, "23208")
+    >>> SendCheckpoint(path).state(0, 0)
+    ('sent', '23208')
+    """
+    def __init__(self, path, fsync=True):
+        """
+        :param path: Path of the journal file, created if it does not exist
+        :type path: :py:class:`str`
+        :param fsync: Force every record to disk (Default: True)
+        :type fsync: :py:class:`bool`
+        """
+        super(SendCheckpoint, self).__init__()
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._states = {}
+        if os.path.exists(path):
+            with open(path) as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    self._states[(record["index"], record["part"])] = (record["state"], record.get("sms"))
+        self._journal = open(path, "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def state(self, index, part):
+        """
+        State of a message part in the journal
+
+        :param index: Position of the message in the bulk send
+        :type index: :py:class:`int`
+        :param part: Position of the part in the message
+        :type part: :py:class:`int`
+        :returns: :py:class:`tuple` of the state and the SMS id, (None, None) if it was never sent
+        """
+        with self._lock:
+            return self._states.get((index, part), (None, None))
+
+    def _write(self, index, part, state, sms=None):
+        record = {"index": index, "part": part, "state": state}
+        if sms is not None:
+            record["sms"] = sms
+        with self._lock:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._states[(index, part)] = (state, sms)
+
+    def begin(self, index, part):
+        """
+        Record that a message part is about to be sent
+        """
+        self._write(index, part, SENDING)
+
+    def finish(self, index, part, state, sms=None):
+        """
+        Record the outcome of a message part
+
+        :param state: 'sent' or 'failed'
+        :type state: :py:class:`str`
+        :param sms: ID of the sent SMS
+        :type sms: :py:class:`str`
+        """
+        self._write(index, part, state, sms)
+
+    def close(self):
+        """
+        Close the journal file
+        """
+        with self._lock:
+            if not self._journal.closed:
+                self._journal.close()
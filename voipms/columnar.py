@@ -0,0 +1,204 @@
+"""
+Column-oriented Call Detail Records backed by NumPy arrays
+
+Reducing a month of CDR into totals per account or per call type walks
+every row dict once per question. CdrColumns converts the rows once into
+one array per field, the repeated strings into integer codes, and answers
+the group-by totals with numpy.bincount.
+"""
+import inspect
+
+_UNLOADED = object()
+numpy = _UNLOADED
+
+
+def require_numpy():
+    """
+    Import numpy on first use
+
+    :returns: The numpy module
+    :raises ImportError: If numpy is not installed
+    """
+    global numpy
+    if numpy is _UNLOADED:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    if numpy is None:
+        raise ImportError("Columnar CDR need numpy, install it with: pip install voipms[columnar]")
+    return numpy
+
+
+def _duration_seconds(value):
+    """
+    >>> _duration_seconds("01:02:03"), _duration_seconds("")
+    (3723, 0)
+    """
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Categorical(object):
+    """
+    A string column stored as integer codes into its distinct values
+
+    :param categories: The distinct values, sorted
+    :type categories: :py:class:`numpy.ndarray`
+    :param codes: Index into categories of every row
+    :type codes: :py:class:`numpy.ndarray`
+    """
+    def __init__(self, categories, codes):
+        super(Categorical, self).__init__()
+        self.categories = categories
+        self.codes = codes
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Encode a sequence of strings
+
+        :param values: One string per row, None is stored as ''
+        :type values: :py:class:`list`
+        :returns: :class:`Categorical`
+        """
+        require_numpy()
+        values = numpy.array(["" if value is None else value for value in values], dtype=object)
+        if not len(values):
+            return cls(numpy.array([], dtype=object), numpy.array([], dtype=numpy.intp))
+        categories, codes = numpy.unique(values.astype(str), return_inverse=True)
+        return cls(categories.astype(object), codes.reshape(-1))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.categories[self.codes[index]]
+
+    def values(self):
+        """
+        :returns: :py:class:`numpy.ndarray` of the decoded strings
+        """
+        return self.categories[self.codes]
+
+
+class CdrColumns(object):
+    """
+    Call Detail Records as one NumPy array per field
+
+    - date: datetime64[s]
+    - duration, seconds: int64 seconds
+    - rate, total: float64
+    - account, disposition, description, destination_type: :class:`Categorical`
+    - callerid, destination, uniqueid: object arrays
+
+    The call type of a call is its description (Example: 'Inbound DID'),
+    the value the calltype filter of getCDR selects on.
+    """
+    CATEGORICAL = ("account", "disposition", "description", "destination_type")
+    TEXT = ("callerid", "destination", "uniqueid")
+
+    def __init__(self, columns):
+        """
+        :param columns: The arrays by field name
+        :type columns: :py:class:`dict`
+        """
+        super(CdrColumns, self).__init__()
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Convert the rows of a getCDR or getResellerCDR response
+
+        :param rows: The CDR as decoded from JSON
+        :type rows: :py:class:`list` of :py:class:`dict`
+        :returns: :class:`CdrColumns`
+        """
+        require_numpy()
+        rows = list(rows)
+        columns = {
+            "date": numpy.array([row.get("date") or "NaT" for row in rows], dtype="datetime64[s]"),
+            "duration": numpy.array([_duration_seconds(row.get("duration")) for row in rows], dtype=numpy.int64),
+            "seconds": numpy.array([int(_number(row.get("seconds"))) for row in rows], dtype=numpy.int64),
+            "rate": numpy.array([_number(row.get("rate")) for row in rows], dtype=numpy.float64),
+            "total": numpy.array([_number(row.get("total")) for row in rows], dtype=numpy.float64),
+        }
+        for name in cls.CATEGORICAL:
+            columns[name] = Categorical.from_values([row.get(name) for row in rows])
+        for name in cls.TEXT:
+            columns[name] = numpy.array([row.get(name) for row in rows], dtype=object)
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.columns["date"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def group_totals(self, by):
+        """
+        Number of calls, seconds and total cost per value of a categorical column
+
+        :param by: Name of the column (Example: 'account')
+        :type by: :py:class:`str`
+        :returns: :py:class:`dict` of value to a dict with the keys calls, seconds and total
+        """
+        if by not in self.CATEGORICAL:
+            raise ValueError("Totals can only be grouped by: {}".format(", ".join(self.CATEGORICAL)))
+        column = self.columns[by]
+        size = len(column.categories)
+        calls = numpy.bincount(column.codes, minlength=size)
+        seconds = numpy.bincount(column.codes, weights=self.columns["seconds"], minlength=size)
+        total = numpy.bincount(column.codes, weights=self.columns["total"], minlength=size)
+        return {
+            category: {"calls": int(calls[code]), "seconds": int(seconds[code]), "total": float(total[code])}
+            for code, category in enumerate(column.categories)
+        }
+
+    def totals_per_account(self):
+        """
+        :returns: :py:class:`dict` of account to its calls, seconds and total
+        """
+        return self.group_totals("account")
+
+    def totals_per_calltype(self):
+        """
+        :returns: :py:class:`dict` of call type (description) to its calls, seconds and total
+        """
+        return self.group_totals("description")
+
+
+def with_columns(response, key="cdr"):
+    """
+    Turn the rows under key of an API response into :class:`CdrColumns`
+
+    Works on the awaitable of an asynchronous client as well.
+
+    :param response: The response of the API call or its awaitable
+    :type response: :py:class:`dict`
+    :returns: :class:`CdrColumns` or an awaitable of it
+    """
+    require_numpy()
+    if inspect.isawaitable(response):
+        async def convert():
+            return CdrColumns.from_rows((await response).get(key, []))
+        return convert()
+    return CdrColumns.from_rows(response.get(key, []))
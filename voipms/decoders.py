@@ -0,0 +1,59 @@
+"""
+JSON decoders for the responses of the voip.ms API
+
+The decoders take the raw bytes of a response body. orjson and ujson parse
+them directly, the standard library detects the encoding and decodes them
+itself.
+"""
+import importlib
+import json
+
+# Fastest first, used when no decoder is asked for
+DECODERS = ("orjson", "ujson", "json")
+
+_default = None
+
+
+def _loads(name):
+    """
+    The loads function of a JSON library, None if it is not installed
+    """
+    if name not in DECODERS:
+        raise ValueError("JSON decoder needs to be one of: {}".format(", ".join(DECODERS)))
+    if name == "json":
+        return json.loads
+    try:
+        return importlib.import_module(name).loads
+    except ImportError:
+        return None
+
+
+def available_decoders():
+    """
+    Names of the installed JSON decoders, fastest first
+
+    :returns: :py:class:`list` of :py:class:`str`
+    """
+    return [name for name in DECODERS if _loads(name) is not None]
+
+
+def get_decoder(name=None):
+    """
+    A function decoding a JSON document from bytes
+
+    >>> get_decoder("json")(b'{"status": "success"}')
+    {'status': 'success'}
+
+    :param name: 'orjson', 'ujson' or 'json' (Default: None, the fastest installed one)
+    :type name: :py:class:`str`
+    :returns: :py:class:`callable`
+    """
+    global _default
+    if name is None:
+        if _default is None:
+            _default = next(loads for loads in map(_loads, DECODERS) if loads is not None)
+        return _default
+    loads = _loads(name)
+    if loads is None:
+        raise ValueError("JSON decoder {} is not installed".format(name))
+    return loads
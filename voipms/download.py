@@ -0,0 +1,344 @@
+"""
+Files returned base64 encoded inside JSON, decoded straight to disk
+
+Methods like getFaxMessagePDF answer with the file as a base64 string in
+the JSON document. Base64Extractor reads the response in chunks, finds the
+string and decodes it piece by piece into a file, so memory does not grow
+with the size of the file. open_target writes to a temporary file next to
+the destination and renames it once the file is complete.
+
+    client.fax.get.download_fax_message_pdf_to(fax_id, "fax.pdf")
+"""
+import base64
+import contextlib
+import json
+import os
+import re
+import stat
+import uuid
+
+# Bytes of the response read at once
+CHUNK_SIZE = 64 * 1024
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPEN_OBJECT = ord("{")
+_OPEN_ARRAY = ord("[")
+_CLOSE = (ord("}"), ord("]"))
+_COLON = ord(":")
+_COMMA = ord(",")
+
+# JSON escapes which are not part of the base64 alphabet: line breaks and tabs
+_WHITESPACE_ESCAPES = re.compile(rb"\\[rnt]")
+_NOT_BASE64 = re.compile(rb"[^A-Za-z0-9+/]")
+
+
+class Base64Writer(object):
+    """
+    Decode base64 fed in pieces of any length and write the bytes
+
+    Whitespace and a data URL header (Example: 'data:audio/mpeg;base64,')
+    are skipped.
+
+    >>> import io
+    >>> output = io.BytesIO()
+    >>> writer = Base64Writer(output.write)
+    >>> for piece in (b"data:text/plain;ba", b"se64,aGVsbG8", b"gd29y\\nbGQ="):
+    ...     writer.feed(piece)
+    >>> writer.close(), output.getvalue()
+    (11, b'hello world')
+    """
+    def __init__(self, write):
+        super(Base64Writer, self).__init__()
+        self._write = write
+        self._pending = b""
+        self._header = True
+        self.size = 0
+
+    def feed(self, text):
+        data = self._pending + text
+        if self._header:
+            if data[:5] != b"data:"[:len(data)]:
+                self._header = False
+            elif len(data) >= 5:
+                comma = data.find(b",")
+                if comma < 0:
+                    self._pending = data
+                    return
+                data = data[comma + 1:]
+                self._header = False
+            else:
+                self._pending = data
+                return
+        data = _NOT_BASE64.sub(b"", data)
+        usable = len(data) - len(data) % 4
+        if usable:
+            self._output(data[:usable])
+        self._pending = data[usable:]
+
+    def _output(self, data):
+        decoded = base64.b64decode(data)
+        self.size += len(decoded)
+        self._write(decoded)
+
+    def close(self):
+        """
+        Write the rest of the data
+
+        :returns: :py:class:`int` bytes written
+        """
+        if self._header:
+            self._header = False
+            self.feed(b"")
+        if self._pending:
+            self._output(self._pending + b"=" * (-len(self._pending) % 4))
+            self._pending = b""
+        return self.size
+
+
+class Base64Extractor(object):
+    """
+    Find the base64 file in a JSON response fed in chunks and decode it
+
+    The first string under one of keys, at any depth, is decoded and written,
+    every other string is skipped without being kept. The top level status
+    is checked once the response is complete.
+
+    :param keys: Keys of the file in the response (Example: ('message_base64',))
+    :type keys: :py:class:`tuple`
+    :param write: Called with the decoded bytes
+    :type write: :py:class:`callable`
+    :param check_status: Called with the status of the response, raises if it is an error
+    :type check_status: :py:class:`callable`
+
+    >>> import io
+    >>> output = io.BytesIO()
+    >>> extractor = Base64Extractor(("data",), output.write, lambda status: None)
+    >>> for chunk in (b'{"status": "success", "recording": {"name": "a\\\\"b", "da', b'ta": "aGk\\\\/", "x": 1}}'):
+    ...     extractor.feed(chunk)
+    >>> extractor.close(), output.getvalue()
+    (3, b'hi?')
+    """
+    def __init__(self, keys, write, check_status):
+        super(Base64Extractor, self).__init__()
+        self.keys = frozenset(keys)
+        self.writer = None
+        self._new_writer = lambda: Base64Writer(write)
+        self._check_status = check_status
+        self._stack = []
+        self._expect_key = False
+        self._key = None
+        # In a string: 'key', 'status', 'file' or 'skip', else None
+        self._string = None
+        self._raw = b""
+        self._backslashes = 0
+        self.status = None
+
+    def feed(self, chunk):
+        position, length = 0, len(chunk)
+        while position < length:
+            if self._string is not None:
+                position = self._feed_string(chunk, position)
+                continue
+            byte = chunk[position]
+            position += 1
+            if byte == _QUOTE:
+                self._string = self._string_kind()
+                self._raw = b""
+                self._backslashes = 0
+            elif byte == _OPEN_OBJECT:
+                self._stack.append(byte)
+                self._expect_key = True
+            elif byte == _OPEN_ARRAY:
+                self._stack.append(byte)
+                self._expect_key = False
+            elif byte in _CLOSE:
+                if self._stack:
+                    self._stack.pop()
+                self._expect_key = False
+            elif byte == _COLON:
+                self._expect_key = False
+            elif byte == _COMMA:
+                self._expect_key = bool(self._stack) and self._stack[-1] == _OPEN_OBJECT
+
+    def _string_kind(self):
+        if self._expect_key:
+            return "key"
+        if self._key == "status" and len(self._stack) == 1:
+            return "status"
+        if self._key in self.keys and self.writer is None:
+            self.writer = self._new_writer()
+            return "file"
+        return "skip"
+
+    def _closing_quote(self, chunk, start):
+        """
+        Position of the quote ending the string, -1 if it goes on after chunk
+        """
+        position = start
+        while True:
+            quote = chunk.find(b'"', position)
+            if quote < 0:
+                return -1
+            backslashes = 0
+            index = quote - 1
+            while index >= start and chunk[index] == _BACKSLASH:
+                backslashes += 1
+                index -= 1
+            if index < start:
+                backslashes += self._backslashes
+            if backslashes % 2 == 0:
+                return quote
+            position = quote + 1
+
+    def _feed_string(self, chunk, start):
+        quote = self._closing_quote(chunk, start)
+        end = len(chunk) if quote < 0 else quote
+        piece = chunk[start:end]
+        if quote < 0:
+            trailing = len(piece) - len(piece.rstrip(b"\\"))
+            self._backslashes = trailing + self._backslashes if trailing == len(piece) else trailing
+        kind = self._string
+        if kind == "file":
+            self._feed_file(piece, quote < 0)
+        elif kind != "skip":
+            self._raw += piece
+        if quote < 0:
+            return end
+        self._string = None
+        if kind == "key":
+            self._key = json.loads(b'"' + self._raw + b'"')
+        elif kind == "status":
+            self.status = json.loads(b'"' + self._raw + b'"')
+        return quote + 1
+
+    def _feed_file(self, piece, more):
+        piece = self._raw + piece
+        self._raw = b""
+        if more and self._backslashes % 2:
+            # The escape goes on in the next chunk
+            piece, self._raw = piece[:-1], b"\\"
+        self.writer.feed(_WHITESPACE_ESCAPES.sub(b"", piece).replace(b"\\/", b"/"))
+
+    def close(self):
+        """
+        Check the status and write the end of the file
+
+        :returns: :py:class:`int` bytes written
+        :raises ValueError: If the response has no file
+        """
+        self._check_status(self.status)
+        if self.writer is None:
+            raise ValueError("The response has no file under any of: {}".format(", ".join(sorted(self.keys))))
+        return self.writer.close()
+
+
+def _find_string(document, keys):
+    if isinstance(document, dict):
+        for key, value in document.items():
+            if key in keys and isinstance(value, str):
+                return value
+            found = _find_string(value, keys)
+            if found is not None:
+                return found
+    elif isinstance(document, list):
+        for value in document:
+            found = _find_string(value, keys)
+            if found is not None:
+                return found
+    return None
+
+
+def decode_document(document, keys, write):
+    """
+    Decode the base64 file of an already decoded response in chunks
+
+    :param document: The JSON output from the API
+    :type document: :py:class:`dict`
+    :param keys: Keys of the file in the response (Example: ('message_base64',))
+    :type keys: :py:class:`tuple`
+    :param write: Called with the decoded bytes
+    :type write: :py:class:`callable`
+    :returns: :py:class:`int` bytes written
+    """
+    text = _find_string(document or {}, frozenset(keys))
+    if text is None:
+        raise ValueError("The response has no file under any of: {}".format(", ".join(sorted(keys))))
+    writer = Base64Writer(write)
+    for start in range(0, len(text), CHUNK_SIZE):
+        writer.feed(text[start:start + CHUNK_SIZE].encode("ascii", "ignore"))
+    return writer.close()
+
+
+def _create_temporary(path):
+    """
+    Create a new file next to path for its download
+
+    Unlike tempfile.mkstemp, which creates files only the owner can read,
+    the file is created like open() does, with the umask applied, or gets
+    the mode of path if it exists.
+
+    :returns: :py:class:`tuple` of the file descriptor and the path of the file
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        temporary = os.path.join(directory, ".{}.{}.part".format(name, uuid.uuid4().hex[:8]))
+        try:
+            descriptor = os.open(temporary, flags, 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        os.chmod(temporary, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+        pass
+    except BaseException:
+        os.close(descriptor)
+        os.unlink(temporary)
+        raise
+    return descriptor, temporary
+
+
+@contextlib.contextmanager
+def open_target(target):
+    """
+    Open the destination of a download
+
+    A path is written to a temporary file in the same directory which
+    replaces the path once the download is complete, and is removed if it
+    fails, so the path is either the old or the whole new file. The file
+    gets the permissions of the file it replaces, or those of a new file
+    opened with open(path, 'wb'). A binary file object is written to
+    directly and truncated back to its position if the download fails and
+    it can seek.
+
+    :param target: Path of the file, or a binary file object
+    :type target: :py:class:`str` or :py:class:`io.BufferedIOBase`
+    :returns: Context manager of the binary file object to write
+    """
+    if hasattr(target, "write"):
+        start = target.tell() if hasattr(target, "seekable") and target.seekable() else None
+        try:
+            yield target
+        except BaseException:
+            if start is not None:
+                target.seek(start)
+                target.truncate()
+            raise
+        return
+
+    path = os.fspath(target)
+    descriptor, temporary = _create_temporary(path)
+    try:
+        with os.fdopen(descriptor, "wb") as output:
+            yield output
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
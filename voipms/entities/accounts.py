@@ -4,23 +4,19 @@ The Accounts API endpoint
 
 Documentation: https://voip.ms/m/apidocs.php
 """
-from voipms.baseapi import BaseApi
-from voipms.entities.accountsadd import AccountsAdd
-from voipms.entities.accountscreate import AccountsCreate
-from voipms.entities.accountsdelete import AccountsDelete
-from voipms.entities.accountsget import AccountsGet
-from voipms.entities.accountsset import AccountsSet
+from voipms.baseapi import BaseApi, LazyEntity
 
 
 class Accounts(BaseApi):
+    add = LazyEntity("voipms.entities.accountsadd", "AccountsAdd")
+    create = LazyEntity("voipms.entities.accountscreate", "AccountsCreate")
+    delete = LazyEntity("voipms.entities.accountsdelete", "AccountsDelete")
+    get = LazyEntity("voipms.entities.accountsget", "AccountsGet")
+    set = LazyEntity("voipms.entities.accountsset", "AccountsSet")
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the endpoint
         """
         super(Accounts, self).__init__(*args, **kwargs)
         self.endoint = 'accounts'
-        self.add = AccountsAdd(self)
-        self.create = AccountsCreate(self)
-        self.delete = AccountsDelete(self)
-        self.get = AccountsGet(self)
-        self.set = AccountsSet(self)
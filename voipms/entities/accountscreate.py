@@ -8,6 +8,43 @@ import socket
 
 from voipms.baseapi import BaseApi
 from voipms.helpers import validate_date, convert_bool
+from voipms.schema import Field, Schema
+
+
+def _validate_ip(ip):
+    try:
+        socket.inet_aton(ip)
+    except socket.error:
+        raise ValueError("The provided IP: {} is not in the correct format (Example: 127.0.0.1)".format(ip))
+    return True
+
+
+CREATE_SUB_ACCOUNT = Schema("createSubAccount", [
+    Field("username", str, "Username", required=True),
+    Field("password", str, "Sub Account Password", "For Password Authentication", required=True),
+    Field("protocol", int, "Protocol value", "Values from accounts.get_protocols", required=True),
+    Field("auth_type", int, "Auth type value", "Values from accounts.get_auth_types", required=True),
+    Field("device_type", int, "Device type value", "Values from accounts.get_device_types", required=True),
+    Field("lock_international", int, "Lock International Code value",
+          "Values from accounts.get_lock_international", required=True),
+    Field("international_route", int, "Route Code value", "Values from accounts.get_routes", required=True),
+    Field("music_on_hold", str, "Music on Hold Code value", "Values from accounts.get_music_on_hold", required=True),
+    Field("allowed_codecs", str, "List of Allowed Codecs value", "Values from accounts.get_allowed_codecs",
+          required=True),
+    Field("dtmf_mode", str, "DTMF Mode Code", "Values from accounts.get_dtmf_modes", required=True),
+    Field("nat", str, "NAT Mode Code", "Values from accounts.get_nat", required=True),
+    Field("description", str, "Sub Account Description", "Example: 'VoIP Account'"),
+    Field("ip", str, "Sub Account IP", "For IP Authentication", check=_validate_ip),
+    Field("callerid_number", str, "Caller ID Override"),
+    Field("canada_routing", int, "Route Code", "Values from accounts.get_routes"),
+    Field("internal_extension", int, "Sub Account Internal Extension", "Example: 1 -> Creates 101"),
+    Field("internal_voicemail", int, "Sub Account Internal Voicemail", "Example: 101"),
+    Field("internal_dialtime", int, "Sub Account Internal Dialtime", "Example: 60 -> seconds"),
+    Field("reseller_client", int, "Reseller Account ID", "Example: 561115"),
+    Field("reseller_package", int, "Reseller Package", "Example: 92364"),
+    Field("reseller_nextbilling", str, "Reseller Next Billing Date", "Example: '2012-12-31'", check=validate_date),
+    Field("reseller_chargesetup", bool, "Charge Package Setup Fee after Save", "True/False", convert=convert_bool),
+])
 
 
 class AccountsCreate(BaseApi):
@@ -80,40 +117,7 @@ class AccountsCreate(BaseApi):
         """
         method = "createSubAccount"
 
-        if not isinstance(username, str):
-            raise ValueError("Username needs to be a str")
-
-        if not isinstance(password, str):
-            raise ValueError("Sub Account Password needs to be a str (For Password Authentication)")
-
-        if not isinstance(protocol, int):
-            raise ValueError("Protocol value needs to be an int (Values from accounts.get_protocols)")
-
-        if not isinstance(auth_type, int):
-            raise ValueError("Auth type value needs to be an int (Values from accounts.get_auth_types)")
-
-        if not isinstance(device_type, int):
-            raise ValueError("Device type value needs to be an int (Values from accounts.get_device_types)")
-
-        if not isinstance(lock_international, int):
-            raise ValueError("Lock International Code value needs to be an int (Values from accounts.get_lock_international)")
-
-        if not isinstance(international_route, int):
-            raise ValueError("Route Code value needs to be an int (Values from accounts.get_routes)")
-
-        if not isinstance(music_on_hold, str):
-            raise ValueError("Music on Hold Code value needs to be str (Values from accounts.get_music_on_hold)")
-
-        if not isinstance(allowed_codecs, str):
-            raise ValueError("List of Allowed Codecs value needs to be str (Values from accounts.get_allowed_codecs)")
-
-        if not isinstance(dtmf_mode, str):
-            raise ValueError("DTMF Mode Code (Values from needs to be str accounts.get_dtmf_modes)")
-
-        if not isinstance(nat, str):
-            raise ValueError("DTMF Mode Code (Values from needs to be str accounts.get_nat)")
-
-        parameters = {
+        kwargs.update({
             "username": username,
             "password": password,
             "protocol": protocol,
@@ -125,74 +129,7 @@ class AccountsCreate(BaseApi):
             "allowed_codecs": allowed_codecs,
             "dtmf_mode": dtmf_mode,
             "nat": nat,
-        }
-
-        if "description" in kwargs:
-            if not isinstance(kwargs["description"], str):
-                raise ValueError("Sub Account Description needs to be a str (Example: 'VoIP Account')")
-            parameters["description"] = kwargs.pop("description")
-
-        if "ip" in kwargs:
-            ip = kwargs["ip"]
-            if not isinstance(ip, str):
-                raise ValueError("Sub Account IP needs to be a str (For IP Authentication)")
-            try:
-                socket.inet_aton(ip)
-            except socket.error:
-                raise ValueError("The provided IP: {} is not in the correct format (Example: 127.0.0.1)".format(ip))
-            parameters["ip"] = kwargs.pop("ip")
-
-        if "callerid_number" in kwargs:
-            if not isinstance(kwargs["callerid_number"], str):
-                raise ValueError("Caller ID Override needs to be a str")
-            parameters["callerid_number"] = kwargs.pop("callerid_number")
-
-        if "canada_routing" in kwargs:
-            if not isinstance(kwargs["canada_routing"], int):
-                raise ValueError("Route Code needs to be an int (Values from accounts.get_routes)")
-            parameters["canada_routing"] = kwargs.pop("canada_routing")
-
-        if "internal_extension" in kwargs:
-            if not isinstance(kwargs["internal_extension"], int):
-                raise ValueError("Sub Account Internal Extension needs to be an int (Example: 1 -> Creates 101)")
-            parameters["internal_extension"] = kwargs.pop("internal_extension")
-
-        if "internal_voicemail" in kwargs:
-            if not isinstance(kwargs["internal_voicemail"], int):
-                raise ValueError("Sub Account Internal Voicemail needs to be an int (Example: 101)")
-            parameters["internal_voicemail"] = kwargs.pop("internal_voicemail")
-
-        if "internal_dialtime" in kwargs:
-            if not isinstance(kwargs["internal_dialtime"], int):
-                raise ValueError("Sub Account Internal Dialtime needs to be an int (Example: 60 -> seconds)")
-            parameters["internal_dialtime"] = kwargs.pop("internal_dialtime")
-
-        if "reseller_client" in kwargs:
-            if not isinstance(kwargs["reseller_client"], int):
-                raise ValueError("Reseller Account ID needs to be an int (Example: 561115)")
-            parameters["reseller_client"] = kwargs.pop("reseller_client")
-
-        if "reseller_package" in kwargs:
-            if not isinstance(kwargs["reseller_package"], int):
-                raise ValueError("Reseller Package needs to be an int (Example: 92364)")
-            parameters["reseller_package"] = kwargs.pop("reseller_package")
-
-        if "reseller_nextbilling" in kwargs:
-            reseller_nextbilling = kwargs.pop("reseller_nextbilling")
-            if not isinstance(reseller_nextbilling, int):
-                raise ValueError("Reseller Next Billing Date needs to be a string (Example: '2012-12-31')")
-            validate_date(reseller_nextbilling)
-            parameters["reseller_nextbilling"] = reseller_nextbilling
-
-        if "reseller_chargesetup" in kwargs:
-            if not isinstance(kwargs["reseller_chargesetup"], bool):
-                raise ValueError("True if you want to charge Package Setup Fee after Save")
-            parameters["reseller_chargesetup"] = convert_bool(kwargs.pop("reseller_chargesetup"))
-
-        if len(kwargs) > 0:
-            not_allowed_parameters = ""
-            for key, value in kwargs.items():
-                not_allowed_parameters += key + " "
-            raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
+        })
+        parameters = CREATE_SUB_ACCOUNT.validate(kwargs)
 
         return self._voipms_client._get(method, parameters)
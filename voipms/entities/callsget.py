@@ -4,10 +4,30 @@ The Calls API endpoint get
 
 Documentation: https://voip.ms/m/apidocs.php
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from voipms.baseapi import BaseApi
-from voipms.helpers import validate_date, convert_bool
+from voipms.helpers import validate_date, convert_bool, date_windows, VoipMsError
+from voipms.columnar import require_numpy, with_columns
+from voipms.records import CDR, with_records, iter_records
+from voipms.tracing import in_context
+
+
+def _merge_cdr(responses):
+    """
+    Merge the responses of several CDR windows, oldest window first, into one response
+
+    voip.ms returns the newest records first, the windows are concatenated
+    newest first and keep the order of the API, like a call without chunk_days.
+    """
+    records = []
+    for response in reversed(responses):
+        records.extend(response["cdr"])
+    if not records:
+        raise VoipMsError("no_cdr")
+    return {"status": "success", "cdr": records}
 
 
 class CallsGet(BaseApi):
@@ -21,10 +41,14 @@ class CallsGet(BaseApi):
         super(CallsGet, self).__init__(*args, **kwargs)
         self.endpoint = 'calls'
 
-    def _cdr(self, method, date_from, date_to, timezone,
-             answered=False, noanswer=False, busy=False,
-             failed=False, client=False, **kwargs):
+    def _cdr_parameters(self, date_from, date_to, timezone,
+                        answered=False, noanswer=False, busy=False,
+                        failed=False, client=False, **kwargs):
+        """
+        Validate the CDR filters
 
+        :returns: :py:class:`tuple` of the parameters and the start and end date objects
+        """
         if not isinstance(date_from, str):
             raise ValueError("Start Date for Filtering CDR needs to be str (Example: '2010-11-30')")
 
@@ -93,7 +117,113 @@ class CallsGet(BaseApi):
             else:
                 parameters["client"] = client
 
-        return self._voipms_client._get(method, parameters)
+        return parameters, date_from_object, date_to_object
+
+    def _cdr_calls(self, method, parameters, date_from_object, date_to_object, chunk_days):
+        """
+        Split a CDR call into one call per window of chunk_days days
+        """
+        calls = []
+        for window_from, window_to in date_windows(date_from_object, date_to_object, chunk_days):
+            window = dict(parameters, date_from=window_from, date_to=window_to)
+            calls.append((method, window))
+        return calls
+
+    def _cdr(self, method, date_from, date_to, timezone,
+             answered=False, noanswer=False, busy=False,
+             failed=False, client=False, chunk_days=None, max_workers=4,
+             records=False, columnar=False, **kwargs):
+
+        parameters, date_from_object, date_to_object = self._cdr_parameters(
+            date_from, date_to, timezone, answered, noanswer, busy, failed, client, **kwargs)
+
+        if records and columnar:
+            raise ValueError("Records and columnar can't be asked for at the same time")
+        if columnar:
+            require_numpy()
+
+        if chunk_days is None:
+            response = self._voipms_client._get(method, parameters)
+        else:
+            if not isinstance(max_workers, int) or max_workers < 1:
+                raise ValueError("Number of CDR windows fetched at the same time needs to be an int of at least 1")
+
+            calls = self._cdr_calls(method, parameters, date_from_object, date_to_object, chunk_days)
+            if asyncio.iscoroutinefunction(self._voipms_client._get):
+                response = self._cdr_windows_async(calls, max_workers)
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    response = _merge_cdr(list(executor.map(in_context(self._cdr_window), calls)))
+
+        if columnar:
+            return with_columns(response)
+        return with_records(response, "cdr", CDR) if records else response
+
+    def _cdr_window(self, call):
+        """
+        Fetch the CDR of a single window, a window without calls is empty
+        """
+        try:
+            return self._voipms_client._get(call)
+        except VoipMsError as e:
+            if e.status != "no_cdr":
+                raise
+            return {"status": "success", "cdr": []}
+
+    async def _cdr_windows_async(self, calls, max_workers):
+        """
+        Fetch the CDR windows with at most max_workers calls in flight
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(call):
+            async with semaphore:
+                try:
+                    return await self._voipms_client._get(call)
+                except VoipMsError as e:
+                    if e.status != "no_cdr":
+                        raise
+                    return {"status": "success", "cdr": []}
+
+        return _merge_cdr(await asyncio.gather(*[fetch(call) for call in calls]))
+
+    def _iter_cdr(self, method, date_from, date_to, timezone,
+                  answered=False, noanswer=False, busy=False,
+                  failed=False, client=False, chunk_days=1, records=False, **kwargs):
+
+        parameters, date_from_object, date_to_object = self._cdr_parameters(
+            date_from, date_to, timezone, answered, noanswer, busy, failed, client, **kwargs)
+        calls = self._cdr_calls(method, parameters, date_from_object, date_to_object, chunk_days)
+
+        if asyncio.iscoroutinefunction(self._voipms_client._get):
+            rows = self._iter_cdr_windows_async(calls)
+        else:
+            rows = self._iter_cdr_windows(calls)
+        return iter_records(rows, CDR) if records else rows
+
+    def _iter_cdr_windows(self, calls):
+        """
+        Yield the records of the CDR windows one after the other
+        """
+        for method, parameters in calls:
+            try:
+                for record in self._voipms_client._iter_get(method, parameters, "cdr"):
+                    yield record
+            except VoipMsError as e:
+                if e.status != "no_cdr":
+                    raise
+
+    async def _iter_cdr_windows_async(self, calls):
+        """
+        Yield the records of the CDR windows one after the other
+        """
+        for method, parameters in calls:
+            try:
+                async for record in self._voipms_client._iter_get(method, parameters, "cdr"):
+                    yield record
+            except VoipMsError as e:
+                if e.status != "no_cdr":
+                    raise
 
     def call_accounts(self, client=None):
         """
@@ -172,6 +302,14 @@ class CallsGet(BaseApi):
         :type callbilling: :py:class:`str`
         :param account:  Filter CDR by Account (Values from calls.call_accounts)
         :type account: :py:class:`int`
+        :param chunk_days:  Fetch the range in windows of this many days and merge them, newest first like the API (Example: 1)
+        :type chunk_days: :py:class:`int`
+        :param max_workers:  Number of windows fetched at the same time with chunk_days (Default: 4)
+        :type max_workers: :py:class:`int`
+        :param records:  Return the calls as :class:`voipms.records.CDR` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+        :param columnar:  Return the calls as :class:`voipms.columnar.CdrColumns` of NumPy arrays (Default: False)
+        :type columnar: :py:class:`bool`
 
         :returns: :py:class:`dict`
         """
@@ -180,6 +318,31 @@ class CallsGet(BaseApi):
         return self._cdr(method, date_from, date_to, timezone,
                          answered, noanswer, busy, failed, **kwargs)
 
+    def iter_cdr(self, date_from, date_to, timezone,
+                 answered=False, noanswer=False, busy=False,
+                 failed=False, **kwargs):
+        """
+        Yields the Call Detail Records of all your calls one by one
+
+        - The range is fetched window by window and every response is parsed
+          while it is read, so memory use does not grow with the range
+        - Returns an asynchronous generator with :class:`voipms.AsyncVoipMs`
+
+        Takes the same parameters as :meth:`cdr`, except that chunk_days
+        defaults to 1 and max_workers is not used.
+
+        :param chunk_days:  Number of days fetched per request (Default: 1)
+        :type chunk_days: :py:class:`int`
+        :param records:  Yield :class:`voipms.records.CDR` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
+        :returns: Generator of :py:class:`dict`
+        """
+        method = "getCDR"
+
+        return self._iter_cdr(method, date_from, date_to, timezone,
+                              answered, noanswer, busy, failed, **kwargs)
+
     def parking(self, callparking):
         """
         Retrieves a list of Call Parking entries if no additional parameter is provided
@@ -210,6 +373,28 @@ class CallsGet(BaseApi):
         :type callrecording: :py:class:`str`
         :returns: :py:class:`dict`
         """
+        return self._voipms_client._get(self._recording_call(account, callrecording))
+
+    def download_recording_to(self, account, callrecording, target):
+        """
+        Saves the mp3 file of a call recording, decoding it while it is downloaded
+
+        :param account: [Required] Main Account or Sub Account related to the call recording (Values from getCallRecordings)
+        :type account: :py:class:`int`
+        :param callrecording: Call Recording (Values from getCallRecordings)
+        :type callrecording: :py:class:`str`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or binary file object
+
+        :returns: :py:class:`int` bytes written
+        """
+        method, parameters = self._recording_call(account, callrecording)
+        return self._voipms_client._download(method, parameters, ('data', 'file'), target)
+
+    def _recording_call(self, account, callrecording):
+        """
+        The API call of :meth:`recording` with its parameters validated
+        """
         method = "getCallRecording"
 
         if not isinstance(account, int):
@@ -222,7 +407,7 @@ class CallsGet(BaseApi):
             "account": account,
             "callrecording": callrecording,
         }
-        return self._voipms_client._get(method, parameters)
+        return method, parameters
 
     def recordings(self, account, date_from, date_to, **kwargs):
         """
@@ -359,6 +544,14 @@ class CallsGet(BaseApi):
         :type callbilling: :py:class:`str`
         :param account:  Filter CDR by Account (Values from calls.call_accounts)
         :type account: :py:class:`int`
+        :param chunk_days:  Fetch the range in windows of this many days and merge them, newest first like the API (Example: 1)
+        :type chunk_days: :py:class:`int`
+        :param max_workers:  Number of windows fetched at the same time with chunk_days (Default: 4)
+        :type max_workers: :py:class:`int`
+        :param records:  Return the calls as :class:`voipms.records.CDR` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+        :param columnar:  Return the calls as :class:`voipms.columnar.CdrColumns` of NumPy arrays (Default: False)
+        :type columnar: :py:class:`bool`
 
         :returns: :py:class:`dict`
         """
@@ -366,3 +559,28 @@ class CallsGet(BaseApi):
 
         return self._cdr(method, date_from, date_to, timezone,
                          answered, noanswer, busy, failed, client=client, **kwargs)
+
+    def iter_reseller_cdr(self, date_from, date_to, client, timezone,
+                          answered=False, noanswer=False, busy=False,
+                          failed=False, **kwargs):
+        """
+        Yields the Call Detail Records of a Reseller Client one by one
+
+        - The range is fetched window by window and every response is parsed
+          while it is read, so memory use does not grow with the range
+        - Returns an asynchronous generator with :class:`voipms.AsyncVoipMs`
+
+        Takes the same parameters as :meth:`reseller_cdr`, except that
+        chunk_days defaults to 1 and max_workers is not used.
+
+        :param chunk_days:  Number of days fetched per request (Default: 1)
+        :type chunk_days: :py:class:`int`
+        :param records:  Yield :class:`voipms.records.CDR` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
+        :returns: Generator of :py:class:`dict`
+        """
+        method = "getResellerCDR"
+
+        return self._iter_cdr(method, date_from, date_to, timezone,
+                              answered, noanswer, busy, failed, client=client, **kwargs)
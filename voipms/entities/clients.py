@@ -4,19 +4,18 @@ The Clients API endpoint
 
 Documentation: https://voip.ms/m/apidocs.php
 """
-from voipms.baseapi import BaseApi
-from voipms.entities.clientsadd import ClientsAdd
-from voipms.entities.clientsget import ClientsGet
-from voipms.entities.clientsset import ClientsSet
+from voipms.baseapi import BaseApi, LazyEntity
 
 
 class Clients(BaseApi):
+    add = LazyEntity("voipms.entities.clientsadd", "ClientsAdd")
+    assign = LazyEntity("voipms.entities.clientsassign", "ClientsAssign")
+    get = LazyEntity("voipms.entities.clientsget", "ClientsGet")
+    set = LazyEntity("voipms.entities.clientsset", "ClientsSet")
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the endpoint
         """
         super(Clients, self).__init__(*args, **kwargs)
         self.endoint = 'clients'
-        self.add = ClientsAdd(self)
-        self.get = ClientsGet(self)
-        self.set = ClientsSet(self)
@@ -6,6 +6,24 @@ Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
 from voipms.helpers import validate_email
+from voipms.schema import Field, Schema
+
+SET_CLIENT = Schema("setClient", [
+    Field("client", int, "ID for a specific Reseller Client", "Example: 561115", required=True),
+    Field("email", str, "Client's e-mail", required=True,
+          check=validate_email, check_message="Client's e-mail is not a correct email syntax"),
+    Field("password", str, "Client's Password", required=True),
+    Field("firstname", str, "Client's Firstname", required=True),
+    Field("lastname", str, "Client's Lastname", required=True),
+    Field("phone_number", str, "Client's Phone Number", required=True),
+    Field("company", str, "Client's Company"),
+    Field("address", str, "Client's Address"),
+    Field("city", str, "Client's City"),
+    Field("state", str, "Client's State"),
+    Field("country", str, "Client's Country", "Values from general.get_countries"),
+    Field("zip_code", str, "Client's Zip Code", key="zip"),
+    Field("balance_management", str, "Balance Management for Client", "Values from clients.get_balance_management"),
+])
 
 
 class ClientsSet(BaseApi):
@@ -58,76 +76,15 @@ class ClientsSet(BaseApi):
         """
         method = "setClient"
 
-        if not isinstance(client, int):
-            raise ValueError("ID for a specific Reseller Client needs to be in int (Example: 561115)")
-
-        if not isinstance(email, str):
-            raise ValueError("Client's e-mail needs to be a str")
-        else:
-            if not validate_email(email):
-                raise ValueError("Client's e-mail is not a correct email syntax")
-
-        if not isinstance(password, str):
-            raise ValueError("Client's Password needs to be a str")
-
-        if not isinstance(firstname, str):
-            raise ValueError("Client's Firstname needs to be a str")
-
-        if not isinstance(lastname, str):
-            raise ValueError("Client's Lastname needs to be a str")
-
-        if not isinstance(phone_number, str):
-            raise ValueError("Client's Phone Number needs to be a str")
-
-        parameters = {
+        kwargs.update({
             "client": client,
             "email": email,
             "password": password,
             "firstname": firstname,
             "lastname": lastname,
             "phone_number": phone_number,
-        }
-
-        if "company" in kwargs:
-            if not isinstance(kwargs["company"], str):
-                raise ValueError("Client's Company needs to be a str")
-            parameters["company"] = kwargs.pop("company")
-
-        if "address" in kwargs:
-            if not isinstance(kwargs["address"], str):
-                raise ValueError("Client's Address needs to be a str")
-            parameters["address"] = kwargs.pop("address")
-
-        if "city" in kwargs:
-            if not isinstance(kwargs["city"], str):
-                raise ValueError("Client's City needs to be a str")
-            parameters["city"] = kwargs.pop("city")
-
-        if "state" in kwargs:
-            if not isinstance(kwargs["state"], str):
-                raise ValueError("Client's State needs to be a str")
-            parameters["state"] = kwargs.pop("state")
-
-        if "country" in kwargs:
-            if not isinstance(kwargs["country"], str):
-                raise ValueError("Client's Country needs to be a str (Values from general.get_countries)")
-            parameters["country"] = kwargs.pop("country")
-
-        if "zip_code" in kwargs:
-            if not isinstance(kwargs["zip_code"], str):
-                raise ValueError("Client's Zip Code needs to be a str")
-            parameters["zip"] = kwargs.pop("zip_code")
-
-        if "balance_management" in kwargs:
-            if not isinstance(kwargs["balance_management"], str):
-                raise ValueError("Balance Management for Client (Values from clients.get_balance_management)")
-            parameters["balance_management"] = kwargs.pop("balance_management")
-
-        if len(kwargs) > 0:
-            not_allowed_parameters = ""
-            for key, value in kwargs.items():
-                not_allowed_parameters += key + " "
-            raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
+        })
+        parameters = SET_CLIENT.validate(kwargs)
 
         return self._voipms_client._get(method, parameters)
 
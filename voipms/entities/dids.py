@@ -4,35 +4,25 @@ The Dids API endpoint
 
 Documentation: https://voip.ms/m/apidocs.php
 """
-from voipms.baseapi import BaseApi
-from voipms.entities.didsback_order import DidsBackOrder
-from voipms.entities.didscancel import DidsCancel
-from voipms.entities.didsconnect import DidsConnect
-from voipms.entities.didsdelete import DidsDelete
-from voipms.entities.didsget import DidsGet
-from voipms.entities.didsorder import DidsOrder
-from voipms.entities.didsremove import DidsRemove
-from voipms.entities.didssearch import DidsSearch
-from voipms.entities.didssend import DidsSend
-from voipms.entities.didsset import DidsSet
-from voipms.entities.didsunconnect import DidsUnconnect
+from voipms.baseapi import BaseApi, LazyEntity
 
 
 class Dids(BaseApi):
+    back_order = LazyEntity("voipms.entities.didsback_order", "DidsBackOrder")
+    cancel = LazyEntity("voipms.entities.didscancel", "DidsCancel")
+    connect = LazyEntity("voipms.entities.didsconnect", "DidsConnect")
+    delete = LazyEntity("voipms.entities.didsdelete", "DidsDelete")
+    get = LazyEntity("voipms.entities.didsget", "DidsGet")
+    order = LazyEntity("voipms.entities.didsorder", "DidsOrder")
+    remove = LazyEntity("voipms.entities.didsremove", "DidsRemove")
+    search = LazyEntity("voipms.entities.didssearch", "DidsSearch")
+    send = LazyEntity("voipms.entities.didssend", "DidsSend")
+    set = LazyEntity("voipms.entities.didsset", "DidsSet")
+    unconnect = LazyEntity("voipms.entities.didsunconnect", "DidsUnconnect")
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the endpoint
         """
         super(Dids, self).__init__(*args, **kwargs)
         self.endoint = 'dids'
-        self.back_order = DidsBackOrder(self)
-        self.cancel = DidsCancel(self)
-        self.connect = DidsConnect(self)
-        self.delete = DidsDelete(self)
-        self.get = DidsGet(self)
-        self.order = DidsOrder(self)
-        self.remove = DidsRemove(self)
-        self.search = DidsSearch(self)
-        self.send = DidsSend(self)
-        self.set = DidsSet(self)
-        self.unconnect = DidsUnconnect(self)
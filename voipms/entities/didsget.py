@@ -4,8 +4,104 @@ The Dids API endpoint get
 
 Documentation: https://voip.ms/m/apidocs.php
 """
+import asyncio
+from datetime import date
+
 from voipms.baseapi import BaseApi
-from voipms.helpers import validate_date, convert_bool
+from voipms.helpers import validate_date, convert_bool, date_windows, VoipMsError
+from voipms.records import SMS, MMS, DIDInfo, with_records, iter_records
+from voipms.schema import Field, Schema
+from voipms.streaming import prefetch, aprefetch
+
+
+def _messages_schema(kind, method, example_id):
+    name = kind.upper() + "s"
+    return Schema(method, [
+        Field(kind, int, "ID for a specific " + kind.upper(), "Example: {}".format(example_id)),
+        Field("date_from", str, "Start Date for Filtering " + name, "Example: '2014-03-30'",
+              key="from", check=validate_date),
+        Field("date_to", str, "End Date for Filtering " + name, "Example: '2014-03-30'",
+              key="to", check=validate_date),
+        Field(kind + "_type", bool, "Filter " + name + " by Type", "Boolean: True = received / False = sent",
+              key="type", convert=convert_bool),
+        Field("did", int, "DID number for Filtering " + name, "Example: 5551234567"),
+        Field("contact", int, "Contact number for Filtering " + name, "Example: 5551234567"),
+        Field("limit", int, "Number of records to be displayed", "Example: 20"),
+        Field("timezone", int, "Adjust time of " + name + " according to Timezome", "Numeric: -12 to 13"),
+        Field("all_messages", bool, "Filter to receive all SMSs and MMSs",
+              "True = all SMS and MMS, False = only SMS, the ID must be 0", convert=convert_bool),
+    ])
+
+
+MESSAGES_SCHEMAS = {
+    "sms": _messages_schema("sms", "getSMS", 5853),
+    "mms": _messages_schema("mms", "getMMS", 1918),
+}
+
+
+# Largest page asked for when a single day has more messages than the limit
+MAX_PAGE_LIMIT = 1000
+
+
+def _messages(response):
+    """
+    The messages of a getSMS or getMMS response
+
+    getMMS lists its messages under 'sms' as well, like getSMS.
+    """
+    return (response or {}).get("sms") or []
+
+
+class _MessageWindow(object):
+    """
+    The pages of getSMS or getMMS for one date window, newest messages first
+
+    The API has no offset. When a page comes back full, the window is asked
+    again up to the day of the oldest message of the page, with room for the
+    messages of that day which were already yielded and are skipped. Only a
+    day with more messages than the limit is asked again with a bigger
+    limit, up to MAX_PAGE_LIMIT.
+    """
+    def __init__(self, parameters, date_from, date_to):
+        self.parameters = parameters
+        self.date_from = date_from
+        self.date_to = date_to
+        self.limit = parameters["limit"]
+        self.max_limit = max(MAX_PAGE_LIMIT, self.limit)
+        self.seen = set()
+        self.done = False
+
+    def request(self):
+        """
+        The parameters of the next page
+        """
+        window = dict(self.parameters, limit=self.limit)
+        window["from"] = self.date_from
+        window["to"] = self.date_to
+        return window
+
+    def page(self, messages):
+        """
+        The messages of a response not yielded yet, and what to ask next
+        """
+        page = [message for message in messages if message.get("id") not in self.seen]
+        if len(messages) < self.limit:
+            self.done = True
+            return page
+        oldest = str(messages[-1].get("date", ""))[:10]
+        if self.date_from <= oldest < self.date_to:
+            # Messages of the oldest day are in the next response again
+            self.date_to = oldest
+            self.seen = {message.get("id") for message in messages
+                         if str(message.get("date", ""))[:10] == oldest}
+            self.limit = min(self.parameters["limit"] + len(self.seen), self.max_limit)
+        elif self.limit < self.max_limit:
+            self.seen.update(message.get("id") for message in page)
+            self.limit = min(self.limit * 2, self.max_limit)
+        else:
+            raise ValueError("More than {} messages on {}, filter them further (Example: by did)".format(
+                self.max_limit, self.date_to))
+        return page
 
 
 class DidsGet(BaseApi):
@@ -19,6 +115,104 @@ class DidsGet(BaseApi):
         super(DidsGet, self).__init__(*args, **kwargs)
         self.endpoint = 'dids'
 
+    def _messages_parameters(self, kind, kwargs):
+        """
+        Validate the filters of getSMS and getMMS
+
+        :param kind: 'sms' or 'mms'
+        :type kind: :py:class:`str`
+        :param kwargs: The filters
+        :type kwargs: :py:class:`dict`
+        :returns: :py:class:`dict` of the API parameters
+        """
+        return MESSAGES_SCHEMAS[kind].validate(kwargs)
+
+    def _iter_messages(self, method, kind, kwargs):
+        """
+        Validate the filters of iter_sms and iter_mms and start the iteration
+        """
+        page_days = kwargs.pop("page_days", 1)
+        prefetch_pages = kwargs.pop("prefetch", 1)
+        if not isinstance(prefetch_pages, int) or prefetch_pages < 0:
+            raise ValueError("Number of pages fetched ahead needs to be an int of at least 0")
+
+        parameters = self._messages_parameters(kind, kwargs)
+
+        today = date.today().strftime('%Y-%m-%d')
+        date_from = validate_date(parameters.pop("from", today)).date()
+        date_to = validate_date(parameters.pop("to", today)).date()
+        if date_from > date_to:
+            raise ValueError("The start date needs to be ealier or the same as the end date.")
+
+        parameters.setdefault("limit", 50)
+        if parameters["limit"] < 1:
+            raise ValueError("Number of records to be displayed needs to be at least 1")
+
+        # voip.ms returns the newest messages first, walk the windows the same way
+        windows = list(reversed(date_windows(date_from, date_to, page_days)))
+
+        if asyncio.iscoroutinefunction(self._voipms_client._get):
+            return self._aiter_messages(method, parameters, windows, prefetch_pages)
+        return self._iter_message_pages(method, parameters, windows, prefetch_pages)
+
+    def _message_pages(self, method, parameters, windows):
+        """
+        Yield the pages of messages of every window
+        """
+        for window_from, window_to in windows:
+            window = _MessageWindow(parameters, window_from, window_to)
+            while not window.done:
+                try:
+                    messages = _messages(self._voipms_client._get(method, window.request()))
+                except VoipMsError as e:
+                    if e.status != "no_sms":
+                        raise
+                    messages = []
+                page = window.page(messages)
+                if page:
+                    yield page
+
+    def _iter_message_pages(self, method, parameters, windows, prefetch_pages):
+        """
+        Yield the messages of all pages one by one
+        """
+        pages = prefetch(self._message_pages(method, parameters, windows), prefetch_pages)
+        try:
+            for page in pages:
+                for message in page:
+                    yield message
+        finally:
+            pages.close()
+
+    async def _amessage_pages(self, method, parameters, windows):
+        """
+        Asynchronous version of :meth:`_message_pages`
+        """
+        for window_from, window_to in windows:
+            window = _MessageWindow(parameters, window_from, window_to)
+            while not window.done:
+                try:
+                    messages = _messages(await self._voipms_client._get(method, window.request()))
+                except VoipMsError as e:
+                    if e.status != "no_sms":
+                        raise
+                    messages = []
+                page = window.page(messages)
+                if page:
+                    yield page
+
+    async def _aiter_messages(self, method, parameters, windows, prefetch_pages):
+        """
+        Asynchronous version of :meth:`_iter_message_pages`
+        """
+        pages = aprefetch(self._amessage_pages(method, parameters, windows), prefetch_pages)
+        try:
+            async for page in pages:
+                for message in page:
+                    yield message
+        finally:
+            await pages.aclose()
+
     def callbacks(self, callback=None):
         """
         Retrieves a list of Callbacks if no additional parameter is provided
@@ -177,7 +371,7 @@ class DidsGet(BaseApi):
 
         return self._voipms_client._get(method, parameters)
 
-    def dids_info(self, client=None, did=None):
+    def dids_info(self, client=None, did=None, records=False):
         """
         Retrieves information from all your DIDs if no additional parameter is provided
 
@@ -193,6 +387,8 @@ class DidsGet(BaseApi):
         :type client: :py:class:`str`
         :param did: DID from Client or Sub Account (Example: 5551234567)
         :type did: :py:class:`str`
+        :param records: Return the DIDs as :class:`voipms.records.DIDInfo` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
 
         :returns: :py:class:`dict`
         """
@@ -212,7 +408,8 @@ class DidsGet(BaseApi):
             else:
                 parameters["did"] = did
 
-        return self._voipms_client._get(method, parameters)
+        response = self._voipms_client._get(method, parameters)
+        return with_records(response, "dids", DIDInfo) if records else response
 
     def dids_international_geographic(self, country_id):
         """
@@ -463,66 +660,48 @@ class DidsGet(BaseApi):
         :param all_messages: Filter to recive all SMSs and MMSs, 1 recive all SMS and MMS, 0 if only need SMS, important: the sms ID must be 0
         :type all_messages: :py:class:`bool`
 
+        :param records: Return the messages as :class:`voipms.records.MMS` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
         :returns: :py:class:`dict`
         """
         method = "getMMS"
 
-        parameters = {}
+        records = kwargs.pop("records", False)
+        parameters = self._messages_parameters("mms", kwargs)
 
-        if "mms" in kwargs:
-            if not isinstance(kwargs["mms"], int):
-                raise ValueError("ID for a specific MMS needs to be an int (Example: 1918)")
-            parameters["mms"] = kwargs.pop("mms")
-
-        if "date_from" in kwargs:
-            if not isinstance(kwargs["date_from"], str):
-                raise ValueError("Start Date for Filtering SMSs needs to be a str (Example: '2014-03-30')")
-            validate_date(kwargs["date_from"])
-            parameters["from"] = kwargs.pop("date_from")
-
-        if "date_to" in kwargs:
-            if not isinstance(kwargs["date_to"], str):
-                raise ValueError("End Date for Filtering SMSs needs to be a str (Example: '2014-03-30')")
-            validate_date(kwargs["date_to"])
-            parameters["to"] = kwargs.pop("date_to")
-
-        if "mms_type" in kwargs:
-            if not isinstance(kwargs["mms_type"], bool):
-                raise ValueError("Filter SMSs by Type needs to be a bool (Boolean: True = received / False = sent)")
-            parameters["type"] = convert_bool(kwargs.pop("mms_type"))
-
-        if "did" in kwargs:
-            if not isinstance(kwargs["did"], int):
-                raise ValueError("DID number for Filtering SMSs needs to be an int (Example: 5551234567)")
-            parameters["did"] = kwargs.pop("did")
-
-        if "contact" in kwargs:
-            if not isinstance(kwargs["contact"], int):
-                raise ValueError("Contact number for Filtering SMSs needs to be an int (Example: 5551234567)")
-            parameters["contact"] = kwargs.pop("contact")
-
-        if "limit" in kwargs:
-            if not isinstance(kwargs["limit"], int):
-                raise ValueError("Number of records to be displayed needs to be an int (Example: 20)")
-            parameters["limit"] = kwargs.pop("limit")
-
-        if "timezone" in kwargs:
-            if not isinstance(kwargs["timezone"], int):
-                raise ValueError("Adjust time of SMSs according to Timezome needs to be an int (Numeric: -12 to 13)")
-            parameters["timezone"] = kwargs.pop("timezone")
-
-        if "all_messages" in kwargs:
-            if not isinstance(kwargs["all_messages"], bool):
-                raise ValueError("Filter to recive all SMSs and MMSs, 1 recive all SMS and MMS, 0 if only need SMS, important: the sms ID must be 0")
-            parameters["all_messages"] = convert_bool(kwargs.pop("all_messages"))
+        response = self._voipms_client._get(method, parameters)
+        return with_records(response, ("mms", "sms"), MMS) if records else response
 
-        if len(kwargs) > 0:
-            not_allowed_parameters = ""
-            for key, value in kwargs.items():
-                not_allowed_parameters += key + " "
-            raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
+    def iter_mms(self, **kwargs):
+        """
+        Yields all MMS messages matching the filters one by one, newest first
 
-        return self._voipms_client._get(method, parameters)
+        - Walks the date range in windows of page_days days and pages through
+          every window, without duplicates or gaps between pages. A full page
+          narrows the window to the day of its oldest message, the page size
+          only grows for a day with more messages than limit
+        - The next page is fetched in the background while the current one is
+          consumed, stop iterating at any time to stop fetching
+        - Returns an asynchronous generator with :class:`voipms.AsyncVoipMs`
+
+        Takes the same filters as :meth:`mms`, limit is the page size.
+
+        :param page_days: Number of days per window (Default: 1)
+        :type page_days: :py:class:`int`
+        :param prefetch: Number of pages fetched ahead, 0 to fetch only on demand (Default: 1)
+        :type prefetch: :py:class:`int`
+
+        :param records: Yield :class:`voipms.records.MMS` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
+        :returns: Generator of :py:class:`dict`
+        """
+        method = "getMMS"
+
+        records = kwargs.pop("records", False)
+        messages = self._iter_messages(method, "mms", kwargs)
+        return iter_records(messages, MMS) if records else messages
 
     def phonebook(self, phonebook=None, name=None):
         """
@@ -705,6 +884,26 @@ class DidsGet(BaseApi):
         :type recording: :py:class:`int`
         :returns: :py:class:`dict`
         """
+        return self._voipms_client._get(self._recording_file_call(recording))
+
+    def download_recording_file_to(self, recording, target):
+        """
+        Saves a specific Recording File, decoding it while it is downloaded
+
+        :param recording: [Required] ID for a specific Recording (Example: 7567)
+        :type recording: :py:class:`int`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or binary file object
+
+        :returns: :py:class:`int` bytes written
+        """
+        method, parameters = self._recording_file_call(recording)
+        return self._voipms_client._download(method, parameters, ('data', 'file'), target)
+
+    def _recording_file_call(self, recording):
+        """
+        The API call of :meth:`recording_file` with its parameters validated
+        """
         method = "getRecordingFile"
 
         parameters = {}
@@ -713,7 +912,7 @@ class DidsGet(BaseApi):
             raise ValueError("ID for a specific Recording needs to be an int (Example: 7567)")
         parameters["recording"] = recording
 
-        return self._voipms_client._get(method, parameters)
+        return method, parameters
 
     def ring_groups(self, ringgroup=None):
         """
@@ -802,66 +1001,48 @@ class DidsGet(BaseApi):
         :param timezone: Adjust time of SMSs according to Timezome (Numeric: -12 to 13)
         :type timezone: :py:class:`int`
 
+        :param records: Return the messages as :class:`voipms.records.SMS` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
         :returns: :py:class:`dict`
         """
         method = "getSMS"
 
-        parameters = {}
+        records = kwargs.pop("records", False)
+        parameters = self._messages_parameters("sms", kwargs)
 
-        if "sms" in kwargs:
-            if not isinstance(kwargs["sms"], int):
-                raise ValueError("ID for a specific SMS needs to be an int (Example: 5853)")
-            parameters["sms"] = kwargs.pop("sms")
-
-        if "date_from" in kwargs:
-            if not isinstance(kwargs["date_from"], str):
-                raise ValueError("Start Date for Filtering SMSs needs to be a str (Example: '2014-03-30')")
-            validate_date(kwargs["date_from"])
-            parameters["from"] = kwargs.pop("date_from")
-
-        if "date_to" in kwargs:
-            if not isinstance(kwargs["date_to"], str):
-                raise ValueError("End Date for Filtering SMSs needs to be a str (Example: '2014-03-30')")
-            validate_date(kwargs["date_to"])
-            parameters["to"] = kwargs.pop("date_to")
-
-        if "sms_type" in kwargs:
-            if not isinstance(kwargs["sms_type"], bool):
-                raise ValueError("Filter SMSs by Type needs to be a bool (Boolean: True = received / False = sent)")
-            parameters["type"] = convert_bool(kwargs.pop("sms_type"))
-
-        if "did" in kwargs:
-            if not isinstance(kwargs["did"], int):
-                raise ValueError("DID number for Filtering SMSs needs to be an int (Example: 5551234567)")
-            parameters["did"] = kwargs.pop("did")
-
-        if "contact" in kwargs:
-            if not isinstance(kwargs["contact"], int):
-                raise ValueError("Contact number for Filtering SMSs needs to be an int (Example: 5551234567)")
-            parameters["contact"] = kwargs.pop("contact")
-
-        if "limit" in kwargs:
-            if not isinstance(kwargs["limit"], int):
-                raise ValueError("Number of records to be displayed needs to be an int (Example: 20)")
-            parameters["limit"] = kwargs.pop("limit")
-
-        if "timezone" in kwargs:
-            if not isinstance(kwargs["timezone"], int):
-                raise ValueError("Adjust time of SMSs according to Timezome needs to be an int (Numeric: -12 to 13)")
-            parameters["timezone"] = kwargs.pop("timezone")
-
-        if "all_messages" in kwargs:
-            if not isinstance(kwargs["all_messages"], bool):
-                raise ValueError("Filter to recive all SMSs and MMSs, 1 recive all SMS and MMS, 0 if only need SMS, important: the sms ID must be 0")
-            parameters["all_messages"] = convert_bool(kwargs.pop("all_messages"))
+        response = self._voipms_client._get(method, parameters)
+        return with_records(response, "sms", SMS) if records else response
 
-        if len(kwargs) > 0:
-            not_allowed_parameters = ""
-            for key, value in kwargs.items():
-                not_allowed_parameters += key + " "
-            raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
+    def iter_sms(self, **kwargs):
+        """
+        Yields all SMS messages matching the filters one by one, newest first
 
-        return self._voipms_client._get(method, parameters)
+        - Walks the date range in windows of page_days days and pages through
+          every window, without duplicates or gaps between pages. A full page
+          narrows the window to the day of its oldest message, the page size
+          only grows for a day with more messages than limit
+        - The next page is fetched in the background while the current one is
+          consumed, stop iterating at any time to stop fetching
+        - Returns an asynchronous generator with :class:`voipms.AsyncVoipMs`
+
+        Takes the same filters as :meth:`sms`, limit is the page size.
+
+        :param page_days: Number of days per window (Default: 1)
+        :type page_days: :py:class:`int`
+        :param prefetch: Number of pages fetched ahead, 0 to fetch only on demand (Default: 1)
+        :type prefetch: :py:class:`int`
+
+        :param records: Yield :class:`voipms.records.SMS` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
+
+        :returns: Generator of :py:class:`dict`
+        """
+        method = "getSMS"
+
+        records = kwargs.pop("records", False)
+        messages = self._iter_messages(method, "sms", kwargs)
+        return iter_records(messages, SMS) if records else messages
 
     def states(self):
         """
@@ -4,14 +4,26 @@ The Dids API endpoint send
 
 Documentation: https://voip.ms/m/apidocs.php
 """
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from voipms.baseapi import BaseApi
+from voipms.checkpoint import SendCheckpoint, SENDING, SENT, FAILED
+from voipms.helpers import split_message, VoipMsError
+from voipms.ratelimit import RateLimiter, TokenBucket
+from voipms.tracing import in_context
+from voipms.upload import Base64File, as_upload
 import validators
 from validators import ValidationError
 import base64
 
 def isBase64(s):
+    # media2 is a data URL, only the part after the comma is base64
+    if s.startswith("data:"):
+        s = s.partition(",")[2]
     try:
-        return base64.b64encode(base64.b64decode(s)) == s
+        return base64.b64encode(base64.b64decode(s)).decode("ascii") == s
     except Exception:
         return False
     
@@ -34,6 +46,245 @@ class DidsSend(BaseApi):
         super(DidsSend, self).__init__(*args, **kwargs)
         self.endpoint = 'dids'
 
+    def _bulk_item(self, index, item):
+        """
+        Validate an item of bulk_sms and split its message into parts
+
+        :returns: :py:class:`tuple` of the result dict and the list of parts, None if the item is invalid
+        """
+        result = {"index": index, "did": None, "dst": None, "status": "success", "sms": []}
+        try:
+            did, dst, message = item
+        except (TypeError, ValueError):
+            result.update(status="invalid", error="Items need to be (did, dst, message) tuples")
+            return result, None
+        result.update(did=did, dst=dst)
+        if not isinstance(did, int) or not isinstance(dst, int):
+            result.update(status="invalid", error="DID and Destination Number need to be an int (Example: 5551234567)")
+            return result, None
+        if not isinstance(message, str):
+            result.update(status="invalid", error="Message to be sent needs to be a str (Example: 'hello John Smith')")
+            return result, None
+        parts = split_message(message)
+        result["parts"] = len(parts)
+        return result, parts
+
+    def _bulk_outcome(self, result, response=None, error=None):
+        """
+        Record the outcome of a message part in its result
+
+        :returns: :py:class:`tuple` of the state and the SMS id to journal, None if the part stays as sending
+        """
+        if error is None:
+            sms = response.get("sms") if isinstance(response, dict) else None
+            result["sms"].append(sms)
+            return SENT, sms
+        if isinstance(error, ValueError):
+            # The part was refused before the request went out
+            result.update(status="invalid", error=str(error))
+            return FAILED, None
+        if isinstance(error, VoipMsError):
+            # voip.ms refused the message, it is safe to send it again
+            result.update(status=error.status, error=str(error))
+            return FAILED, None
+        # The message may or may not have gone out, it stays as sending
+        result.update(status="error", error=str(error))
+        return None
+
+    def _bulk_resume(self, result, index, part, checkpoint):
+        """
+        Check the checkpoint for a message part, returns True if it must not be sent
+        """
+        if checkpoint is None:
+            return False
+        state, sms = checkpoint.state(index, part)
+        if state == SENT:
+            result["sms"].append(sms)
+            return True
+        if state == SENDING:
+            result.update(status="unconfirmed",
+                          error="The part was being sent when the previous run stopped, it is not sent again")
+            return True
+        return False
+
+    def _bulk_send(self, index, item, limit, checkpoint):
+        """
+        Send all parts of a message one after the other
+        """
+        result, parts = self._bulk_item(index, item)
+        for part, text in enumerate(parts or []):
+            if self._bulk_resume(result, index, part, checkpoint):
+                if result["status"] != "success":
+                    break
+                continue
+            try:
+                self._sms_parameters(result["did"], result["dst"], text)
+            except ValueError as e:
+                record = self._bulk_outcome(result, error=e)
+            else:
+                limit(result["did"])
+                if checkpoint is not None:
+                    checkpoint.begin(index, part)
+                try:
+                    response = self.sms(result["did"], result["dst"], text)
+                except Exception as e:
+                    record = self._bulk_outcome(result, error=e)
+                else:
+                    record = self._bulk_outcome(result, response)
+            if checkpoint is not None and record is not None:
+                checkpoint.finish(index, part, *record)
+            if result["status"] != "success":
+                break
+        return result
+
+    async def _bulk_send_async(self, index, item, limit, checkpoint):
+        """
+        Asynchronous version of :meth:`_bulk_send`, the journal is written in
+        the default executor so the event loop never waits on the disk
+        """
+        loop = asyncio.get_running_loop()
+        result, parts = self._bulk_item(index, item)
+        for part, text in enumerate(parts or []):
+            if self._bulk_resume(result, index, part, checkpoint):
+                if result["status"] != "success":
+                    break
+                continue
+            try:
+                self._sms_parameters(result["did"], result["dst"], text)
+            except ValueError as e:
+                record = self._bulk_outcome(result, error=e)
+            else:
+                await limit(result["did"])
+                if checkpoint is not None:
+                    await loop.run_in_executor(None, checkpoint.begin, index, part)
+                try:
+                    response = await self.sms(result["did"], result["dst"], text)
+                except Exception as e:
+                    record = self._bulk_outcome(result, error=e)
+                else:
+                    record = self._bulk_outcome(result, response)
+            if checkpoint is not None and record is not None:
+                await loop.run_in_executor(None, checkpoint.finish, index, part, *record)
+            if result["status"] != "success":
+                break
+        return result
+
+    def _bulk_sms(self, messages, max_workers, limiter, limiter_key, checkpoint):
+        """
+        Send the messages in a thread pool, yielding the results as they finish
+        """
+        def limit(did):
+            limiter.acquire(limiter_key(did))
+
+        # A path is opened here, so a generator that is never iterated leaves no file open
+        owns_checkpoint = isinstance(checkpoint, str)
+        if owns_checkpoint:
+            checkpoint = SendCheckpoint(checkpoint)
+
+        pending = set()
+        send = in_context(self._bulk_send)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for index, item in enumerate(messages):
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(send, index, item, limit, checkpoint))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if owns_checkpoint:
+                checkpoint.close()
+
+    async def _bulk_sms_async(self, messages, max_workers, limiter, limiter_key, checkpoint):
+        """
+        Asynchronous version of :meth:`_bulk_sms`
+        """
+        async def limit(did):
+            await limiter.acquire_async(limiter_key(did))
+
+        loop = asyncio.get_running_loop()
+        owns_checkpoint = isinstance(checkpoint, str)
+        if owns_checkpoint:
+            checkpoint = await loop.run_in_executor(None, SendCheckpoint, checkpoint)
+
+        pending = set()
+        try:
+            for index, item in enumerate(messages):
+                if len(pending) >= max_workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(
+                    self._bulk_send_async(index, item, limit, checkpoint)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            if owns_checkpoint:
+                await loop.run_in_executor(None, checkpoint.close)
+
+    def bulk_sms(self, messages, max_workers=4, did_rate=1, did_burst=None, checkpoint=None):
+        """
+        Send many SMS messages concurrently and yield one result per message
+
+        - Messages longer than 160 chars are split into parts at spaces and
+          the parts are sent in order
+        - Every DID sends at most did_rate messages per second
+        - The results are yielded as the messages finish, not in input order
+        - With a checkpoint, a run over the same messages in the same order
+          skips what an earlier run already sent
+
+        Each result is a dict with the keys index (position in messages), did,
+        dst, status ('success', the voip.ms error code, 'invalid', 'error' or
+        'unconfirmed'), sms (IDs of the sent parts), parts and error.
+        Returns an asynchronous generator with :class:`voipms.AsyncVoipMs`.
+
+        :param messages: [Required] Iterable of (did, dst, message) tuples, consumed lazily
+        :type messages: :py:class:`iterable`
+        :param max_workers: Number of messages sent at the same time (Default: 4)
+        :type max_workers: :py:class:`int`
+        :param did_rate: Number of messages per second per DID (Default: 1)
+        :type did_rate: :py:class:`float`
+        :param did_burst: Number of messages per DID allowed at once (Default: max(1, did_rate))
+        :type did_burst: :py:class:`int`
+        :param checkpoint: Path of a journal file or a :class:`voipms.checkpoint.SendCheckpoint` (Default: None)
+        :type checkpoint: :py:class:`str`
+
+        :returns: Generator of :py:class:`dict`
+        """
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("Number of messages sent at the same time needs to be an int of at least 1")
+
+        # Fail before anything is sent on a bad did_rate or did_burst
+        TokenBucket(did_rate, did_burst)
+        limiter = RateLimiter()
+        registered = set()
+        lock = threading.Lock()
+
+        def limiter_key(did):
+            key = "sendSMS:{}".format(did)
+            with lock:
+                if key not in registered:
+                    limiter.set_method_limit(key, did_rate, did_burst)
+                    registered.add(key)
+            return key
+
+        if asyncio.iscoroutinefunction(self._voipms_client._get):
+            return self._bulk_sms_async(messages, max_workers, limiter, limiter_key, checkpoint)
+        return self._bulk_sms(messages, max_workers, limiter, limiter_key, checkpoint)
+
     def sms(self, did, dst, message):
         """
         Send a SMS message to a Destination Number
@@ -48,7 +299,14 @@ class DidsSend(BaseApi):
         :returns: :py:class:`dict`
         """
         method = "sendSMS"
+        parameters = self._sms_parameters(did, dst, message)
 
+        return self._voipms_client._get(method, parameters)
+
+    def _sms_parameters(self, did, dst, message):
+        """
+        Validate the arguments of :meth:`sms` and build its parameters
+        """
         if not isinstance(did, int):
             raise ValueError("DID Numbers which is sending the message needs to be an int (Example: 5551234567)")
 
@@ -61,14 +319,12 @@ class DidsSend(BaseApi):
             if len(message) > 160:
                 raise ValueError("Message to be sent can only have 160 chars")
 
-        parameters = {
+        return {
             "did": did,
             "dst": dst,
             "message": message,
         }
 
-        return self._voipms_client._get(method, parameters)
-
     def mms(self, did, dst, message, media1=None, media2=None):
         """
         Send a MMS message to a Destination Number
@@ -81,8 +337,9 @@ class DidsSend(BaseApi):
         :type message: :py:class:`str`
         :param media1: [Optional]  Url to media file (Example: 'https://voip.ms/themes/voipms/assets/img/talent.jpg?v=2' 
         :type media1: :py:class:`str`
-        :param media2: [Optional] Base 64 image encode (Example: data:image/png;base64,iVBORw0KGgoAAAANSUh...)
-        :type media2: :py:class:`str`
+        :param media2: [Optional] Base 64 image encode (Example: data:image/png;base64,iVBORw0KGgoAAAANSUh...).
+                       A path, a binary file object or bytes are encoded as a data URL while they are sent.
+        :type media2: :py:class:`str`, :py:class:`os.PathLike`, binary file object, :py:class:`bytes` or :py:class:`voipms.upload.Base64File`
 
         :returns: :py:class:`dict`
         """
@@ -101,8 +358,9 @@ class DidsSend(BaseApi):
             if not valid_url(media1):
                 raise ValueError("Media1 to be sent needs to be a valid url to media file (Example: 'https://voip.ms/themes/voipms/assets/img/talent.jpg?v=2' ")
             
+        media2 = as_upload(media2, data_url=True)
         if media2:
-            if not isBase64(media2):
+            if not isinstance(media2, Base64File) and not isBase64(media2):
                 raise ValueError("Media2 to be sent needs to be a base 64 image encode (Example: data:image/png;base64,iVBORw0KGgoAAAANSUh...)")
         else:
             if len(message) > 1600:
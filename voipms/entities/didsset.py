@@ -6,6 +6,23 @@ Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
 from voipms.helpers import convert_bool, validate_email
+from voipms.schema import Field, Schema
+from voipms.upload import Base64File, as_upload
+
+SET_DID_INFO = Schema("setDIDInfo", [
+    Field("did", int, "DID to be Updated", "Example: 5551234567", required=True),
+    Field("routing", str, "Main Routing for the DID", "Values from accounts.get_routes", required=True),
+    Field("pop", int, "Point of Presence for the DID", "Example: 3", required=True),
+    Field("dialtime", int, "Dial Time Out for the DID", "Example: 60 -> in seconds", required=True),
+    Field("cnam", bool, "CNAM for the DID", "Boolean: True/False", required=True, convert=convert_bool),
+    Field("billing_type", int, "Billing type for the DID", "1 = Per Minute, 2 = Flat", required=True),
+    Field("failover_busy", str, "Busy Routing for the DID"),
+    Field("failover_unreachable", str, "Unreachable Routing for the DID"),
+    Field("failover_noanswer", str, "NoAnswer Routing for the DID"),
+    Field("voicemail", int, "Voicemail for the DID", "Example: 101"),
+    Field("callerid_prefix", str, "Caller ID Prefix for the DID"),
+    Field("note", str, "Note for the DID"),
+])
 
 
 class DidsSet(BaseApi):
@@ -362,7 +379,6 @@ class DidsSet(BaseApi):
         method = "setDIDInfo"
 
         kwargs.update({
-            "method": method,
             "did": did,
             "routing": routing,
             "pop": pop,
@@ -370,8 +386,9 @@ class DidsSet(BaseApi):
             "cnam": cnam,
             "billing_type": billing_type,
         })
+        parameters = SET_DID_INFO.validate(kwargs)
 
-        return self._voipms_client._get(method, kwargs)
+        return self._voipms_client._get(method, parameters)
 
     def did_pop(self, did, pop):
         """
@@ -1062,8 +1079,9 @@ class DidsSet(BaseApi):
 
         - Adds a new Recording file entry if no Recording ID is provided
 
-        :param file: [Required] Base64 encoded file (Provide Recording ID and file if you want update the file only)
-        :type file: :py:class:`str`
+        :param file: [Required] Base64 encoded file (Provide Recording ID and file if you want update the file only).
+                     A path, a binary file object or bytes are encoded while they are sent.
+        :type file: :py:class:`str`, :py:class:`os.PathLike`, binary file object, :py:class:`bytes` or :py:class:`voipms.upload.Base64File`
         :param name: [Required] Name for the Recording Entry (Example: 'recording1')
                      - Provide Recording ID and name if you want update the name only
                      - Provide Recording ID, file and name if you want update both parameters at the same time
@@ -1076,8 +1094,9 @@ class DidsSet(BaseApi):
         """
         method = "setRecording"
 
-        if not isinstance(file, str):
-            raise ValueError("Base64 encoded file needs to be a str (Provide Recording ID and file if you want update the file only)")
+        file = as_upload(file)
+        if not isinstance(file, (str, Base64File)):
+            raise ValueError("Base64 encoded file needs to be a str, a path or a file object (Provide Recording ID and file if you want update the file only)")
 
         if not isinstance(name, str):
             raise ValueError("Name for the Recording Entry needs to be a str(Example: 'recording1')")
@@ -6,6 +6,7 @@ Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
 from voipms.helpers import validate_date
+from voipms.records import FaxMessage, with_records
 
 
 class FaxGet(BaseApi):
@@ -186,11 +187,15 @@ class FaxGet(BaseApi):
         :param folder: Name of specific Fax Folder (Example: SENT)
                        - Default value: ALL
         :type folder: :py:class:`str`
+        :param records: Return the faxes as :class:`voipms.records.FaxMessage` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
 
         :returns: :py:class:`dict`
         """
         method = "getFaxMessages"
 
+        records = kwargs.pop("records", False)
+
         parameters = {
         }
 
@@ -217,7 +222,8 @@ class FaxGet(BaseApi):
                 not_allowed_parameters += key + " "
             raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
 
-        return self._voipms_client._get(method, parameters)
+        response = self._voipms_client._get(method, parameters)
+        return with_records(response, "faxes", FaxMessage) if records else response
 
     def fax_message_pdf(self, fax_id):
         """
@@ -228,6 +234,26 @@ class FaxGet(BaseApi):
 
         :returns: :py:class:`dict`
         """
+        return self._voipms_client._get(self._fax_message_pdf_call(fax_id))
+
+    def download_fax_message_pdf_to(self, fax_id, target):
+        """
+        Saves a Fax Message as a PDF file, decoding it while it is downloaded
+
+        :param fax_id: [Required] ID of the Fax Message requested (Values from fax.get.fax_messages)
+        :type fax_id: :py:class:`int`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or binary file object
+
+        :returns: :py:class:`int` bytes written
+        """
+        method, parameters = self._fax_message_pdf_call(fax_id)
+        return self._voipms_client._download(method, parameters, ('message_base64',), target)
+
+    def _fax_message_pdf_call(self, fax_id):
+        """
+        The API call of :meth:`fax_message_pdf` with its parameters validated
+        """
         method = "getFaxMessagePDF"
 
         if not isinstance(fax_id, int):
@@ -237,7 +263,7 @@ class FaxGet(BaseApi):
             "id": fax_id,
         }
 
-        return self._voipms_client._get(method, parameters)
+        return method, parameters
 
     def fax_folders(self):
         """
@@ -6,6 +6,7 @@ Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
 from voipms.helpers import validate_email, convert_bool
+from voipms.upload import Base64File, as_upload
 
 
 class FaxSend(BaseApi):
@@ -29,8 +30,9 @@ class FaxSend(BaseApi):
         :type from_name: :py:class:`str`
         :param from_number: [Required] DID number of the Fax sender (Example: 5552341234)
         :type from_number: :py:class:`int`
-        :param file: [Required] The file must be encoded in Base64 and in one of the following formats: pdf, txt, jpg, gif, png, tif
-        :type file: :py:class:`str`
+        :param file: [Required] The file must be encoded in Base64 and in one of the following formats: pdf, txt, jpg, gif, png, tif.
+                     A path, a binary file object or bytes are encoded while they are sent, without reading the file into memory.
+        :type file: :py:class:`str`, :py:class:`os.PathLike`, binary file object, :py:class:`bytes` or :py:class:`voipms.upload.Base64File`
 
         :param send_email_enabled: Flag to enable the send of a copy of your Fax via email (True/False default False)
         :type send_email_enabled: :py:class:`bool`
@@ -54,8 +56,9 @@ class FaxSend(BaseApi):
         if not isinstance(from_number, int):
             raise ValueError("DID number of the Fax sender needs to be an int (Example: 5552341234)")
 
-        if not isinstance(file, str):
-            raise ValueError("The file must be encoded in Base64 and in one of the following formats: pdf, txt, jpg, gif, png, tif and needs to be a str")
+        file = as_upload(file)
+        if not isinstance(file, (str, Base64File)):
+            raise ValueError("The file must be encoded in Base64 and in one of the following formats: pdf, txt, jpg, gif, png, tif and needs to be a str, a path or a file object")
 
         parameters = {
             "to_number": to_number,
@@ -4,15 +4,15 @@ The General API endpoint
 
 Documentation: https://voip.ms/m/apidocs.php
 """
-from voipms.baseapi import BaseApi
-from voipms.entities.generalget import GeneralGet
+from voipms.baseapi import BaseApi, LazyEntity
 
 
 class General(BaseApi):
+    get = LazyEntity("voipms.entities.generalget", "GeneralGet")
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the endpoint
         """
         super(General, self).__init__(*args, **kwargs)
         self.endoint = 'general'
-        self.get = GeneralGet(self)
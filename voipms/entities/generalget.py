@@ -128,6 +128,28 @@ class GeneralGet(BaseApi):
         :type recording: :py:class:`int`
         :returns: :py:class:`dict`
         """
+        return self._voipms_client._get(self._conference_recording_file_call(conference, recording))
+
+    def download_conference_recording_file_to(self, conference, recording, target):
+        """
+        Saves a specific Conference Recording File, decoding it while it is downloaded
+
+        :param conference: [Required] ID for a specific Conference (Example: 5356)
+        :type conference: :py:class:`int`
+        :param recording: [Required] ID for a specific Conference Recording (Example: 1543338379)
+        :type recording: :py:class:`int`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or binary file object
+
+        :returns: :py:class:`int` bytes written
+        """
+        method, parameters = self._conference_recording_file_call(conference, recording)
+        return self._voipms_client._download(method, parameters, ('data', 'file'), target)
+
+    def _conference_recording_file_call(self, conference, recording):
+        """
+        The API call of :meth:`conference_recording_file` with its parameters validated
+        """
         method = "getConferenceRecordingFile"
 
         parameters = {}
@@ -140,7 +162,7 @@ class GeneralGet(BaseApi):
             raise ValueError("[Required] ID for a specific Conference Recording (Example: 1543338379)")
         parameters["recording"] = recording
 
-        return self._voipms_client._get(method, parameters)
+        return method, parameters
 
     def countries(self, country=None):
         """
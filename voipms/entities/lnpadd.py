@@ -5,6 +5,7 @@ The Local Number Portability (LNP) API endpoint add
 Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
+from voipms.upload import Base64File, as_upload
 
 
 class LNPAdd(BaseApi):
@@ -189,16 +190,19 @@ class LNPAdd(BaseApi):
                 raise ValueError("- If you would like to include additional information regarding this port, you can use this parameter.")
             parameters["notes"] = notes
 
-        return self._voipms_client._get(conference, parameters)
+        return self._voipms_client._get(method, parameters)
 
-    def file(self, member, conference):
+    def file(self, providerAccount, portid, file):
         """
-        Add one or more numbers to start a portability process
+        Attach a file to a portability process
 
         :param providerAccount: [Required] Your Account with your current service provider.
         :type providerAccount: :py:class:`str`
         :param portid: [Required] ID of the port previously created.
-        :param file: [Required] Base 64 code of the file to be attached
+        :type portid: :py:class:`str`
+        :param file: [Required] Base 64 code of the file to be attached.
+                     A path, a binary file object or bytes are encoded while they are sent.
+        :type file: :py:class:`str`, :py:class:`os.PathLike`, binary file object, :py:class:`bytes` or :py:class:`voipms.upload.Base64File`
         :returns: :py:class:`dict`
         """
         method = "addLNPFile"
@@ -209,8 +213,9 @@ class LNPAdd(BaseApi):
         if not isinstance(portid, str):
             raise ValueError("[Required] ID of the port previously created.")
 
-        if not isinstance(file, str):
-            raise ValueError("[Required] Base 64 code of the file to be attached")
+        file = as_upload(file)
+        if not isinstance(file, (str, Base64File)):
+            raise ValueError("[Required] Base 64 code of the file to be attached needs to be a str, a path or a file object")
 
         parameters = {
             "providerAccount": providerAccount,
@@ -218,4 +223,4 @@ class LNPAdd(BaseApi):
             "file": file
         }
 
-        return self._voipms_client._post(conference, parameters)
+        return self._voipms_client._post(method, parameters)
@@ -6,6 +6,7 @@ Documentation: https://voip.ms/m/apidocs.php
 """
 from voipms.baseapi import BaseApi
 from voipms.helpers import validate_date
+from voipms.records import VoicemailMessage, with_records
 
 
 class VoicemailGet(BaseApi):
@@ -128,6 +129,30 @@ class VoicemailGet(BaseApi):
 
         :returns: :py:class:`dict`
         """
+        return self._voipms_client._get(self._voicemail_message_file_call(mailbox, folder, message_num))
+
+    def download_voicemail_message_file_to(self, mailbox, folder, message_num, target):
+        """
+        Saves a specific Voicemail Message File, decoding it while it is downloaded
+
+        :param mailbox: [Required] ID for a specific Mailbox (Example: 1001)
+        :type mailbox: :py:class:`int`
+        :param folder: [required] Name for specific Folder (Required if message id is passed, Example: 'INBOX', values from: voicemail.voicemail_folders)
+        :type folder: :py:class:`str`
+        :param message_num: [required] ID for specific Voicemail Message (Required if folder is passed, Example: 1)
+        :type message_num: :py:class:`int`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or binary file object
+
+        :returns: :py:class:`int` bytes written
+        """
+        method, parameters = self._voicemail_message_file_call(mailbox, folder, message_num)
+        return self._voipms_client._download(method, parameters, ('data', 'file'), target)
+
+    def _voicemail_message_file_call(self, mailbox, folder, message_num):
+        """
+        The API call of :meth:`voicemail_message_file` with its parameters validated
+        """
         method = "getVoicemailMessageFile"
 
         if not isinstance(mailbox, int):
@@ -145,7 +170,7 @@ class VoicemailGet(BaseApi):
             "message_num": message_num,
         }
 
-        return self._voipms_client._get(method, parameters)
+        return method, parameters
 
     def voicemail_messages(self, mailbox, **kwargs):
         """
@@ -154,27 +179,8 @@ class VoicemailGet(BaseApi):
         - Retrieves a list of Voicemail Messages in a Folder if a folder is provided
         - Retrieves a list of Voicemail Messages in a date range if a from and to are provided
 
-        :param mailbox: [Required] ID for a specific vpri (Example: 1001)
+        :param mailbox: [Required] ID for a specific Mailbox (Example: 1001)
         :type mailbox: :py:class:`int`
-        :returns: :py:class:`dict`
-        """
-        method = "getVPRIs"
-
-        if not isinstance(mailbox, int):
-            raise ValueError("")
-
-        parameters = {
-            "mailbox": mailbox,
-        }
-
-        return self._voipms_client._get(method, parameters)
-
-    def vpris(self, vpri):
-        """
-        Retrieves a list of vpri
-
-        :param vpri: [Required] ID for a specific Mailbox (Example: 1001)
-        :type vpri: :py:class:`int`
 
         :param folder: Name for specific Folder (Required if message id is passed, Example: 'INBOX', values from: voicemail.voicemail_folders)
         :type folder: :py:class:`str`
@@ -182,16 +188,20 @@ class VoicemailGet(BaseApi):
         :type date_from: :py:class:`str`
         :param date_to: End Date for Filtering Voicemail Messages (Example: '2016-01-30')
         :type date_to: :py:class:`str`
+        :param records: Return the messages as :class:`voipms.records.VoicemailMessage` instead of dicts (Default: False)
+        :type records: :py:class:`bool`
 
         :returns: :py:class:`dict`
         """
         method = "getVoicemailMessages"
 
-        if not isinstance(vpri, int):
+        records = kwargs.pop("records", False)
+
+        if not isinstance(mailbox, int):
             raise ValueError("ID for a specific Mailbox needs to be an int (Example: 1001)")
 
         parameters = {
-            "vpri": vpri,
+            "mailbox": mailbox,
         }
 
         if "folder" in kwargs:
@@ -217,4 +227,25 @@ class VoicemailGet(BaseApi):
                 not_allowed_parameters += key + " "
             raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
 
+        response = self._voipms_client._get(method, parameters)
+        return with_records(response, "messages", VoicemailMessage) if records else response
+
+    def vpris(self, vpri):
+        """
+        Retrieves a list of vpri
+
+        :param vpri: [Required] ID for a specific vpri (Example: 1001)
+        :type vpri: :py:class:`int`
+
+        :returns: :py:class:`dict`
+        """
+        method = "getVPRIs"
+
+        if not isinstance(vpri, int):
+            raise ValueError("ID for a specific vpri needs to be an int (Example: 1001)")
+
+        parameters = {
+            "vpri": vpri,
+        }
+
         return self._voipms_client._get(method, parameters)
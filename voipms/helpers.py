@@ -1,6 +1,8 @@
 import datetime
 import re
 
+from voipms.schema import Field, Schema
+
 
 def convert_bool(boolean):
     if not isinstance(boolean, bool):
@@ -19,6 +21,60 @@ def validate_date(date_text):
     return date_object
 
 
+def date_windows(date_from, date_to, days=1):
+    """
+    Split an inclusive date range into consecutive windows
+
+    >>> date_windows(datetime.date(2024, 1, 1), datetime.date(2024, 1, 5), days=2)
+    [('2024-01-01', '2024-01-02'), ('2024-01-03', '2024-01-04'), ('2024-01-05', '2024-01-05')]
+
+    :param date_from: First day of the range
+    :type date_from: :py:class:`datetime.date`
+    :param date_to: Last day of the range
+    :type date_to: :py:class:`datetime.date`
+    :param days: Number of days per window (Default: 1)
+    :type days: :py:class:`int`
+    :returns: :py:class:`list` of (date_from, date_to) tuples formatted as YYYY-MM-DD
+    """
+    if not isinstance(days, int) or isinstance(days, bool) or days < 1:
+        raise ValueError("Number of days per window needs to be an int of at least 1")
+    windows = []
+    start = date_from
+    while start <= date_to:
+        end = min(start + datetime.timedelta(days=days - 1), date_to)
+        windows.append((start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+        start = end + datetime.timedelta(days=1)
+    return windows
+
+
+def split_message(message, size=160):
+    """
+    Split a message into parts of at most size chars, at spaces where possible
+
+    >>> split_message("hello John Smith", size=10)
+    ['hello John', 'Smith']
+
+    :param message: The message to split
+    :type message: :py:class:`str`
+    :param size: Maximum number of chars per part (Default: 160)
+    :type size: :py:class:`int`
+    :returns: :py:class:`list` of :py:class:`str`
+    """
+    if not isinstance(size, int) or isinstance(size, bool) or size < 1:
+        raise ValueError("Number of chars per part needs to be an int of at least 1")
+    parts = []
+    while len(message) > size:
+        cut = message.rfind(" ", 1, size + 1)
+        if cut == -1:
+            parts.append(message[:size])
+            message = message[size:]
+        else:
+            parts.append(message[:cut])
+            message = message[cut + 1:]
+    parts.append(message)
+    return parts
+
+
 def validate_email(email):
     match = re.match('^[_a-z0-9-]+(\.[_a-z0-9-]+)*@[a-z0-9-]+(\.[a-z0-9-]+)*(\.[a-z]{2,4})$', email)
     if match:
@@ -27,170 +83,83 @@ def validate_email(email):
         return False
 
 
-def order(**kwargs):
+def _order_fields(ratecenter_values):
+    return [
+        Field("did", int, "DID to be Ordered", "Example: 5552223333"),
+        Field("digits", int, "Three Digits for the new Virtual DID", "Example: 001"),
+        Field("location_id", int, "ID for a specific International Location",
+              "Values from dids.get_dids_international_geographic"),
+        Field("quantity", int, "Number of dids to be purchased", "Example: 2"),
+        Field("state", str, "USA State", "Values from dids.get_states"),
+        Field("province", str, "Canadian Province", "Values from dids.get_provinces"),
+        Field("ratecenter", str, "Ratecenter", ratecenter_values),
+        Field("routing", str, "Main Routing for the DID", "Values from accounts.get_routes"),
+        Field("failover_busy", str, "Busy Routing for the DID"),
+        Field("failover_unreachable", str, "Unreachable Routing for the DID"),
+        Field("failover_noanswer", str, "NoAnswer Routing for the DID"),
+        Field("voicemail", int, "Voicemail for the DID", "Example: 101"),
+        Field("pop", int, "Point of Presence for the DID", "Example: 5"),
+        Field("dialtime", int, "Dial Time Out for the DID", "Example: 60 -> in seconds"),
+        Field("cnam", bool, "CNAM for the DID", "Boolean: True/False", convert=convert_bool),
+        Field("carrier", int, "Carrier for the DID", "Values from dids.get_carriers"),
+        Field("callerid_prefix", str, "Caller ID Prefix for the DID"),
+        Field("note", str, "Note for the DID"),
+        Field("billing_type", int, "Billing type for the DID", "1 = Per Minute, 2 = Flat"),
+        Field("account", str, "Reseller Sub Account", "Example: '100001_VoIP'"),
+        Field("monthly", float, "Montly Fee for Reseller Client", "Example: 3.50"),
+        Field("setup", float, "Setup Fee for Reseller Client", "Example: 1.99"),
+        Field("minute", float, "Minute Rate for Reseller Client", "Example: 0.03"),
+        Field("test", bool, "Test", "True/False", convert=convert_bool),
+    ]
+
+
+_INTERNATIONAL_ORDER = ("location_id", "quantity", "routing", "pop", "dialtime", "cnam")
+_DID_ORDER = ("did", "routing", "pop", "dialtime", "cnam", "billing_type")
+
+ORDER_SCHEMAS = {
+    method: Schema(method, _order_fields(ratecenter_values), required=required)
+    for method, required, ratecenter_values in (
+        ("backOrderDIDUSA", ("quantity", "state", "ratecenter", "routing", "pop", "dialtime", "cnam", "billing_type"),
+         "Values from dids.get_rate_centers_usa"),
+        ("backOrderDIDCAN", ("quantity", "province", "ratecenter", "routing", "pop", "dialtime", "cnam", "billing_type"),
+         "Values from dids.get_rate_centers_can"),
+        ("orderDID", _DID_ORDER, None),
+        ("orderDIDInternationalGeographic", _INTERNATIONAL_ORDER, None),
+        ("orderDIDInternationalNational", _INTERNATIONAL_ORDER, None),
+        ("orderDIDInternationalTollFree", _INTERNATIONAL_ORDER, None),
+        ("orderDIDVirtual", ("digits", "routing", "pop", "dialtime", "cnam", "billing_type"), None),
+        ("orderTollFree", _DID_ORDER, None),
+        ("orderVanity", ("did", "routing", "pop", "dialtime", "cnam", "billing_type", "carrier"), None),
+    )
+}
 
-    parameters = {}
 
-    international_fields = ("location_id", "quantity", "routing", "pop", "dialtime", "cnam")
-    did_fields = ("did", "routing", "pop", "dialtime", "cnam", "billing_type")
-    required_fields = {
-        "backOrderDIDUSA": ("quantity", "state", "ratecenter", "routing", "pop", "dialtime", "cnam", "billing_type"),
-        "backOrderDIDCAN": ("quantity", "province", "ratecenter", "routing", "pop", "dialtime", "cnam", "billing_type"),
-        "orderDID": did_fields,
-        "orderDIDInternationalGeographic": international_fields,
-        "orderDIDInternationalNational": international_fields,
-        "orderDIDInternationalTollFree": international_fields,
-        "orderDIDVirtual": ("digits", "routing", "pop", "dialtime", "cnam", "billing_type"),
-        "orderTollFree": did_fields,
-        "orderVanity": ("did", "routing", "pop", "dialtime", "cnam", "billing_type", "carrier"),
-    }
+def order(**kwargs):
 
     # Minimize possibility of code injection
     if "method" in kwargs:
         if not isinstance(kwargs["method"], str):
             raise ValueError("method needs to be a str")
         else:
-            if kwargs["method"] not in required_fields:
+            if kwargs["method"] not in ORDER_SCHEMAS:
                 raise ValueError("This method is not allowed")
         method = kwargs.pop("method")
     else:
         raise ValueError("A method needs to be specified")
 
-    if "did" in kwargs:
-        if not isinstance(kwargs["did"], int):
-            raise ValueError("DID to be Ordered needs to be an int (Example: 5552223333)")
-        parameters["did"] = kwargs.pop("did")
-
-    if "digits" in kwargs:
-        if not isinstance(kwargs["digits"], int):
-            raise ValueError("Three Digits for the new Virtual DID needs to be an int (Example: 001)")
-        parameters["digits"] = kwargs.pop("digits")
-
-    if "location_id" in kwargs:
-        if not isinstance(kwargs["location_id"], int):
-            raise ValueError("ID for a specific International Location needs to be an int (Values from dids.get_dids_international_geographic)")
-        parameters["location_id"] = kwargs.pop("location_id")
-
-    if "quantity" in kwargs:
-        if not isinstance(kwargs["quantity"], int):
-            raise ValueError("Number of dids to be purchased needs to be an int (Example: 2)")
-        parameters["quantity"] = kwargs.pop("quantity")
-
-    if "state" in kwargs:
-        if not isinstance(kwargs["state"], str):
-            raise ValueError("USA State needs to be a str (values from dids.get_states)")
-        parameters["state"] = kwargs.pop("state")
-
-    if "province" in kwargs:
-        if not isinstance(kwargs["province"], str):
-            raise ValueError("Canadian Province needs to be a str (values from dids.get_provinces)")
-        parameters["province"] = kwargs.pop("province")
-
-    if "ratecenter" in kwargs:
-        if not isinstance(kwargs["ratecenter"], str):
-            if method == "backOrderDIDUSA":
-                raise ValueError("USA Ratecenter needs to be a str (Values from dids.get_rate_centers_usa)")
-            else:
-                raise ValueError("Canada Ratecenter needs to be a str (Values from dids.get_rate_centers_can)")
-        parameters["ratecenter"] = kwargs.pop("ratecenter")
-
-    if "routing" in kwargs:
-        if not isinstance(kwargs["routing"], str):
-            raise ValueError("Main Routing for the DID needs to be an int (Values from accounts.get_routes)")
-        parameters["routing"] = kwargs.pop("routing")
-
-    if "failover_busy" in kwargs:
-        if not isinstance(kwargs["failover_busy"], str):
-            raise ValueError("Busy Routing for the DID needs to be a str")
-        parameters["failover_busy"] = kwargs.pop("failover_busy")
-
-    if "failover_unreachable" in kwargs:
-        if not isinstance(kwargs["failover_unreachable"], str):
-            raise ValueError("Unreachable Routing for the DID needs to be a str")
-        parameters["failover_unreachable"] = kwargs.pop("failover_unreachable")
-
-    if "failover_noanswer" in kwargs:
-        if not isinstance(kwargs["failover_noanswer"], str):
-            raise ValueError("NoAnswer Routing for the DID")
-        parameters["failover_noanswer"] = kwargs.pop("failover_noanswer")
-
-    if "voicemail" in kwargs:
-        if not isinstance(kwargs["voicemail"], int):
-            raise ValueError("Voicemail for the DID needs to be an int (Example: 101)")
-        parameters["voicemail"] = kwargs.pop("voicemail")
-
-    if "pop" in kwargs:
-        if not isinstance(kwargs["pop"], int):
-            raise ValueError("Point of pop for the DID needs to be an int (Example: 5)")
-        parameters["pop"] = kwargs.pop("pop")
-
-    if "dialtime" in kwargs:
-        if not isinstance(kwargs["dialtime"], int):
-            raise ValueError("Dial Time Out for the DID needs to be an int (Example: 60 -> in seconds)")
-        parameters["dialtime"] = kwargs.pop("dialtime")
-
-    if "cnam" in kwargs:
-        if not isinstance(kwargs["cnam"], bool):
-            raise ValueError("CNAM for the DID needs to be a bool (Boolean: True/False)")
-        parameters["cnam"] = convert_bool(kwargs.pop("cnam"))
-
-    if "carrier" in kwargs:
-        if not isinstance(kwargs["carrier"], int):
-            raise ValueError("Carrier for the DID needs to be a bool (Values from dids.get_carriers)")
-        parameters["carrier"] = convert_bool(kwargs.pop("carrier"))
-
-    if "callerid_prefix" in kwargs:
-        if not isinstance(kwargs["callerid_prefix"], str):
-            raise ValueError("Caller ID Prefix for the DID needs to be a str")
-        parameters["callerid_prefix"] = kwargs.pop("callerid_prefix")
-
-    if "note" in kwargs:
-        if not isinstance(kwargs["note"], str):
-            raise ValueError("Note for the DID needs to be a str")
-        parameters["note"] = kwargs.pop("note")
-
-    if "billing_type" in kwargs:
-        if not isinstance(kwargs["billing_type"], int):
-            raise ValueError("Billing type for the DID needs to be an int (1 = Per Minute, 2 = Flat)")
-        parameters["billing_type"] = kwargs.pop("billing_type")
-
-    if "account" in kwargs:
-        if not isinstance(kwargs["account"], str):
-            raise ValueError("Reseller Sub Account needs to be a str (Example: '100001_VoIP')")
-        parameters["account"] = kwargs.pop("account")
-
-    if "monthly" in kwargs:
-        if not isinstance(kwargs["monthly"], float):
-            raise ValueError("Montly Fee for Reseller Client needs to be a float (Example: 3.50)")
-        parameters["monthly"] = kwargs.pop("monthly")
-
-    if "setup" in kwargs:
-        if not isinstance(kwargs["setup"], float):
-            raise ValueError("Setup Fee for Reseller Client needs to be a float (Example: 1.99)")
-        parameters["setup"] = kwargs.pop("setup")
-
-    if "minute" in kwargs:
-        if not isinstance(kwargs["minute"], float):
-            raise ValueError("Minute Rate for Reseller Client needs to be a float (Example: 0.03)")
-        parameters["minute"] = kwargs.pop("minute")
-
-    if "test" in kwargs:
-        if not isinstance(kwargs["test"], bool):
-            raise ValueError("Test needs to be a bool (True/False)")
-        parameters["test"] = convert_bool(kwargs.pop("test"))
+    return method, ORDER_SCHEMAS[method].validate(kwargs)
 
-    if len(kwargs) > 0:
-        not_allowed_parameters = ""
-        for key, value in kwargs.items():
-            not_allowed_parameters += key + " "
-        raise ValueError("Parameters not allowed: {}".format(not_allowed_parameters))
 
-    # Verify again if all required fields present
-    for field in required_fields[method]:
-        if field not in parameters:
-            raise ValueError("The parameter {} is required".format(field))
+class VoipMsError(TypeError):
+    """
+    Error status returned by the voip.ms API
 
-    return method, parameters
+    The message is the description from ERROR_CODES, the raw status is kept in
+    the status attribute.
+    """
+    def __init__(self, status):
+        super(VoipMsError, self).__init__(ERROR_CODES.get(status, status))
+        self.status = status
 
 
 ERROR_CODES = {
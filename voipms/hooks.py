@@ -0,0 +1,85 @@
+"""
+Hooks called around every HTTP request of a client
+
+A hook is an object with the methods of :class:`Hooks`. Every request to
+the API, retries included, creates a :class:`RequestEvent` which is passed
+to before_request, filled in while the request runs and passed to
+after_response or on_error.
+
+    class SlowCalls(Hooks):
+        def after_response(self, event):
+            if event.http_latency > 1:
+                log.warning("%s took %.1f s", event.method, event.http_latency)
+
+    client = VoipMs(user, password, hooks=[SlowCalls(), MetricsCollector()])
+"""
+import time
+
+
+class RequestEvent(object):
+    """
+    What is known about one HTTP request of an API method
+
+    - method: The API method (Example: 'getCDR')
+    - http_method: 'GET' or 'POST'
+    - parameter_size: Bytes of the encoded parameters, credentials excluded
+    - started: time.perf_counter() when the request was sent
+    - http_latency: Seconds until the whole response was received, None before
+    - decode_time: Seconds spent decoding the JSON body, None before
+    - response_size: Bytes of the response body, None before
+    - http_status: HTTP status code of the response, None before
+    - status: The voip.ms status of the response (Example: 'success', 'invalid_did')
+    - error: The exception raised for the request, None without error
+    - span: The tracing span of the request, None without tracer
+    """
+    __slots__ = ("method", "http_method", "parameter_size", "started", "http_latency",
+                 "decode_time", "response_size", "http_status", "status", "error", "span")
+
+    def __init__(self, method, http_method, parameter_size):
+        self.method = method
+        self.http_method = http_method
+        self.parameter_size = parameter_size
+        self.started = time.perf_counter()
+        self.http_latency = None
+        self.decode_time = None
+        self.response_size = None
+        self.http_status = None
+        self.status = None
+        self.error = None
+        self.span = None
+
+    def __repr__(self):
+        return "RequestEvent({})".format(", ".join(
+            "{}={!r}".format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class Hooks(object):
+    """
+    Base class of the hooks, every method does nothing
+
+    Hooks run in the thread or task sending the request and should return
+    quickly. An exception raised by a hook is raised by the API call.
+    """
+    def before_request(self, event):
+        """
+        Called before the request is sent
+
+        :param event: The request
+        :type event: :class:`RequestEvent`
+        """
+
+    def after_response(self, event):
+        """
+        Called after the response was decoded and its status is success
+
+        :param event: The request with its timings, sizes and status
+        :type event: :class:`RequestEvent`
+        """
+
+    def on_error(self, event):
+        """
+        Called when the request failed or the API answered with an error status
+
+        :param event: The request, with the exception in error
+        :type event: :class:`RequestEvent`
+        """
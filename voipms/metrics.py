@@ -0,0 +1,215 @@
+"""
+Metrics of the API calls of one or more clients
+
+MetricsCollector is a hook counting every HTTP request per API method:
+latency histograms, decode time, bytes sent and received and errors by
+voip.ms status. render() returns them in the Prometheus text format, to be
+served on a /metrics endpoint or written for the node exporter.
+
+    metrics = MetricsCollector()
+    client = VoipMs(user, password, hooks=metrics)
+    ...
+    print(metrics.render())
+"""
+import bisect
+import threading
+
+from .hooks import Hooks
+
+# Upper bounds in seconds of the latency buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    """
+    >>> _escape('say "hi"\\n')
+    'say \\\\"hi\\\\"\\\\n'
+    """
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _error_label(event):
+    """
+    The status label of a failed request
+
+    The voip.ms status for API errors (a key of ERROR_CODES), http_<code>
+    for HTTP errors and the name of the exception for anything else.
+    """
+    if event.status is not None and event.status != "success":
+        return event.status
+    if event.http_status is not None and event.http_status >= 400:
+        return "http_{}".format(event.http_status)
+    return type(event.error).__name__
+
+
+class _MethodMetrics(object):
+    """
+    The counters of one API method
+    """
+    def __init__(self, buckets):
+        self.requests = 0
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.decode_sum = 0.0
+        self.decode_count = 0
+        self.parameter_bytes = 0
+        self.response_bytes = 0
+        self.errors = {}
+
+
+class MetricsCollector(Hooks):
+    """
+    Per method latency histograms, sizes and error counts of API calls
+
+    :param buckets: Upper bounds in seconds of the latency histogram buckets (Default: DEFAULT_BUCKETS)
+    :type buckets: :py:class:`tuple`
+    :param prefix: Prefix of the metric names (Default: 'voipms')
+    :type prefix: :py:class:`str`
+
+    >>> from voipms.hooks import RequestEvent
+    >>> metrics = MetricsCollector(buckets=(0.1, 1))
+    >>> event = RequestEvent("getBalance", "GET", 16)
+    >>> event.http_latency, event.decode_time, event.response_size = 0.05, 0.001, 120
+    >>> metrics.after_response(event)
+    >>> metrics.snapshot()["getBalance"]["latency_buckets"]
+    [(0.1, 1), (1.0, 1), (inf, 1)]
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="voipms"):
+        super(MetricsCollector, self).__init__()
+        buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        if not buckets or buckets[0] <= 0:
+            raise ValueError("Latency buckets need to be positive numbers of seconds (Example: (0.1, 1, 10))")
+        self.buckets = buckets
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    def _metrics(self, method):
+        metrics = self._methods.get(method)
+        if metrics is None:
+            metrics = self._methods[method] = _MethodMetrics(self.buckets)
+        return metrics
+
+    def _count(self, event):
+        """
+        Add a finished request, the lock has to be held
+        """
+        metrics = self._metrics(event.method)
+        metrics.requests += 1
+        metrics.parameter_bytes += event.parameter_size or 0
+        if event.http_latency is not None:
+            metrics.bucket_counts[bisect.bisect_left(self.buckets, event.http_latency)] += 1
+            metrics.latency_sum += event.http_latency
+            metrics.latency_count += 1
+        if event.decode_time is not None:
+            metrics.decode_sum += event.decode_time
+            metrics.decode_count += 1
+        if event.response_size is not None:
+            metrics.response_bytes += event.response_size
+        return metrics
+
+    def after_response(self, event):
+        with self._lock:
+            self._count(event)
+
+    def on_error(self, event):
+        label = _error_label(event)
+        with self._lock:
+            errors = self._count(event).errors
+            errors[label] = errors.get(label, 0) + 1
+
+    def reset(self):
+        """
+        Forget all counts
+        """
+        with self._lock:
+            self._methods.clear()
+
+    def snapshot(self):
+        """
+        The counts per API method
+
+        :returns: :py:class:`dict` of method to a dict with the keys requests,
+                  latency_buckets (cumulative (upper bound, count) pairs), latency_sum,
+                  decode_sum, decode_count, parameter_bytes, response_bytes and errors
+        """
+        with self._lock:
+            snapshot = {}
+            for method, metrics in self._methods.items():
+                cumulative, buckets = 0, []
+                for bound, count in zip(self.buckets + (float("inf"),), metrics.bucket_counts):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                snapshot[method] = {
+                    "requests": metrics.requests,
+                    "latency_buckets": buckets,
+                    "latency_sum": metrics.latency_sum,
+                    "latency_count": metrics.latency_count,
+                    "decode_sum": metrics.decode_sum,
+                    "decode_count": metrics.decode_count,
+                    "parameter_bytes": metrics.parameter_bytes,
+                    "response_bytes": metrics.response_bytes,
+                    "errors": dict(metrics.errors),
+                }
+            return snapshot
+
+    def render(self):
+        """
+        The metrics in the Prometheus text exposition format
+
+        :returns: :py:class:`str`
+        """
+        snapshot = sorted(self.snapshot().items())
+        name = self.prefix + "_"
+        lines = []
+
+        def family(metric, kind, description):
+            lines.append("# HELP {}{} {}".format(name, metric, description))
+            lines.append("# TYPE {}{} {}".format(name, metric, kind))
+
+        family("requests_total", "counter", "HTTP requests sent per API method, retries included.")
+        for method, metrics in snapshot:
+            lines.append('{}requests_total{{method="{}"}} {}'.format(name, _escape(method), metrics["requests"]))
+
+        family("request_duration_seconds", "histogram", "Seconds until the whole response was received.")
+        for method, metrics in snapshot:
+            method = _escape(method)
+            for bound, count in metrics["latency_buckets"]:
+                lines.append('{}request_duration_seconds_bucket{{method="{}",le="{}"}} {}'.format(
+                    name, method, _number(bound), count))
+            lines.append('{}request_duration_seconds_sum{{method="{}"}} {}'.format(
+                name, method, _number(metrics["latency_sum"])))
+            lines.append('{}request_duration_seconds_count{{method="{}"}} {}'.format(
+                name, method, metrics["latency_count"]))
+
+        family("decode_duration_seconds", "summary", "Seconds spent decoding the JSON responses.")
+        for method, metrics in snapshot:
+            method = _escape(method)
+            lines.append('{}decode_duration_seconds_sum{{method="{}"}} {}'.format(
+                name, method, _number(metrics["decode_sum"])))
+            lines.append('{}decode_duration_seconds_count{{method="{}"}} {}'.format(
+                name, method, metrics["decode_count"]))
+
+        family("request_parameter_bytes_total", "counter", "Bytes of the encoded parameters sent.")
+        for method, metrics in snapshot:
+            lines.append('{}request_parameter_bytes_total{{method="{}"}} {}'.format(
+                name, _escape(method), metrics["parameter_bytes"]))
+
+        family("response_bytes_total", "counter", "Bytes of the response bodies received.")
+        for method, metrics in snapshot:
+            lines.append('{}response_bytes_total{{method="{}"}} {}'.format(
+                name, _escape(method), metrics["response_bytes"]))
+
+        family("errors_total", "counter", "Failed requests by voip.ms status, HTTP status or exception.")
+        for method, metrics in snapshot:
+            for status, count in sorted(metrics["errors"].items()):
+                lines.append('{}errors_total{{method="{}",status="{}"}} {}'.format(
+                    name, _escape(method), _escape(status), count))
+        return "\n".join(lines) + "\n"
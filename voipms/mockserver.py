@@ -0,0 +1,598 @@
+"""
+A local stand-in for the voip.ms REST API
+
+MockServer answers GET and POST requests to rest.php the way voip.ms does:
+the credentials are checked, the method is dispatched and the answer is a
+JSON document with a status. The list methods serve synthetic datasets of a
+configurable size. Latency, API error codes and rate limiting can be
+simulated, so the client can be tested and benchmarked without an account.
+
+    with MockServer(size=1000, latency=0.01) as server:
+        client = server.client()
+        client.calls.get.cdr('2024-01-01', '2024-01-31', 0, answered=True)
+
+The client can also be pointed at a running server with the VOIPMS_API_URL
+environment variable:
+
+    python -m voipms.mockserver --port 8080 --size 10000
+    VOIPMS_API_URL=http://127.0.0.1:8080/api/v1/rest.php python script.py
+"""
+import argparse
+import base64
+import datetime
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .helpers import ERROR_CODES
+
+PATH = "/api/v1/rest.php"
+
+_DISPOSITIONS = (("ANSWERED", "answered"), ("NO ANSWER", "noanswer"),
+                 ("BUSY", "busy"), ("FAILED", "failed"))
+_ACCOUNTS = ("VoIP", "Office", "Home", "Mobile")
+_DESCRIPTIONS = ("Inbound DID", "Outgoing to Canada", "Outgoing to USA", "Outgoing to International")
+_PROVINCES = (("AB", "Alberta"), ("BC", "British Columbia"), ("MB", "Manitoba"),
+              ("NB", "New Brunswick"), ("NL", "Newfoundland and Labrador"),
+              ("NS", "Nova Scotia"), ("NT", "Northwest Territories"), ("NU", "Nunavut"),
+              ("ON", "Ontario"), ("PE", "Prince Edward Island"), ("QC", "Quebec"),
+              ("SK", "Saskatchewan"), ("YT", "Yukon"))
+_SERVERS = (("San Jose-2", "sanjose2.voip.ms"), ("Seattle-1", "seattle1.voip.ms"),
+            ("Toronto-1", "toronto1.voip.ms"), ("Montreal-1", "montreal1.voip.ms"))
+
+
+class Dataset(object):
+    """
+    Synthetic accounts, DIDs, calls and messages
+
+    The same size and seed always give the same data. The calls and messages
+    are spread over the days_back days up to now, newest first. Every list is
+    generated on first use.
+
+    :param size: Number of rows of every list (Example: 1000)
+    :type size: :py:class:`int`
+    :param seed: Seed of the random generator (Default: 0)
+    :type seed: :py:class:`int`
+    :param days_back: Number of days covered by the calls and messages (Default: 30)
+    :type days_back: :py:class:`int`
+    """
+    LISTS = ("accounts", "dids", "cdr", "sms", "faxes", "voicemail_messages")
+
+    def __init__(self, size=100, seed=0, days_back=30):
+        super(Dataset, self).__init__()
+        if not isinstance(size, int) or size < 1:
+            raise ValueError("Size of the dataset needs to be an int of at least 1")
+        self.size = size
+        self.seed = seed
+        self.now = datetime.datetime.now().replace(microsecond=0)
+        self.step = datetime.timedelta(days=days_back) / size
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name not in self.LISTS:
+            raise AttributeError(name)
+        with self._lock:
+            if name not in self.__dict__:
+                rng = random.Random("{}:{}".format(self.seed, name))
+                self.__dict__[name] = getattr(self, "_make_" + name)(rng)
+        return self.__dict__[name]
+
+    def _date(self, index):
+        return (self.now - self.step * index).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _did(self, rng):
+        return str(5550000000 + rng.randrange(self.size))
+
+    def _make_accounts(self, rng):
+        return [{
+            "account": "100000_{}".format(name), "username": name, "description": name,
+            "protocol": "1", "auth_type": "1", "device_type": "2", "callerid_number": "",
+        } for name in _ACCOUNTS]
+
+    def _make_dids(self, rng):
+        return [{
+            "did": str(5550000000 + index), "description": "Line {}".format(index),
+            "routing": "account:100000_" + _ACCOUNTS[index % len(_ACCOUNTS)],
+            "failover_busy": "none:", "failover_unreachable": "none:", "failover_noanswer": "none:",
+            "voicemail": "101", "pop": "3", "dialtime": "60", "cnam": "1", "e911": "0",
+            "callerid_prefix": "", "note": "", "billing_type": "1",
+            "next_billing": self.now.strftime("%Y-%m-%d"), "order_date": self._date(self.size - index),
+            "reseller_account": "0", "reseller_next_billing": "", "reseller_monthly": "",
+            "reseller_minute": "", "reseller_setup": "", "sms_available": "1", "sms_enabled": "1",
+            "sms_email": "", "sms_email_enabled": "0", "sms_forward": "", "sms_forward_enabled": "0",
+            "sms_url_callback": "", "sms_url_callback_enabled": "0", "sms_url_callback_retry": "0",
+        } for index in range(self.size)]
+
+    def _make_cdr(self, rng):
+        cdr = []
+        for index in range(self.size):
+            disposition = rng.choice(_DISPOSITIONS)[0]
+            seconds = rng.randint(1, 1800) if disposition == "ANSWERED" else 0
+            rate = rng.choice(("0.00900000", "0.01000000", "0.01500000"))
+            cdr.append({
+                "date": self._date(index), "callerid": "\"Caller\" <{}>".format(5559000000 + rng.randint(0, 9999)),
+                "destination": str(5551000000 + rng.randint(0, 9999)),
+                "description": rng.choice(_DESCRIPTIONS),
+                "account": "100000_" + rng.choice(_ACCOUNTS), "disposition": disposition,
+                "duration": "{:02d}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60),
+                "seconds": str(seconds), "rate": rate,
+                "total": "{:.8f}".format(float(rate) * ((seconds + 59) // 60)),
+                "uniqueid": str(10000000 + index), "destination_type": rng.choice(("Local", "Toll Free")),
+            })
+        return cdr
+
+    def _make_sms(self, rng):
+        return [{
+            "id": str(self.size - index), "date": self._date(index), "type": str(rng.randint(0, 1)),
+            "did": self._did(rng), "contact": str(5552000000 + rng.randint(0, 99)),
+            "message": "Message {}".format(self.size - index),
+        } for index in range(self.size)]
+
+    def _make_faxes(self, rng):
+        return [{
+            "id": str(self.size - index), "date": self._date(index), "callerid": str(5553000000 + index % 100),
+            "stationid": "", "destination": self._did(rng), "description": "",
+            "pages": str(rng.randint(1, 10)), "duration": str(rng.randint(10, 300)),
+            "status": "success", "folder": rng.choice(("INBOX", "SENT")),
+        } for index in range(self.size)]
+
+    def file(self, name, size):
+        """
+        The same random bytes for the same name, like a recording or a fax
+
+        :param name: Identity of the file
+        :type name: :py:class:`str`
+        :param size: Bytes of the file
+        :type size: :py:class:`int`
+        :returns: :py:class:`bytes`
+        """
+        if size <= 0:
+            return b""
+        rng = random.Random("{}:file:{}".format(self.seed, name))
+        # The same bytes as Random.randbytes, which needs Python 3.9
+        return rng.getrandbits(size * 8).to_bytes(size, "little")
+
+    def _make_voicemail_messages(self, rng):
+        return [{
+            "mailbox": "1001", "folder": "INBOX", "message_num": str(index), "date": self._date(index),
+            "callerid": "\"Caller\" <{}>".format(5554000000 + index % 100),
+            "duration": "00:00:{:02d}".format(rng.randint(1, 59)),
+            "urgent": "no", "listened": rng.choice(("no", "yes")),
+        } for index in range(self.size)]
+
+
+class MockServer(object):
+    """
+    A threaded HTTP server answering voip.ms API calls on localhost
+
+    :param voip_user: The accepted API user (Default: 'mock@example.com')
+    :type voip_user: :py:class:`str`
+    :param voip_api_password: The accepted API password (Default: 'secret')
+    :type voip_api_password: :py:class:`str`
+    :param size: Number of rows of the synthetic datasets (Default: 100)
+    :type size: :py:class:`int`
+    :param latency: Seconds every response is delayed (Default: 0)
+    :type latency: :py:class:`float`
+    :param jitter: Up to this many seconds added at random to the latency (Default: 0)
+    :type jitter: :py:class:`float`
+    :param rate: API calls per second served, others get HTTP 429 (Default: None, no limit)
+    :type rate: :py:class:`float`
+    :param burst: API calls served at once before the rate applies (Default: max(1, rate))
+    :type burst: :py:class:`int`
+    :param error_rate: Share of the API calls answered with a random error code (Default: 0)
+    :type error_rate: :py:class:`float`
+    :param errors: Error codes picked from with error_rate (Default: all of helpers.ERROR_CODES)
+    :type errors: :py:class:`list`
+    :param seed: Seed of the datasets and the injected errors (Default: 0)
+    :type seed: :py:class:`int`
+    :param file_size: Bytes of the fax, voicemail and recording files (Default: 65536)
+    :type file_size: :py:class:`int`
+    :param host: Address to listen on (Default: '127.0.0.1')
+    :type host: :py:class:`str`
+    :param port: Port to listen on (Default: 0, any free port)
+    :type port: :py:class:`int`
+    """
+    def __init__(self, voip_user="mock@example.com", voip_api_password="secret", size=100,
+                 latency=0, jitter=0, rate=None, burst=None, error_rate=0, errors=None,
+                 seed=0, file_size=64 * 1024, host="127.0.0.1", port=0):
+        super(MockServer, self).__init__()
+        if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+            raise ValueError("Rate of the mock server needs to be a positive int or float (Example: 5 -> requests per second)")
+        if not 0 <= error_rate <= 1:
+            raise ValueError("Share of API calls answered with an error needs to be between 0 and 1")
+        errors = list(errors) if errors is not None else sorted(ERROR_CODES)
+        unknown = [status for status in errors if status not in ERROR_CODES]
+        if unknown:
+            raise ValueError("Unknown error codes: {}".format(" ".join(unknown)))
+        self.voip_user = voip_user
+        self.voip_api_password = voip_api_password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = errors
+        self.dataset = Dataset(size, seed)
+        self.file_size = file_size
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate or 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._failures = deque()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._thread = None
+        self.handlers = {
+            "getBalance": self._balance,
+            "getServersInfo": self._servers_info,
+            "getSubAccounts": self._list("accounts", "accounts"),
+            "getDIDsInfo": self._dids_info,
+            "getProvinces": self._provinces,
+            "getRateCentersCAN": self._rate_centers,
+            "getRateCentersUSA": self._rate_centers,
+            "getDIDsCAN": self._available_dids,
+            "getDIDsUSA": self._available_dids,
+            "getRecordings": self._fixed("recordings", [{"recording": "1", "name": "Welcome"}]),
+            "getSIPURIs": self._fixed("sipuris", [{"sipuri": "1", "uri": "sip:1001@example.com"}]),
+            "getCDR": self._cdr,
+            "getResellerCDR": self._cdr,
+            "getSMS": self._messages,
+            "getMMS": self._messages,
+            "getFaxMessages": self._dated("faxes", "faxes", "no_messages"),
+            "getVoicemailMessages": self._dated("voicemail_messages", "messages", "no_messages"),
+            "sendSMS": self._send("sms"),
+            "sendMMS": self._send("mms"),
+            "getFaxMessagePDF": self._file("message_base64"),
+            "getVoicemailMessageFile": self._file("message", "data"),
+            "getCallRecording": self._file("callrecording", "data"),
+            "getRecordingFile": self._file("recording", "data"),
+            "getConferenceRecordingFile": self._file("recording", "data"),
+        }
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        server.mock = self
+        self._server = server
+
+    @property
+    def url(self):
+        """
+        URL of rest.php to pass as api_url
+
+        :returns: :py:class:`str`
+        """
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}{}".format(host, port, PATH)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Serve requests in a background thread
+
+        :returns: The server itself
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="voipms-mockserver")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self):
+        """
+        Serve requests in the current thread until interrupted
+        """
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def client(self, client_class=None, **kwargs):
+        """
+        A client with the credentials of the server pointed at it
+
+        :param client_class: Class of the client (Default: :class:`voipms.VoipMs`)
+        :type client_class: :py:class:`type`
+        :param **kwargs: Options of the client
+        :type **kwargs: :py:class:`dict`
+        """
+        if client_class is None:
+            from voipms import VoipMs
+            client_class = VoipMs
+        return client_class(self.voip_user, self.voip_api_password, api_url=self.url, **kwargs)
+
+    def fail(self, status, method=None, times=1):
+        """
+        Answer the next API calls with an error code
+
+        :param status: A key of helpers.ERROR_CODES (Example: 'invalid_did')
+        :type status: :py:class:`str`
+        :param method: Only fail calls of this method (Default: None, any method)
+        :type method: :py:class:`str`
+        :param times: Number of calls failed (Default: 1)
+        :type times: :py:class:`int`
+        """
+        if status not in ERROR_CODES:
+            raise ValueError("Unknown error code: {}".format(status))
+        with self._lock:
+            self._failures.extend([(method, status)] * times)
+
+    def respond(self, parameters):
+        """
+        Answer one API call
+
+        :param parameters: The query string or form parameters of the request
+        :type parameters: :py:class:`dict`
+        :returns: :py:class:`tuple` of the HTTP status, the JSON document and extra headers
+        """
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        method = parameters.pop("method", None)
+        with self._lock:
+            self.calls[method] += 1
+        retry_after = self._admit()
+        if retry_after:
+            return 429, {"status": "too_many_requests"}, {"Retry-After": str(retry_after)}
+        user = parameters.pop("api_username", None)
+        password = parameters.pop("api_password", None)
+        if not user or not password:
+            return 200, {"status": "missing_credentials"}, {}
+        if (user, password) != (self.voip_user, self.voip_api_password):
+            return 200, {"status": "invalid_credentials"}, {}
+        if not method:
+            return 200, {"status": "missing_method"}, {}
+        status = self._injected_error(method)
+        if status is not None:
+            return 200, {"status": status}, {}
+        handler = self.handlers.get(method)
+        if handler is None:
+            return 200, {"status": "success"}, {}
+        return 200, handler(method, parameters), {}
+
+    def _admit(self):
+        """
+        Take a token of the rate limit, rejected calls take none
+
+        :returns: 0 if the call is served, else the seconds to wait as int
+        """
+        if self.rate is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return max(1, int(math.ceil((1 - self._tokens) / self.rate)))
+
+    def _injected_error(self, method):
+        with self._lock:
+            for index, (failing_method, status) in enumerate(self._failures):
+                if failing_method is None or failing_method == method:
+                    del self._failures[index]
+                    return status
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.errors)
+        return None
+
+    def _balance(self, method, parameters):
+        return {"status": "success", "balance": {
+            "current_balance": "25.0000", "spent_total": "4.7500",
+            "calls_total": str(self.dataset.size), "time_total": "0:00:00",
+            "spent_today": "0.0000", "calls_today": "0", "time_today": "0:00:00",
+        }}
+
+    def _servers_info(self, method, parameters):
+        return {"status": "success", "servers": [
+            {"server_name": name, "server_shortname": name, "server_hostname": hostname,
+             "server_ip": "127.0.0.1", "server_country": "USA", "server_pop": str(pop)}
+            for pop, (name, hostname) in enumerate(_SERVERS, 1)
+        ]}
+
+    def _provinces(self, method, parameters):
+        return {"status": "success", "provinces": [
+            {"province": code, "description": name} for code, name in _PROVINCES
+        ]}
+
+    def _rate_centers(self, method, parameters):
+        return {"status": "success", "ratecenters": [
+            {"ratecenter": "VANCOUVER", "available": "yes"},
+            {"ratecenter": "DENVER", "available": "yes"},
+        ]}
+
+    def _available_dids(self, method, parameters):
+        return {"status": "success", "dids": [
+            {"did": str(5558000000 + index), "ratecenter": parameters.get("ratecenter", ""),
+             "province": parameters.get("province", parameters.get("state", "")),
+             "perminute_monthly": "0.85", "perminute_minute": "0.01", "perminute_setup": "0.50",
+             "flat_monthly": "4.95", "flat_minute": "0.00", "flat_setup": "0.50", "sms": "1"}
+            for index in range(10)
+        ]}
+
+    def _dids_info(self, method, parameters):
+        dids = self.dataset.dids
+        if "did" in parameters:
+            dids = [did for did in dids if did["did"] == parameters["did"]]
+        if not dids:
+            return {"status": "no_did"}
+        return {"status": "success", "dids": dids}
+
+    def _cdr(self, method, parameters):
+        wanted = {disposition for disposition, flag in _DISPOSITIONS if parameters.get(flag) == "1"}
+        if not wanted:
+            return {"status": "no_callstatus"}
+        date_from = parameters.get("date_from", "")
+        date_to = parameters.get("date_to", "9999-12-31")
+        rows = [row for row in self.dataset.cdr
+                if date_from <= row["date"][:10] <= date_to and row["disposition"] in wanted
+                and ("account" not in parameters or row["account"] == parameters["account"])]
+        if not rows:
+            return {"status": "no_cdr"}
+        return {"status": "success", "cdr": rows}
+
+    def _messages(self, method, parameters):
+        date_from = parameters.get("from", "")
+        date_to = parameters.get("to", "9999-12-31")
+        rows = [row for row in self.dataset.sms
+                if date_from <= row["date"][:10] <= date_to
+                and all(row[key] == parameters[key] for key in ("type", "did", "contact") if key in parameters)]
+        rows = rows[:int(parameters.get("limit", 50))]
+        if not rows:
+            return {"status": "no_sms"}
+        return {"status": "success", "sms": rows}
+
+    def _list(self, dataset, key):
+        def handler(method, parameters):
+            return {"status": "success", key: getattr(self.dataset, dataset)}
+        return handler
+
+    def _fixed(self, key, rows):
+        def handler(method, parameters):
+            return {"status": "success", key: rows}
+        return handler
+
+    def _dated(self, dataset, key, empty_status):
+        def handler(method, parameters):
+            date_from = parameters.get("from", parameters.get("date_from", ""))
+            date_to = parameters.get("to", parameters.get("date_to", "9999-12-31"))
+            rows = [row for row in getattr(self.dataset, dataset)
+                    if date_from <= row["date"][:10] <= date_to
+                    and ("folder" not in parameters or row["folder"] == parameters["folder"])]
+            if not rows:
+                return {"status": empty_status}
+            return {"status": "success", key: rows}
+        return handler
+
+    def _file(self, key, inner=None):
+        def handler(method, parameters):
+            name = method + "?" + "&".join(sorted("{}={}".format(*item) for item in parameters.items()))
+            data = base64.b64encode(self.dataset.file(name, self.file_size)).decode("ascii")
+            return {"status": "success", key: data if inner is None else {inner: data}}
+        return handler
+
+    def _send(self, key):
+        def handler(method, parameters):
+            if "did" not in parameters:
+                return {"status": "missing_did"}
+            if "dst" not in parameters:
+                return {"status": "invalid_dst"}
+            with self._lock:
+                message_id = self._next_id
+                self._next_id += 1
+            return {"status": "success", key: message_id}
+        return handler
+
+
+def _form_data(content_type, body):
+    """
+    The fields of a multipart/form-data body
+
+    >>> _form_data("multipart/form-data; boundary=b",
+    ...            b'--b\\r\\nContent-Disposition: form-data; name="did"\\r\\n\\r\\n5551234567\\r\\n--b--\\r\\n')
+    [('did', '5551234567')]
+    """
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+    return [(part.get_param("name", header="content-disposition"), part.get_content())
+            for part in message.iter_parts()]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Parses the request and writes the answer of the MockServer
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without this every response
+    # of a kept-alive connection waits for the delayed ACK of the client
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != PATH:
+            return self._write(404, {"status": "not_found"}, {})
+        self._write(*self.server.mock.respond(dict(parse_qsl(url.query, keep_blank_values=True))))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if url.path != PATH:
+            return self._write(404, {"status": "not_found"}, {})
+        parameters = dict(parse_qsl(url.query, keep_blank_values=True))
+        if self.headers.get_content_type() == "multipart/form-data":
+            parameters.update(_form_data(self.headers["Content-Type"], body))
+        else:
+            parameters.update(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        self._write(*self.server.mock.respond(parameters))
+
+    def _write(self, code, document, headers):
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    """
+    Run a mock voip.ms API until interrupted
+
+    Usage: python -m voipms.mockserver [--port PORT] [--size SIZE] [--latency SECONDS] [--rate RATE] [--error-rate SHARE]
+    """
+    parser = argparse.ArgumentParser(prog="python -m voipms.mockserver",
+                                     description="Serve a local mock of the voip.ms REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--user", default="mock@example.com", help="Accepted API user")
+    parser.add_argument("--password", default="secret", help="Accepted API password")
+    parser.add_argument("--size", type=int, default=100, help="Rows of the synthetic datasets")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0, help="Random seconds added to the latency")
+    parser.add_argument("--rate", type=float, help="API calls per second before HTTP 429")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of calls answered with an error")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="Bytes of the fax and recording files")
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.user, args.password, size=args.size, latency=args.latency,
+                        jitter=args.jitter, rate=args.rate, error_rate=args.error_rate,
+                        seed=args.seed, file_size=args.file_size, host=args.host, port=args.port)
+    print("Serving the voip.ms API mock on {}".format(server.url))
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
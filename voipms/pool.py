@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ratelimit import RateLimiter
+
+# Options that would be shared between tenants if they were passed to every
+# client: responses could leak from one tenant to another or one tenant
+# could drop the connections of all others.
+_PER_TENANT_OPTIONS = ("session", "rate_limiter", "cache", "single_flight", "keep_alive", "max_concurrency",
+                       "cassette")
+
+
+class _Tenant(object):
+    """
+    Credentials and limits of a tenant, kept while its client is evicted
+    """
+    def __init__(self, voip_user, voip_api_password, rate_limiter, concurrency):
+        super(_Tenant, self).__init__()
+        self.voip_user = voip_user
+        self.voip_api_password = voip_api_password
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+
+
+class ClientPool(object):
+    """
+    Clients for many voip.ms API users sharing one connection pool
+
+    Every tenant is registered once with its credentials and limits. Clients
+    are created on first use and share the HTTP session of the pool. Only the
+    max_clients most recently used clients are kept, the others and clients
+    idle longer than idle_timeout are dropped and created again when needed.
+    The rate limit and the concurrency cap of a tenant outlive its client, so
+    evicting a client never resets them.
+
+    The clients are synchronous, the pool shares a requests session and
+    threading semaphores between them. :class:`voipms.AsyncVoipMs` clients
+    open their own aiohttp sessions and are not supported.
+
+    >>> pool = ClientPool(max_clients=100, rate=5, max_concurrency=2)
+    >>> pool.add("acme", "api@acme.example", "secret")
+    >>> pool["acme"].voip_user
+    'api@acme.example'
+    """
+    def __init__(self, max_clients=128, idle_timeout=None, rate=None, burst=None,
+                 max_concurrency=None, client_class=None, pool_connections=10,
+                 pool_maxsize=10, pool_block=False, **kwargs):
+        """
+        :param max_clients: Maximum number of clients kept (Default: 128)
+        :type max_clients: :py:class:`int`
+        :param idle_timeout: Seconds after which an unused client is dropped (Default: None, no limit)
+        :type idle_timeout: :py:class:`float`
+        :param rate: Default number of API calls per second per tenant (Default: None, no limit)
+        :type rate: :py:class:`float`
+        :param burst: Default number of API calls per tenant allowed at once (Default: max(1, rate))
+        :type burst: :py:class:`int`
+        :param max_concurrency: Default number of API calls per tenant in flight at the same time (Default: None, no limit)
+        :type max_concurrency: :py:class:`int`
+        :param client_class: Class of the clients, a synchronous client (Default: :class:`voipms.VoipMs`)
+        :type client_class: :py:class:`type`
+        :param pool_connections: Number of host pools to cache (Default: 10)
+        :type pool_connections: :py:class:`int`
+        :param pool_maxsize: Maximum number of connections kept per host, for all tenants together (Default: 10)
+        :type pool_maxsize: :py:class:`int`
+        :param pool_block: Block when no free connection is available instead of opening a new one (Default: False)
+        :type pool_block: :py:class:`bool`
+        :param **kwargs: Options passed to every client (Example: timeout=10, retry=RetryPolicy())
+        :type **kwargs: :py:class:`dict`
+        """
+        super(ClientPool, self).__init__()
+        if not isinstance(max_clients, int) or max_clients < 1:
+            raise ValueError("Maximum number of clients needs to be an int of at least 1")
+        shared = [option for option in _PER_TENANT_OPTIONS if option in kwargs]
+        if shared:
+            raise ValueError("Options not allowed for all tenants: {}".format(" ".join(shared)))
+        if client_class is None:
+            from voipms import VoipMs
+            client_class = VoipMs
+        from .asyncvoipmsclient import AsyncVoipMsClient
+        if issubclass(client_class, AsyncVoipMsClient):
+            raise ValueError("ClientPool only pools synchronous clients, "
+                             "create an AsyncVoipMs per tenant instead")
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.client_class = client_class
+        self.client_options = kwargs
+        self._lock = threading.Lock()
+        self._tenants = {}
+        # tenant -> (client, last use), least recently used first
+        self._clients = OrderedDict()
+        self._created = 0
+        self._evicted = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # The tenants share the session, a cookie of one would be sent for all
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, tenant):
+        return tenant in self._tenants
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __getitem__(self, tenant):
+        return self.client(tenant)
+
+    def add(self, tenant, voip_user, voip_api_password, rate=None, burst=None, max_concurrency=None):
+        """
+        Register a tenant or replace its credentials and limits
+
+        :param tenant: Identifier of the tenant (Example: 'acme')
+        :type tenant: :py:class:`str`
+        :param voip_user: voip.ms user id (email)
+        :type voip_user: :py:class:`str`
+        :param voip_api_password: voip.ms API Password
+        :type voip_api_password: :py:class:`str`
+        :param rate: Number of API calls per second of this tenant (Default: rate of the pool)
+        :type rate: :py:class:`float`
+        :param burst: Number of API calls of this tenant allowed at once (Default: burst of the pool)
+        :type burst: :py:class:`int`
+        :param max_concurrency: Number of API calls of this tenant in flight at the same time (Default: max_concurrency of the pool)
+        :type max_concurrency: :py:class:`int`
+        """
+        rate = rate if rate is not None else self.rate
+        burst = burst if burst is not None else self.burst
+        max_concurrency = max_concurrency if max_concurrency is not None else self.max_concurrency
+        if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+            raise ValueError("Maximum number of API calls in flight needs to be a positive int")
+        rate_limiter = RateLimiter(rate, burst) if rate is not None else None
+        concurrency = threading.BoundedSemaphore(max_concurrency) if max_concurrency is not None else None
+        with self._lock:
+            self._tenants[tenant] = _Tenant(voip_user, voip_api_password, rate_limiter, concurrency)
+            self._clients.pop(tenant, None)
+
+    def remove(self, tenant):
+        """
+        Forget a tenant and drop its client
+
+        :param tenant: Identifier of the tenant
+        :type tenant: :py:class:`str`
+        """
+        with self._lock:
+            if tenant not in self._tenants:
+                raise KeyError(tenant)
+            del self._tenants[tenant]
+            self._clients.pop(tenant, None)
+
+    def client(self, tenant):
+        """
+        The client of a tenant, created if it is not in the pool
+
+        :param tenant: Identifier of the tenant
+        :type tenant: :py:class:`str`
+        :returns: An instance of client_class
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.pop(tenant, None)
+            if entry is not None:
+                client = entry[0]
+            else:
+                try:
+                    registration = self._tenants[tenant]
+                except KeyError:
+                    raise KeyError("Unknown tenant: {}".format(tenant))
+                client = self.client_class(
+                    registration.voip_user, registration.voip_api_password,
+                    session=self.session, rate_limiter=registration.rate_limiter,
+                    max_concurrency=registration.concurrency, **self.client_options)
+                self._created += 1
+            self._clients[tenant] = (client, now)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self._evicted += 1
+            return client
+
+    def _evict_idle(self, now):
+        """
+        Drop the clients unused for longer than idle_timeout, the lock has to be held
+        """
+        if self.idle_timeout is None:
+            return
+        while self._clients:
+            tenant, (client, last_use) = next(iter(self._clients.items()))
+            if now - last_use <= self.idle_timeout:
+                break
+            del self._clients[tenant]
+            self._evicted += 1
+
+    def stats(self):
+        """
+        Snapshot of the counters
+
+        :returns: :py:class:`dict` with the keys tenants, clients, created and evicted
+        """
+        with self._lock:
+            return {
+                "tenants": len(self._tenants),
+                "clients": len(self._clients),
+                "created": self._created,
+                "evicted": self._evicted,
+            }
+
+    def close(self):
+        """
+        Drop all clients and close the shared connections
+
+        The tenants stay registered, clients are created again on the next use.
+        """
+        with self._lock:
+            self._clients.clear()
+        self.session.close()
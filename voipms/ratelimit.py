@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Token bucket refilled at a constant rate
+
+    Tokens are reserved rather than waited for, so the bucket can go into
+    debt and every caller learns at once how long it has to wait for its turn.
+    """
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: Tokens added per second
+        :type rate: :py:class:`float`
+        :param burst: Maximum number of tokens stored (Default: max(1, rate))
+        :type burst: :py:class:`int`
+        """
+        super(TokenBucket, self).__init__()
+        if not isinstance(rate, (int, float)) or isinstance(rate, bool) or rate <= 0:
+            raise ValueError("Rate of the token bucket needs to be a positive int or float (Example: 5 -> requests per second)")
+        if burst is None:
+            burst = max(1, rate)
+        if not isinstance(burst, (int, float)) or isinstance(burst, bool) or burst < 1:
+            raise ValueError("Burst of the token bucket needs to be an int of at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, now=None):
+        """
+        Take one token and return how long the caller has to wait for it
+
+        :param now: Current monotonic time (Default: time.monotonic())
+        :type now: :py:class:`float`
+        :returns: Seconds to wait, 0.0 if a token was available
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Client side rate limiter for voip.ms API calls
+
+    Every call takes a token from the global bucket and, if the API method has
+    its own budget, from the bucket of that method.
+
+    >>> limiter = RateLimiter(rate=100, method_limits={"sendSMS": (1, 1)})
+    >>> limiter.acquire("getDIDsInfo")
+    0.0
+    """
+    def __init__(self, rate=None, burst=None, method_limits=None):
+        """
+        :param rate: Global number of API calls per second (Default: None, no global limit)
+        :type rate: :py:class:`float`
+        :param burst: Global number of API calls allowed at once (Default: max(1, rate))
+        :type burst: :py:class:`int`
+        :param method_limits: Per API method budgets, either a rate or a (rate, burst) tuple (Example: {"sendSMS": 1, "getDIDsInfo": (5, 10)})
+        :type method_limits: :py:class:`dict`
+        """
+        super(RateLimiter, self).__init__()
+        self._global = TokenBucket(rate, burst) if rate is not None else None
+        self._methods = {}
+        for method, limit in (method_limits or {}).items():
+            self.set_method_limit(method, *(limit if isinstance(limit, tuple) else (limit,)))
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def set_method_limit(self, method, rate, burst=None):
+        """
+        Set or replace the budget of a single API method
+
+        :param method: The method call for the API (Example: 'sendSMS')
+        :type method: :py:class:`str`
+        :param rate: Number of calls of this method per second
+        :type rate: :py:class:`float`
+        :param burst: Number of calls of this method allowed at once (Default: max(1, rate))
+        :type burst: :py:class:`int`
+        """
+        if not isinstance(method, str):
+            raise ValueError("The method call for the API needs to be a str (Example: 'sendSMS')")
+        self._methods[method] = TokenBucket(rate, burst)
+
+    def reset_stats(self):
+        """
+        Reset all counters
+        """
+        with self._stats_lock:
+            self._acquired = 0
+            self._throttled = 0
+            self._throttled_seconds = 0.0
+            self._method_stats = {}
+
+    def stats(self):
+        """
+        Snapshot of the counters
+
+        :returns: :py:class:`dict` with the keys acquired, throttled, throttled_seconds and methods
+        """
+        with self._stats_lock:
+            return {
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "throttled_seconds": self._throttled_seconds,
+                "methods": {method: dict(stats) for method, stats in self._method_stats.items()},
+            }
+
+    def reserve(self, method):
+        """
+        Reserve a call of an API method without waiting
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :returns: Seconds to wait before the call may be sent
+        """
+        now = time.monotonic()
+        delay = 0.0
+        if self._global is not None:
+            delay = self._global.reserve(now)
+        bucket = self._methods.get(method)
+        if bucket is not None:
+            delay = max(delay, bucket.reserve(now))
+
+        with self._stats_lock:
+            self._acquired += 1
+            stats = self._method_stats.setdefault(
+                method, {"acquired": 0, "throttled": 0, "throttled_seconds": 0.0})
+            stats["acquired"] += 1
+            if delay > 0:
+                self._throttled += 1
+                self._throttled_seconds += delay
+                stats["throttled"] += 1
+                stats["throttled_seconds"] += delay
+        return delay
+
+    def acquire(self, method):
+        """
+        Block until a call of an API method is allowed
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :returns: Seconds waited
+        """
+        delay = self.reserve(method)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, method):
+        """
+        Wait without blocking the event loop until a call of an API method is allowed
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :returns: Seconds waited
+        """
+        delay = self.reserve(method)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
@@ -0,0 +1,295 @@
+"""
+Compact typed records for the large lists returned by the voip.ms API
+
+The records keep their values in __slots__ instead of a dict per row and
+convert the values once when they are built: dates to datetime, amounts to
+Decimal, counters to int. Repeated strings like the account or the
+disposition of a call are interned, so a million rows share them.
+"""
+import datetime
+import inspect
+import sys
+from decimal import Decimal, InvalidOperation
+
+
+def _empty(value):
+    return value is None or value == ""
+
+
+def to_int(value):
+    """
+    >>> to_int("42"), to_int("")
+    (42, None)
+    """
+    if _empty(value):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_decimal(value):
+    """
+    >>> to_decimal("0.00900000")
+    Decimal('0.00900000')
+    """
+    if _empty(value):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def to_datetime(value):
+    """
+    >>> to_datetime("2024-01-31 10:05:00")
+    datetime.datetime(2024, 1, 31, 10, 5)
+    """
+    if _empty(value):
+        return None
+    for date_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def to_date(value):
+    """
+    >>> to_date("2024-01-31")
+    datetime.date(2024, 1, 31)
+    """
+    value = to_datetime(value)
+    return value.date() if value is not None else None
+
+
+def to_text(value):
+    return value
+
+
+def to_shared_text(value):
+    """
+    Intern strings with few distinct values
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Record(object):
+    """
+    Base class of the records
+
+    Subclasses list their fields as (name, converter) tuples in FIELDS.
+    Fields missing in the API response are None.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, *values):
+        for (name, _), value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from one row of an API response
+
+        :param data: The row as decoded from JSON
+        :type data: :py:class:`dict`
+        :returns: An instance of the record class
+        """
+        return cls(*[convert(data.get(name)) for name, convert in cls.FIELDS])
+
+    def as_dict(self):
+        """
+        :returns: :py:class:`dict` of the converted values
+        """
+        return {name: getattr(self, name) for name, _ in self.FIELDS}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(name, getattr(self, name)) for name, _ in self.FIELDS))
+
+
+def _slots(fields):
+    return tuple(name for name, _ in fields)
+
+
+class CDR(Record):
+    """
+    A call of getCDR or getResellerCDR
+    """
+    FIELDS = (
+        ("date", to_datetime),
+        ("callerid", to_text),
+        ("destination", to_text),
+        ("description", to_shared_text),
+        ("account", to_shared_text),
+        ("disposition", to_shared_text),
+        ("duration", to_text),
+        ("seconds", to_int),
+        ("rate", to_decimal),
+        ("total", to_decimal),
+        ("uniqueid", to_text),
+        ("destination_type", to_shared_text),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class SMS(Record):
+    """
+    A message of getSMS
+    """
+    FIELDS = (
+        ("id", to_int),
+        ("date", to_datetime),
+        ("type", to_int),
+        ("did", to_shared_text),
+        ("contact", to_text),
+        ("message", to_text),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class MMS(Record):
+    """
+    A message of getMMS
+    """
+    FIELDS = SMS.FIELDS + (
+        ("media", to_text),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class DIDInfo(Record):
+    """
+    A DID of getDIDsInfo
+    """
+    FIELDS = (
+        ("did", to_text),
+        ("description", to_text),
+        ("routing", to_shared_text),
+        ("failover_busy", to_shared_text),
+        ("failover_unreachable", to_shared_text),
+        ("failover_noanswer", to_shared_text),
+        ("voicemail", to_shared_text),
+        ("pop", to_int),
+        ("dialtime", to_int),
+        ("cnam", to_int),
+        ("e911", to_int),
+        ("callerid_prefix", to_text),
+        ("note", to_text),
+        ("billing_type", to_int),
+        ("next_billing", to_date),
+        ("order_date", to_datetime),
+        ("reseller_account", to_shared_text),
+        ("reseller_next_billing", to_date),
+        ("reseller_monthly", to_decimal),
+        ("reseller_minute", to_decimal),
+        ("reseller_setup", to_decimal),
+        ("sms_available", to_int),
+        ("sms_enabled", to_int),
+        ("sms_email", to_text),
+        ("sms_email_enabled", to_int),
+        ("sms_forward", to_text),
+        ("sms_forward_enabled", to_int),
+        ("sms_url_callback", to_text),
+        ("sms_url_callback_enabled", to_int),
+        ("sms_url_callback_retry", to_int),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class FaxMessage(Record):
+    """
+    A fax of getFaxMessages
+    """
+    FIELDS = (
+        ("id", to_int),
+        ("date", to_datetime),
+        ("callerid", to_text),
+        ("stationid", to_text),
+        ("destination", to_text),
+        ("description", to_text),
+        ("pages", to_int),
+        ("duration", to_int),
+        ("status", to_shared_text),
+        ("folder", to_shared_text),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class VoicemailMessage(Record):
+    """
+    A message of getVoicemailMessages
+    """
+    FIELDS = (
+        ("mailbox", to_shared_text),
+        ("folder", to_shared_text),
+        ("message_num", to_int),
+        ("date", to_datetime),
+        ("callerid", to_text),
+        ("duration", to_text),
+        ("urgent", to_shared_text),
+        ("listened", to_shared_text),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+def _convert(response, keys, record_class):
+    for key in keys:
+        if response and isinstance(response.get(key), list):
+            response = dict(response)
+            response[key] = [record_class.from_dict(row) for row in response[key]]
+            break
+    return response
+
+
+def with_records(response, key, record_class):
+    """
+    Replace the rows under key of an API response with records
+
+    Works on the awaitable of an asynchronous client as well.
+
+    :param response: The response of the API call or its awaitable
+    :type response: :py:class:`dict`
+    :param key: Key of the list in the response, or a tuple of keys to try (Example: 'cdr')
+    :type key: :py:class:`str`
+    :param record_class: The record class (Example: CDR)
+    :type record_class: :py:class:`type`
+    :returns: :py:class:`dict` or an awaitable of it
+    """
+    keys = key if isinstance(key, tuple) else (key,)
+    if inspect.isawaitable(response):
+        async def convert():
+            return _convert(await response, keys, record_class)
+        return convert()
+    return _convert(response, keys, record_class)
+
+
+def iter_records(rows, record_class):
+    """
+    Turn each row of a generator into a record
+
+    Works on the asynchronous generators of an asynchronous client as well.
+
+    :param rows: Generator of rows
+    :type rows: :py:class:`iterator`
+    :param record_class: The record class (Example: CDR)
+    :type record_class: :py:class:`type`
+    :returns: Generator of records
+    """
+    if hasattr(rows, "__aiter__"):
+        async def convert():
+            async for row in rows:
+                yield record_class.from_dict(row)
+        return convert()
+    return (record_class.from_dict(row) for row in rows)
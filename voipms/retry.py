@@ -0,0 +1,243 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+
+import requests
+
+
+RETRYABLE_EXCEPTIONS = (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout,
+                        asyncio.TimeoutError)
+
+SAFE_METHOD_PREFIXES = ("get",)
+
+
+def is_safe_method(method):
+    """
+    Check if an API method only reads data and can be sent again safely
+
+    >>> is_safe_method("getDIDsInfo")
+    True
+    >>> is_safe_method("sendSMS")
+    False
+
+    :param method: The method call for the API
+    :type method: :py:class:`str`
+    :returns: :py:class:`bool`
+    """
+    return method.startswith(SAFE_METHOD_PREFIXES)
+
+
+def _retryable_exceptions():
+    """
+    RETRYABLE_EXCEPTIONS plus the aiohttp connection errors once aiohttp is imported
+    """
+    # Without aiohttp imported there cannot be an aiohttp error to check for
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is None:
+        return RETRYABLE_EXCEPTIONS
+    return RETRYABLE_EXCEPTIONS + (aiohttp.ClientConnectionError,)
+
+
+def _status_code(error):
+    """
+    HTTP status code of a requests or aiohttp error, None if there is none
+    """
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "status_code", None) is not None:
+        return response.status_code
+    return getattr(error, "status", None)
+
+
+class RetryPolicy(object):
+    """
+    When and how often an API call is sent again
+
+    The delay before attempt n + 1 is drawn from
+    [0, min(max_backoff, backoff_factor * 2 ** (n - 1))] when jitter is on.
+    """
+    def __init__(self, max_attempts=3, backoff_factor=0.5, max_backoff=30.0,
+                 max_elapsed=60.0, jitter=True,
+                 retry_on_status=(429, 500, 502, 503, 504), retry_unsafe=False):
+        """
+        :param max_attempts: Maximum number of attempts including the first one (Default: 3)
+        :type max_attempts: :py:class:`int`
+        :param backoff_factor: Base delay in seconds (Default: 0.5)
+        :type backoff_factor: :py:class:`float`
+        :param max_backoff: Maximum delay in seconds between two attempts (Default: 30.0)
+        :type max_backoff: :py:class:`float`
+        :param max_elapsed: No attempt is started after this many seconds (Default: 60.0, None for no limit)
+        :type max_elapsed: :py:class:`float`
+        :param jitter: Randomize the delays (Default: True)
+        :type jitter: :py:class:`bool`
+        :param retry_on_status: HTTP status codes which are retried (Default: 429, 500, 502, 503, 504)
+        :type retry_on_status: :py:class:`tuple`
+        :param retry_unsafe: Also retry methods which are not get* methods (Default: False)
+        :type retry_unsafe: :py:class:`bool`
+        """
+        super(RetryPolicy, self).__init__()
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError("Maximum number of attempts needs to be an int of at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.retry_on_status = frozenset(retry_on_status)
+        self.retry_unsafe = retry_unsafe
+
+    def is_retryable(self, method, error):
+        """
+        Check if an error of an API call is worth another attempt
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param error: The raised exception
+        :type error: :py:class:`Exception`
+        :returns: :py:class:`bool`
+        """
+        if not (self.retry_unsafe or is_safe_method(method)):
+            return False
+        if isinstance(error, _retryable_exceptions()):
+            return True
+        return _status_code(error) in self.retry_on_status
+
+    def backoff(self, attempt):
+        """
+        Delay before the next attempt
+
+        :param attempt: Number of the attempt that just failed, starting at 1
+        :type attempt: :py:class:`int`
+        :returns: Seconds to wait
+        """
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+class Retrier(object):
+    """
+    Run API calls under a retry policy and count what happened
+
+    Only get* methods are retried by default. Other policies can be set per
+    API method.
+    """
+    def __init__(self, policy=None, method_policies=None):
+        """
+        :param policy: Policy for all methods without their own (Default: RetryPolicy())
+        :type policy: :py:class:`RetryPolicy`
+        :param method_policies: Policies per API method (Example: {"sendSMS": RetryPolicy(retry_unsafe=True)})
+        :type method_policies: :py:class:`dict`
+        """
+        super(Retrier, self).__init__()
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.method_policies = dict(method_policies or {})
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def policy_for(self, method):
+        """
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :returns: :py:class:`RetryPolicy`
+        """
+        return self.method_policies.get(method, self.policy)
+
+    def reset_stats(self):
+        """
+        Reset all counters
+        """
+        with self._stats_lock:
+            self._stats = {}
+
+    def stats(self):
+        """
+        Snapshot of the counters per API method
+
+        :returns: :py:class:`dict` of method to a dict with the keys calls, retries, recovered and gave_up
+        """
+        with self._stats_lock:
+            return {method: dict(stats) for method, stats in self._stats.items()}
+
+    def _count(self, method, **counts):
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                method, {"calls": 0, "retries": 0, "recovered": 0, "gave_up": 0})
+            for key, value in counts.items():
+                stats[key] += value
+
+    def _next_delay(self, method, attempt, started, error):
+        """
+        Delay before the next attempt, None if the error has to be raised
+        """
+        policy = self.policy_for(method)
+        if not policy.is_retryable(method, error):
+            if attempt > 1:
+                self._count(method, gave_up=1)
+            return None
+        if attempt >= policy.max_attempts:
+            self._count(method, gave_up=1)
+            return None
+        delay = policy.backoff(attempt)
+        if policy.max_elapsed is not None and time.monotonic() - started + delay > policy.max_elapsed:
+            self._count(method, gave_up=1)
+            return None
+        self._count(method, retries=1)
+        return delay
+
+    def call(self, method, function, *args, **kwargs):
+        """
+        Call function until it succeeds or the policy gives up
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param function: The function sending the API call
+        :type function: :py:class:`callable`
+        :returns: The return value of function
+        """
+        self._count(method, calls=1)
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(method, attempt, started, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                if attempt > 1:
+                    self._count(method, recovered=1)
+                return result
+
+    async def call_async(self, method, function, *args, **kwargs):
+        """
+        Await function until it succeeds or the policy gives up
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param function: The coroutine function sending the API call
+        :type function: :py:class:`callable`
+        :returns: The return value of function
+        """
+        self._count(method, calls=1)
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                result = await function(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(method, attempt, started, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                if attempt > 1:
+                    self._count(method, recovered=1)
+                return result
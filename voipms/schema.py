@@ -0,0 +1,210 @@
+"""
+Declarative parameter schemas for the voip.ms API methods
+
+A schema lists the fields of an API method once. It is compiled into a lookup
+table when it is defined, so validating a call only walks the values that
+were passed.
+"""
+import importlib
+import pkgutil
+
+SCHEMAS = {}
+
+_TYPE_NAMES = {
+    bool: "a bool",
+    int: "an int",
+    float: "a float",
+    str: "a str",
+}
+
+
+class Field(object):
+    """
+    A parameter of an API method
+    """
+    def __init__(self, name, types, description, example=None, required=False,
+                 key=None, convert=None, check=None, check_message=None):
+        """
+        :param name: Name of the argument in python (Example: 'zip_code')
+        :type name: :py:class:`str`
+        :param types: Allowed type or tuple of types (Example: int)
+        :type types: :py:class:`type`
+        :param description: What the parameter is, used in the error messages (Example: "Client's Zip Code")
+        :type description: :py:class:`str`
+        :param example: Hint appended to the type error message (Example: 'Example: 561115')
+        :type example: :py:class:`str`
+        :param required: The parameter has to be passed (Default: False)
+        :type required: :py:class:`bool`
+        :param key: Name of the parameter in the API if it differs from name (Example: 'zip')
+        :type key: :py:class:`str`
+        :param convert: Called with the value to get what is sent to the API (Example: voipms.helpers.convert_bool)
+        :type convert: :py:class:`callable`
+        :param check: Called with the value, a false result or a ValueError rejects it (Example: voipms.helpers.validate_email)
+        :type check: :py:class:`callable`
+        :param check_message: Error message when check returns a false result
+        :type check_message: :py:class:`str`
+        """
+        super(Field, self).__init__()
+        self.name = name
+        self.types = types
+        self.description = description
+        self.example = example
+        self.required = required
+        self.key = key or name
+        self.convert = convert
+        self.check = check
+        self.check_message = check_message or "{} is not valid".format(description)
+
+    @property
+    def type_message(self):
+        """
+        The error message for a value of the wrong type
+        """
+        types = self.types if isinstance(self.types, tuple) else (self.types,)
+        expected = " or ".join(_TYPE_NAMES.get(t, "a " + t.__name__) for t in types)
+        message = "{} needs to be {}".format(self.description, expected)
+        if self.example is not None:
+            message += " ({})".format(self.example)
+        return message
+
+
+class Schema(object):
+    """
+    The parameters of an API method, compiled into a validator
+
+    >>> schema = Schema("setDIDPOP", [
+    ...     Field("did", int, "DID affected by the new billing plan", required=True),
+    ...     Field("pop", int, "Point of Presence for the DID", "Example: 3", required=True),
+    ... ])
+    >>> schema.validate({"did": 5551234567, "pop": 3})
+    {'did': 5551234567, 'pop': 3}
+    >>> schema.errors({"did": "5551234567", "cnam": True})
+    ['DID affected by the new billing plan needs to be an int', 'Parameters not allowed: cnam ', 'The parameter pop is required']
+    """
+    def __init__(self, method, fields, required=None, register=True):
+        """
+        :param method: The method call for the API (Example: 'setClient')
+        :type method: :py:class:`str`
+        :param fields: The parameters of the method
+        :type fields: :py:class:`list` of :py:class:`Field`
+        :param required: Names of the required fields, overrides Field.required (Default: None)
+        :type required: :py:class:`tuple`
+        :param register: Make the schema available through :func:`schema_for` (Default: True)
+        :type register: :py:class:`bool`
+        """
+        super(Schema, self).__init__()
+        self.method = method
+        self.fields = list(fields)
+        if required is None:
+            required = tuple(field.name for field in self.fields if field.required)
+        self.required = tuple(required)
+        # Everything the validator needs per name, resolved once
+        self._table = {
+            field.name: (field.key, field.types, field.convert, field.check,
+                         field.type_message, field.check_message)
+            for field in self.fields
+        }
+        if register:
+            SCHEMAS[method] = self
+
+    def _validate(self, values, errors=None):
+        """
+        Validate values, raise on the first problem or collect them all in errors
+        """
+        parameters = {}
+        not_allowed = ""
+        table = self._table
+        for name, value in values.items():
+            entry = table.get(name)
+            if entry is None:
+                not_allowed += name + " "
+                continue
+            key, types, convert, check, type_message, check_message = entry
+            if not isinstance(value, types):
+                if errors is None:
+                    raise ValueError(type_message)
+                errors.append(type_message)
+                continue
+            if check is not None:
+                try:
+                    valid = check(value)
+                except ValueError as e:
+                    valid, check_message = False, str(e)
+                if not valid:
+                    if errors is None:
+                        raise ValueError(check_message)
+                    errors.append(check_message)
+                    continue
+            parameters[key] = convert(value) if convert is not None else value
+
+        if not_allowed:
+            message = "Parameters not allowed: {}".format(not_allowed)
+            if errors is None:
+                raise ValueError(message)
+            errors.append(message)
+
+        for name in self.required:
+            if name not in values:
+                message = "The parameter {} is required".format(name)
+                if errors is None:
+                    raise ValueError(message)
+                errors.append(message)
+
+        return parameters
+
+    def validate(self, values):
+        """
+        Validate the values of a call and convert them to API parameters
+
+        :param values: The parameters by python name
+        :type values: :py:class:`dict`
+        :returns: :py:class:`dict` of the API parameters
+        :raises ValueError: On the first invalid, unknown or missing parameter
+        """
+        return self._validate(values)
+
+    def errors(self, values):
+        """
+        All problems of the values of a call
+
+        :param values: The parameters by python name
+        :type values: :py:class:`dict`
+        :returns: :py:class:`list` of error messages, empty if the values are valid
+        """
+        errors = []
+        self._validate(values, errors)
+        return errors
+
+    def validate_rows(self, rows):
+        """
+        Validate many calls at once, for example before a batch is submitted
+
+        :param rows: The values of each call
+        :type rows: :py:class:`iterable` of :py:class:`dict`
+        :returns: Generator of (index, parameters, errors) tuples, parameters is None if there are errors
+        """
+        for index, values in enumerate(rows):
+            errors = []
+            parameters = self._validate(values, errors)
+            yield index, (None if errors else parameters), errors
+
+
+def schema_for(method):
+    """
+    The schema of an API method
+
+    Schemas are defined next to the entity methods using them, all entity
+    modules are imported if the schema is not registered yet.
+
+    :param method: The method call for the API (Example: 'setClient')
+    :type method: :py:class:`str`
+    :returns: :py:class:`Schema`
+    """
+    if method not in SCHEMAS:
+        import voipms.entities
+        for module in pkgutil.iter_modules(voipms.entities.__path__):
+            importlib.import_module("voipms.entities." + module.name)
+    try:
+        return SCHEMAS[method]
+    except KeyError:
+        raise ValueError("There is no schema for the method {}".format(method))
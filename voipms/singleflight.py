@@ -0,0 +1,140 @@
+import asyncio
+import copy
+import threading
+
+# Result of a call whose first caller was cancelled, the other callers try again
+_LEADER_CANCELLED = object()
+
+
+class _Call(object):
+    """
+    An API call in flight and the callers waiting for it
+    """
+    def __init__(self):
+        super(_Call, self).__init__()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Share one in flight API call between all callers asking for the same thing
+
+    The first caller of a key sends the request, everybody else asking for the
+    same key before it finishes waits and gets a copy of its result or its
+    error. Works for threads with :meth:`do` and for asyncio tasks with
+    :meth:`do_async`. A task which is cancelled while it sends the request
+    does not cancel the others, one of them sends it again.
+    """
+    def __init__(self):
+        super(SingleFlight, self).__init__()
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Reset all counters
+        """
+        with self._lock:
+            self._calls_sent = 0
+            self._calls_shared = 0
+
+    def stats(self):
+        """
+        Snapshot of the counters
+
+        :returns: :py:class:`dict` with the keys sent, shared and in_flight
+        """
+        with self._lock:
+            return {
+                "sent": self._calls_sent,
+                "shared": self._calls_shared,
+                "in_flight": len(self._calls) + len(self._futures),
+            }
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Call function once for all threads asking for key at the same time
+
+        :param key: Identity of the call (Example: voipms.cache.make_key(method, parameters))
+        :type key: :py:class:`tuple`
+        :param function: The function sending the API call
+        :type function: :py:class:`callable`
+        :returns: The return value of function
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._calls_sent += 1
+            else:
+                self._calls_shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, function, *args, **kwargs):
+        """
+        Await function once for all tasks asking for key at the same time
+
+        :param key: Identity of the call (Example: voipms.cache.make_key(method, parameters))
+        :type key: :py:class:`tuple`
+        :param function: The coroutine function sending the API call
+        :type function: :py:class:`callable`
+        :returns: The return value of function
+        """
+        loop = asyncio.get_running_loop()
+        # Futures belong to a loop, keep the loops apart
+        key = (id(loop), key)
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                leader = future is None
+                if leader:
+                    future = self._futures[key] = loop.create_future()
+                    self._calls_sent += 1
+                else:
+                    self._calls_shared += 1
+
+            if leader:
+                break
+            result = await asyncio.shield(future)
+            if result is _LEADER_CANCELLED:
+                # The waiting callers were not cancelled, one of them calls function again
+                continue
+            return copy.deepcopy(result)
+
+        try:
+            result = await function(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so it is not reported if nobody waited
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
@@ -0,0 +1,228 @@
+import asyncio
+import contextvars
+import json
+import queue
+import threading
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+_DONE = object()
+
+
+def _items_from_events(events, key, check_status):
+    """
+    Build the items of the array under key from ijson parser events
+    """
+    item_prefix = key + ".item"
+    builder = None
+    for prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event in ("end_map", "end_array"):
+                yield builder.value
+                builder = None
+        elif prefix == item_prefix:
+            if event in ("start_map", "start_array"):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif prefix == "status" and event == "string":
+            check_status(value)
+
+
+class CountingReader(object):
+    """
+    Binary file object counting the bytes read from another one
+
+    >>> import io
+    >>> reader = CountingReader(io.BytesIO(b'{"status": "success"}'))
+    >>> reader.read(8), reader.size
+    (b'{"status', 8)
+
+    :param fileobj: The file object to read from
+    :type fileobj: :py:class:`io.RawIOBase`
+    """
+    def __init__(self, fileobj):
+        super(CountingReader, self).__init__()
+        self.fileobj = fileobj
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.size += len(data)
+        return data
+
+
+def iter_items(fileobj, key, check_status):
+    """
+    Yield the items of the array under key of a JSON API response one by one
+
+    The response is parsed incrementally with ijson when it is installed, so
+    only one item is held in memory at a time. Otherwise the whole response is
+    decoded first.
+
+    >>> import io
+    >>> body = io.BytesIO(b'{"status": "success", "cdr": [{"uniqueid": "1"}, {"uniqueid": "2"}]}')
+    >>> list(iter_items(body, "cdr", lambda status: None))
+    [{'uniqueid': '1'}, {'uniqueid': '2'}]
+
+    :param fileobj: Binary file object with the response body
+    :type fileobj: :py:class:`io.RawIOBase`
+    :param key: Key of the array in the response (Example: 'cdr')
+    :type key: :py:class:`str`
+    :param check_status: Called with the status of the response, raises if it is an error
+    :type check_status: :py:class:`callable`
+    :returns: Generator of the items
+    """
+    if ijson is None:
+        data = json.load(fileobj)
+        check_status(data.get("status"))
+        for item in data.get(key, []):
+            yield item
+        return
+    for item in _items_from_events(ijson.parse(fileobj, use_float=True), key, check_status):
+        yield item
+
+
+async def aiter_items(stream, key, check_status):
+    """
+    Yield the items of the array under key of a JSON API response one by one
+
+    Asynchronous version of :func:`iter_items` for streams with an awaitable
+    read(size) such as :py:class:`aiohttp.StreamReader`.
+
+    :param stream: Stream with the response body
+    :type stream: :py:class:`aiohttp.StreamReader`
+    :param key: Key of the array in the response (Example: 'cdr')
+    :type key: :py:class:`str`
+    :param check_status: Called with the status of the response, raises if it is an error
+    :type check_status: :py:class:`callable`
+    :returns: Asynchronous generator of the items
+    """
+    if ijson is None:
+        data = json.loads(await stream.read())
+        check_status(data.get("status"))
+        for item in data.get(key, []):
+            yield item
+        return
+    item_prefix = key + ".item"
+    builder = None
+    async for prefix, event, value in ijson.parse_async(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event in ("end_map", "end_array"):
+                yield builder.value
+                builder = None
+        elif prefix == item_prefix:
+            if event in ("start_map", "start_array"):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif prefix == "status" and event == "string":
+            check_status(value)
+
+
+def prefetch(iterable, depth=1):
+    """
+    Iterate over iterable while a background thread fetches the next items
+
+    Up to depth items are fetched ahead of the consumer. Closing the returned
+    generator stops the thread after the item it is fetching.
+
+    >>> list(prefetch(iter(range(5)), depth=2))
+    [0, 1, 2, 3, 4]
+
+    :param iterable: The items to fetch
+    :type iterable: :py:class:`iterator`
+    :param depth: Number of items fetched ahead, 0 fetches in the caller (Default: 1)
+    :type depth: :py:class:`int`
+    :returns: Generator of the items
+    """
+    if depth < 1:
+        for item in iterable:
+            yield item
+        return
+
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(produce,), daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+async def aprefetch(aiterable, depth=1):
+    """
+    Iterate over an asynchronous iterable while a task fetches the next items
+
+    Asynchronous version of :func:`prefetch`.
+
+    :param aiterable: The items to fetch
+    :type aiterable: :py:class:`collections.abc.AsyncIterator`
+    :param depth: Number of items fetched ahead, 0 fetches in the caller (Default: 1)
+    :type depth: :py:class:`int`
+    :returns: Asynchronous generator of the items
+    """
+    if depth < 1:
+        async for item in aiterable:
+            yield item
+        return
+
+    items = asyncio.Queue(maxsize=depth)
+
+    async def produce():
+        try:
+            async for item in aiterable:
+                await items.put((item, None))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await items.put((_DONE, e))
+        else:
+            await items.put((_DONE, None))
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, error = await items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        task.cancel()
@@ -0,0 +1,317 @@
+"""
+Tracing spans around the API calls of a client
+
+With a tracer every entity method gets a span named after the entity and
+the method (Example: 'DidsSet.did_info') and every HTTP request a child
+span named after the API method (Example: 'setDIDInfo'). Spans follow the
+context of the caller in threads and in asyncio tasks, so the API calls of
+a request to your application show up in its trace.
+
+    from voipms.tracing import OpenTelemetryTracer
+
+    client = VoipMs(user, password, tracer=OpenTelemetryTracer())
+
+Only the names of the parameters are recorded, never their values, the
+URL or the credentials. Without a tracer no span is created and the
+entities are not wrapped at all.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .hooks import Hooks
+
+INTERNAL = "internal"
+CLIENT = "client"
+
+# Parameters which are never recorded, not even by name
+_CREDENTIALS = ("api_username", "api_password")
+
+
+def in_context(function):
+    """
+    Wrap function to run in a copy of the current context
+
+    Use it for functions called in other threads, like with a thread pool,
+    so they see the active span and any other context variable of the
+    caller. Every call gets its own copy.
+
+    :param function: The function to wrap
+    :type function: :py:class:`callable`
+    :returns: :py:class:`callable`
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+    return run
+
+
+class Tracer(object):
+    """
+    Base class of the tracers
+
+    A tracer starts a span, makes it the current span of the thread or task
+    and ends it again. The spans are whatever the tracer uses, the client
+    only passes them back to :meth:`end_span`. The base class records
+    nothing, a subclass overrides the methods it needs.
+    """
+    def start_span(self, name, kind=INTERNAL, attributes=None):
+        """
+        Start a span and make it the current span
+
+        :param name: Name of the span (Example: 'DidsSet.did_info')
+        :type name: :py:class:`str`
+        :param kind: INTERNAL or CLIENT (Default: INTERNAL)
+        :type kind: :py:class:`str`
+        :param attributes: Attributes of the span (Default: None)
+        :type attributes: :py:class:`dict`
+        :returns: The span, None for the base class
+        """
+        return None
+
+    def end_span(self, span, error=None, attributes=None):
+        """
+        End a span started in the same thread or task
+
+        :param span: The span returned by :meth:`start_span`
+        :param error: The exception which ended the span (Default: None)
+        :type error: :py:class:`Exception`
+        :param attributes: Attributes known when the span ends (Default: None)
+        :type attributes: :py:class:`dict`
+        """
+
+    @contextlib.contextmanager
+    def span(self, name, kind=INTERNAL, attributes=None):
+        """
+        A span for a with block, ended with the exception raised in it
+        """
+        span = self.start_span(name, kind, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Spans of the OpenTelemetry API
+
+    The spans go to the tracer provider configured by the application, the
+    opentelemetry-api package needs to be installed.
+
+    :param tracer_provider: Provider of the tracer (Default: the global tracer provider)
+    :type tracer_provider: :py:class:`opentelemetry.trace.TracerProvider`
+    """
+    def __init__(self, tracer_provider=None):
+        super(OpenTelemetryTracer, self).__init__()
+        try:
+            from opentelemetry import context, trace
+        except ImportError:
+            raise ImportError("OpenTelemetryTracer needs opentelemetry-api, install it with: "
+                              "pip install voipms[tracing]")
+        from voipms import __version__
+        self._context = context
+        self._trace = trace
+        self._kinds = {INTERNAL: trace.SpanKind.INTERNAL, CLIENT: trace.SpanKind.CLIENT}
+        self.tracer = trace.get_tracer("voipms", __version__, tracer_provider=tracer_provider)
+
+    def start_span(self, name, kind=INTERNAL, attributes=None):
+        span = self.tracer.start_span(name, kind=self._kinds[kind], attributes=attributes)
+        token = self._context.attach(self._trace.set_span_in_context(span))
+        return span, token
+
+    def end_span(self, span, error=None, attributes=None):
+        span, token = span
+        try:
+            if attributes:
+                span.set_attributes(attributes)
+            if error is not None:
+                span.record_exception(error)
+                span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, type(error).__name__))
+            span.end()
+        finally:
+            self._context.detach(token)
+
+
+class RecordedSpan(object):
+    """
+    A span kept by :class:`SpanRecorder`
+    """
+    __slots__ = ("name", "kind", "attributes", "parent", "start", "end", "error", "thread")
+
+    def __init__(self, name, kind, attributes, parent):
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration(self):
+        return None if self.end is None else self.end - self.start
+
+    def __repr__(self):
+        return "RecordedSpan({!r}, parent={!r})".format(
+            self.name, None if self.parent is None else self.parent.name)
+
+
+class SpanRecorder(Tracer):
+    """
+    Keep the spans in memory, for tests and for looking at a few calls
+
+    >>> recorder = SpanRecorder()
+    >>> with recorder.span("outer"):
+    ...     with recorder.span("inner", CLIENT):
+    ...         pass
+    >>> recorder.spans
+    [RecordedSpan('inner', parent='outer'), RecordedSpan('outer', parent=None)]
+    """
+    def __init__(self):
+        super(SpanRecorder, self).__init__()
+        self._current = contextvars.ContextVar("voipms_span", default=None)
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def start_span(self, name, kind=INTERNAL, attributes=None):
+        span = RecordedSpan(name, kind, attributes, self._current.get())
+        return span, self._current.set(span)
+
+    def end_span(self, span, error=None, attributes=None):
+        span, token = span
+        span.end = time.perf_counter()
+        span.error = error
+        if attributes:
+            span.attributes.update(attributes)
+        self._current.reset(token)
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+        with self._lock:
+            del self.spans[:]
+
+
+class TracingHooks(Hooks):
+    """
+    Hooks putting a span around every HTTP request of a client
+
+    Added by the client when it has a tracer.
+
+    :param tracer: The tracer of the client
+    :type tracer: :class:`Tracer`
+    :param api_url: The API url, only its host is recorded
+    :type api_url: :py:class:`str`
+    """
+    def __init__(self, tracer, api_url):
+        super(TracingHooks, self).__init__()
+        self.tracer = tracer
+        self.server = urlsplit(api_url).hostname
+
+    def before_request(self, event):
+        event.span = self.tracer.start_span(event.method, CLIENT, {
+            "voipms.method": event.method,
+            "http.request.method": event.http_method,
+            "server.address": self.server,
+            "voipms.parameter_size": event.parameter_size,
+        })
+
+    def _attributes(self, event):
+        attributes = {}
+        if event.http_status is not None:
+            attributes["http.response.status_code"] = event.http_status
+        if event.status is not None:
+            attributes["voipms.status"] = event.status
+        if event.response_size is not None:
+            attributes["voipms.response_size"] = event.response_size
+        return attributes
+
+    def after_response(self, event):
+        self.tracer.end_span(event.span, attributes=self._attributes(event))
+
+    def on_error(self, event):
+        self.tracer.end_span(event.span, event.error, self._attributes(event))
+
+
+def _parameter_names(args, kwargs, signature):
+    """
+    Names of the parameters passed to an entity method, credentials excluded
+    """
+    try:
+        names = list(signature.bind_partial(None, *args, **kwargs).arguments)[1:]
+    except TypeError:
+        names = list(kwargs)
+    return ",".join(sorted(name for name in names if name not in _CREDENTIALS))
+
+
+async def _traced_coroutine(tracer, name, attributes, coroutine):
+    span = tracer.start_span(name, INTERNAL, attributes)
+    try:
+        result = await coroutine
+    except BaseException as e:
+        tracer.end_span(span, e)
+        raise
+    tracer.end_span(span)
+    return result
+
+
+def _traced_method(entity, name, function):
+    span_name = "{}.{}".format(entity, name)
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def traced(self, *args, **kwargs):
+        client = self._voipms_client
+        attributes = {
+            "voipms.entity": entity,
+            "voipms.function": name,
+            "voipms.parameters": _parameter_names(args, kwargs, signature),
+        }
+        if asyncio.iscoroutinefunction(client._get):
+            result = function(self, *args, **kwargs)
+            if inspect.iscoroutine(result):
+                return _traced_coroutine(client.tracer, span_name, attributes, result)
+            return result
+        with client.tracer.span(span_name, INTERNAL, attributes):
+            return function(self, *args, **kwargs)
+    return traced
+
+
+_traced_classes = {}
+
+
+def traced_class(cls):
+    """
+    Subclass of an entity with a span around every public method
+
+    :param cls: The entity class (Example: DidsSet)
+    :type cls: :py:class:`type`
+    :returns: :py:class:`type`, the same subclass for every call
+    """
+    traced = _traced_classes.get(cls)
+    if traced is not None:
+        return traced
+    from .baseapi import BaseApi
+    methods = {}
+    for klass in cls.__mro__:
+        if klass in (BaseApi, object):
+            continue
+        for name, value in vars(klass).items():
+            if name.startswith("_") or name in methods or not inspect.isfunction(value):
+                continue
+            methods[name] = _traced_method(cls.__name__, name, value)
+    methods["__module__"] = cls.__module__
+    methods["__doc__"] = cls.__doc__
+    traced = type(cls.__name__, (cls,), methods)
+    return _traced_classes.setdefault(cls, traced)
@@ -0,0 +1,217 @@
+"""
+Files sent base64 encoded without holding them in memory
+
+voip.ms takes files, like the documents of sendFaxMessage, as base64
+encoded parameters. A Base64File reads its file in chunks while the request
+is sent, so only a chunk of the file and its encoding are in memory at any
+time instead of the file, its base64 string and the encoded request.
+
+    client.fax.send.fax_message(5552341234, "Front desk", 5559876543,
+                                Base64File("contract.tif"))
+
+Requests with a Base64File, or with a parameter longer than the
+upload_threshold of the client, are sent as a multipart/form-data POST with
+a Content-Length, the length of the base64 encoding is known from the size
+of the file.
+"""
+import base64
+import io
+import mimetypes
+import os
+import uuid
+
+# Bytes of the file read at once, a multiple of 3 so every chunk encodes
+# to base64 without padding
+DEFAULT_CHUNK_SIZE = 3 * 16 * 1024
+
+
+class Base64File(object):
+    """
+    A file sent base64 encoded, read in chunks while the request is sent
+
+    The file is read again for every request sending it, a file object is
+    read from its position when the Base64File was created.
+
+    :param source: Path of the file, or a binary file object which can seek
+    :type source: :py:class:`str` or :py:class:`io.BufferedIOBase`
+    :param chunk_size: Bytes of the file read at once, rounded down to a multiple of 3 (Default: DEFAULT_CHUNK_SIZE)
+    :type chunk_size: :py:class:`int`
+    :param prefix: Sent before the encoding, like a data URL header (Example: 'data:image/png;base64,')
+    :type prefix: :py:class:`str`
+
+    >>> upload = Base64File(io.BytesIO(b"%PDF-1.4 fax"), chunk_size=4)
+    >>> upload.size, upload.encoded_size
+    (12, 16)
+    >>> b"".join(upload.chunks())
+    b'JVBERi0xLjQgZmF4'
+    """
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE, prefix=""):
+        super(Base64File, self).__init__()
+        if not isinstance(chunk_size, int) or chunk_size < 3:
+            raise ValueError("Chunk size needs to be an int of at least 3 bytes")
+        self.chunk_size = chunk_size - chunk_size % 3
+        self.prefix = prefix.encode("ascii")
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+            self.name = os.path.basename(self.path)
+            self._file = None
+            self.size = os.path.getsize(self.path)
+        elif hasattr(source, "read"):
+            if not (hasattr(source, "seekable") and source.seekable()):
+                raise ValueError("The file object needs to be seekable, or pass the path of the file")
+            self.path = None
+            self.name = os.path.basename(str(getattr(source, "name", "") or "file"))
+            self._file = source
+            self._start = source.tell()
+            self.size = source.seek(0, io.SEEK_END) - self._start
+            source.seek(self._start)
+        else:
+            raise ValueError("The file needs to be a path or a binary file object")
+
+    @property
+    def encoded_size(self):
+        """
+        Length of the base64 encoding of the file
+        """
+        return len(self.prefix) + (self.size + 2) // 3 * 4
+
+    def chunks(self):
+        """
+        The base64 encoding of the file in chunks
+
+        :returns: Generator of :py:class:`bytes`
+        """
+        if self.prefix:
+            yield self.prefix
+        if self._file is None:
+            with open(self.path, "rb") as source:
+                for chunk in self._encode(source):
+                    yield chunk
+        else:
+            self._file.seek(self._start)
+            for chunk in self._encode(self._file):
+                yield chunk
+
+    def _encode(self, source):
+        remaining = self.size
+        while remaining > 0:
+            data = source.read(min(self.chunk_size, remaining))
+            if not data:
+                raise ValueError("{} is shorter than when it was opened".format(self.name))
+            remaining -= len(data)
+            # A short read is not a multiple of 3, keep reading to avoid padding inside the encoding
+            while len(data) % 3 and remaining > 0:
+                more = source.read(min(3 - len(data) % 3, remaining))
+                if not more:
+                    raise ValueError("{} is shorter than when it was opened".format(self.name))
+                remaining -= len(more)
+                data += more
+            yield base64.b64encode(data)
+
+    def __repr__(self):
+        # Part of the cassette keys, so it does not depend on the object
+        return "Base64File({!r}, {} bytes)".format(self.name, self.size)
+
+
+def as_upload(value, data_url=False):
+    """
+    A Base64File for a path, a binary file object or bytes
+
+    Other values, like a str already encoded in base64, are returned as
+    they are.
+
+    :param value: The parameter of the API method
+    :param data_url: Prefix the encoding with a data URL header of the type of the file (Default: False)
+    :type data_url: :py:class:`bool`
+    :returns: :class:`Base64File` or value
+
+    >>> as_upload(b"GIF89a", data_url=True).prefix
+    b'data:application/octet-stream;base64,'
+    >>> as_upload("R0lGODlh")
+    'R0lGODlh'
+    """
+    if isinstance(value, (bytes, bytearray)):
+        value = io.BytesIO(value)
+    elif not (isinstance(value, os.PathLike) or hasattr(value, "read")):
+        return value
+    upload = Base64File(value)
+    if data_url:
+        content_type = mimetypes.guess_type(upload.name)[0] or "application/octet-stream"
+        upload.prefix = "data:{};base64,".format(content_type).encode("ascii")
+    return upload
+
+
+class MultipartBody(object):
+    """
+    A multipart/form-data request body sent in chunks
+
+    Has a length, so it is sent with a Content-Length and not chunked.
+
+    :param fields: Names and values of the form fields, values are str or :class:`Base64File`
+    :type fields: :py:class:`dict`
+    :param boundary: Boundary of the parts (Default: a random one)
+    :type boundary: :py:class:`str`
+
+    >>> body = MultipartBody({"method": "sendFaxMessage"}, boundary="b")
+    >>> b"".join(body)
+    b'--b\\r\\nContent-Disposition: form-data; name="method"\\r\\n\\r\\nsendFaxMessage\\r\\n--b--\\r\\n'
+    >>> len(body) == len(b"".join(body))
+    True
+    """
+    def __init__(self, fields, boundary=None):
+        super(MultipartBody, self).__init__()
+        self.boundary = boundary or uuid.uuid4().hex
+        self.fields = fields
+        self._parts = []
+        for name, value in fields.items():
+            header = '--{}\r\nContent-Disposition: form-data; name="{}"\r\n\r\n'.format(
+                self.boundary, name.replace('"', '%22')).encode("utf-8")
+            if not isinstance(value, Base64File):
+                value = str(value).encode("utf-8")
+            self._parts.append((name, header, value))
+        self._end = "--{}--\r\n".format(self.boundary).encode("utf-8")
+
+    @property
+    def content_type(self):
+        return "multipart/form-data; boundary={}".format(self.boundary)
+
+    @property
+    def headers(self):
+        """
+        The Content-Type and Content-Length headers of the body
+        """
+        return {"Content-Type": self.content_type, "Content-Length": str(len(self))}
+
+    @staticmethod
+    def _length(header, value):
+        size = value.encoded_size if isinstance(value, Base64File) else len(value)
+        return len(header) + size + 2
+
+    def size(self, exclude=()):
+        """
+        Bytes of the body without the parts of some fields
+
+        :param exclude: Names of the fields not counted (Example: ('api_password',))
+        :type exclude: :py:class:`tuple`
+        :returns: :py:class:`int`
+        """
+        return sum(self._length(header, value) for name, header, value in self._parts
+                   if name not in exclude) + len(self._end)
+
+    def __len__(self):
+        return self.size()
+
+    def __iter__(self):
+        for name, header, value in self._parts:
+            if isinstance(value, Base64File):
+                yield header
+                for chunk in value.chunks():
+                    yield chunk
+                yield b"\r\n"
+            else:
+                yield header + value + b"\r\n"
+        yield self._end
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
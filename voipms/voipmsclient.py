@@ -1,4 +1,10 @@
+import contextlib
+import os
+import threading
+import time
+
 import requests, json
+from requests.adapters import HTTPAdapter
 
 # Handle library reorganisation Python 2 > Python 3.
 try:
@@ -6,27 +12,172 @@ try:
 except ImportError:
     from urllib import urlencode
 
-from .helpers import ERROR_CODES
+from .helpers import ERROR_CODES, VoipMsError
+from .cache import MISSING, make_key
+from .decoders import get_decoder
+from .download import CHUNK_SIZE as DOWNLOAD_CHUNK_SIZE, Base64Extractor, decode_document, open_target
+from .hooks import RequestEvent
+from .upload import Base64File, MultipartBody
+from .retry import Retrier, RetryPolicy, is_safe_method
+from .streaming import CountingReader, iter_items
+
+API_URL = 'https://voip.ms/api/v1/rest.php'
+# Parameters longer than this are sent in a POST body instead of the URL
+UPLOAD_THRESHOLD = 2048
 
 
 class VoipMsClient(object):
     """
     Voip.ms class to communicate with the v1 REST API
     """
-    def __init__(self, voip_user, voip_api_password):
+    def __init__(self, voip_user, voip_api_password, pool_connections=10,
+                 pool_maxsize=10, pool_block=False, keep_alive=None,
+                 timeout=None, session=None, rate_limiter=None, retry=None,
+                 cache=None, single_flight=None, max_concurrency=None,
+                 json_decoder=None, api_url=None, cassette=None, hooks=None,
+                 tracer=None, upload_threshold=UPLOAD_THRESHOLD):
         """
         Initialize the class with you voip_user and voip_api_password.
 
+        All entities share the HTTP session of this client, so connections
+        to voip.ms are pooled and kept alive between API calls.
+
         :param voip_user: voip.ms user id (email)
         :type voip_user: :py:class:`str`
         :param voip_api_password: voip.ms API Password
         :type voip_api_password: :py:class:`str`
+        :param pool_connections: Number of host pools to cache (Default: 10)
+        :type pool_connections: :py:class:`int`
+        :param pool_maxsize: Maximum number of connections kept per host (Default: 10)
+        :type pool_maxsize: :py:class:`int`
+        :param pool_block: Block when no free connection is available instead of opening a new one (Default: False)
+        :type pool_block: :py:class:`bool`
+        :param keep_alive: Seconds an idle pooled connection is kept before it is dropped (Default: None, no limit)
+        :type keep_alive: :py:class:`float`
+        :param timeout: Timeout in seconds for every HTTP request, or a (connect, read) tuple (Default: None)
+        :type timeout: :py:class:`float`
+        :param session: An existing session to use instead of creating one. It is not closed by :meth:`close`.
+        :type session: :py:class:`requests.Session`
+        :param rate_limiter: Client side limit for the number of API calls (Default: None)
+        :type rate_limiter: :py:class:`voipms.ratelimit.RateLimiter`
+        :param retry: Retry failed API calls, only get* methods are retried by default (Default: None)
+        :type retry: :py:class:`voipms.retry.Retrier` or :py:class:`voipms.retry.RetryPolicy`
+        :param cache: Cache for the responses of GET requests (Default: None)
+        :type cache: :py:class:`voipms.cache.ResponseCache`
+        :param single_flight: Share identical get* calls in flight between threads or tasks (Default: None)
+        :type single_flight: :py:class:`voipms.singleflight.SingleFlight`
+        :param max_concurrency: Maximum number of API calls in flight at the same time, or a semaphore shared with other clients (Default: None, no limit)
+        :type max_concurrency: :py:class:`int` or :py:class:`threading.BoundedSemaphore`
+        :param json_decoder: Decoder for the response bodies, 'orjson', 'ujson', 'json' or a function taking bytes (Default: None, the fastest installed one)
+        :type json_decoder: :py:class:`str` or :py:class:`callable`
+        :param api_url: URL of rest.php, for example of a local :class:`voipms.mockserver.MockServer` (Default: $VOIPMS_API_URL or the voip.ms API)
+        :type api_url: :py:class:`str`
+        :param cassette: Record every API call to this cassette, or serve them from it without network (Default: None)
+        :type cassette: :py:class:`voipms.cassette.Cassette`
+        :param hooks: Called around every HTTP request, for example a :class:`voipms.metrics.MetricsCollector` (Default: None)
+        :type hooks: :py:class:`voipms.hooks.Hooks` or a :py:class:`list` of them
+        :param tracer: Put a span around every entity method and HTTP request, for example a :class:`voipms.tracing.OpenTelemetryTracer` (Default: None)
+        :type tracer: :py:class:`voipms.tracing.Tracer`
+        :param upload_threshold: Calls with a parameter longer than this many characters, or with a file, are sent as a multipart POST instead of in the URL (Default: UPLOAD_THRESHOLD, None only sends files that way)
+        :type upload_threshold: :py:class:`int`
         """
         super(VoipMsClient, self).__init__()
-        self.base_url = 'https://voip.ms/api/v1/rest.php?api_username={}&api_password={}&'.format(voip_user, voip_api_password)
-        self.post_url = 'https://voip.ms/api/v1/rest.php'
+        if api_url is None:
+            api_url = os.environ.get('VOIPMS_API_URL') or API_URL
+        self.api_url = api_url
+        self.base_url = '{}?api_username={}&api_password={}&'.format(api_url, voip_user, voip_api_password)
+        self.post_url = api_url
         self.voip_user = voip_user
         self.voip_api_password = voip_api_password
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+        self._session_lock = threading.Lock()
+        self._last_request = None
+        self.rate_limiter = rate_limiter
+        if isinstance(retry, RetryPolicy):
+            retry = Retrier(retry)
+        self.retry = retry
+        self.cache = cache
+        self.single_flight = single_flight
+        self.json_decoder = json_decoder if callable(json_decoder) else get_decoder(json_decoder)
+        self.cassette = cassette
+        if hooks is None:
+            hooks = ()
+        elif not isinstance(hooks, (list, tuple)):
+            hooks = (hooks,)
+        self.hooks = tuple(hooks)
+        self.upload_threshold = upload_threshold
+        self.tracer = tracer
+        if tracer is not None:
+            from .tracing import TracingHooks
+            self.hooks = (TracingHooks(tracer, api_url),) + self.hooks
+        if max_concurrency is None:
+            self._concurrency = contextlib.nullcontext()
+        elif isinstance(max_concurrency, int):
+            if max_concurrency < 1:
+                raise ValueError("Maximum number of API calls in flight needs to be a positive int")
+            self._concurrency = threading.BoundedSemaphore(max_concurrency)
+        else:
+            self._concurrency = max_concurrency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def session(self):
+        """
+        The pooled HTTP session shared by all entities, created on first use
+
+        :returns: :py:class:`requests.Session`
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                          pool_maxsize=self.pool_maxsize,
+                                          pool_block=self.pool_block)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def close(self):
+        """
+        Close all pooled connections
+
+        The client can still be used afterwards, a new session is created on
+        the next request.
+        """
+        with self._session_lock:
+            session = self._session
+            if session is not None and self._owns_session:
+                self._session = None
+                session.close()
+
+    def _expire_idle_connections(self):
+        """
+        Drop pooled connections which have been idle longer than keep_alive
+
+        Only the session created by the client is touched, a session passed
+        in may be in use elsewhere.
+        """
+        now = time.monotonic()
+        last_request = self._last_request
+        self._last_request = now
+        if self.keep_alive is None or last_request is None or not self._owns_session:
+            return
+        if now - last_request > self.keep_alive and self._session is not None:
+            for adapter in self._session.adapters.values():
+                adapter.close()
 
     def _error_code(self, status):
         """
@@ -37,9 +188,345 @@ class VoipMsClient(object):
         :returns: True
         """
         if status in ERROR_CODES:
-            raise TypeError(ERROR_CODES[status])
+            raise VoipMsError(status)
         return None
 
+    def _check_status(self, r_json):
+        """
+        Raise the matching error if the API did not answer with success
+
+        :param r_json: The decoded JSON output from the API
+        :type r_json: :py:class:`dict`
+        :returns: The JSON output from the API
+        """
+        status = r_json["status"]
+        if status != "success":
+            self._error_code(status)
+        return r_json
+
+    def _handle_response(self, r, event=None):
+        """
+        Verify the HTTP response and decode its JSON body
+
+        :param r: The HTTP response
+        :type r: :py:class:`requests.Response`
+        :param event: The request to fill in for the hooks (Default: None)
+        :type event: :py:class:`voipms.hooks.RequestEvent`
+        :returns: The JSON output from the API
+        """
+        r.raise_for_status()
+        if r.status_code == 204:
+            return None
+        if event is None:
+            return self._check_status(self.json_decoder(r.content))
+        return self._check_status(self._decode(r.content, event))
+
+    def _decode(self, content, event):
+        """
+        Decode a response body, timing it for the hooks
+        """
+        started = time.perf_counter()
+        r_json = self.json_decoder(content)
+        event.decode_time = time.perf_counter() - started
+        event.response_size = len(content)
+        if isinstance(r_json, dict):
+            event.status = r_json.get("status")
+        return r_json
+
+    def _request_started(self, method, http_method, url, data=None):
+        """
+        Create the event of a request and call the before_request hooks
+
+        :returns: :py:class:`voipms.hooks.RequestEvent`, None without hooks
+        """
+        if not self.hooks:
+            return None
+        if http_method == 'GET':
+            parameter_size = len(url) - len(self.base_url)
+        elif isinstance(data, MultipartBody):
+            parameter_size = data.size(exclude=('api_username', 'api_password'))
+        else:
+            parameter_size = len(urlencode([(key, value) for key, value in (data or {}).items()
+                                            if key not in ('api_username', 'api_password')]))
+        event = RequestEvent(method, http_method, parameter_size)
+        for hook in self.hooks:
+            hook.before_request(event)
+        return event
+
+    def _request_finished(self, event, error=None):
+        """
+        Call the after_response or on_error hooks
+        """
+        if event is None:
+            return
+        if error is None:
+            for hook in self.hooks:
+                hook.after_response(event)
+            return
+        event.error = error
+        if isinstance(error, VoipMsError):
+            event.status = error.status
+        elif event.http_latency is None:
+            event.http_latency = time.perf_counter() - event.started
+        for hook in self.hooks:
+            hook.on_error(event)
+
+    def _stream_status(self, event):
+        """
+        The check_status of a streamed response, keeping the status for the hooks
+        """
+        def check_status(status):
+            if event is not None:
+                event.status = status
+            self._error_code(status)
+        return check_status
+
+    def _stream_finished(self, event, response_size, error=None):
+        """
+        Call the hooks of a streamed request once its body is read or failed
+        """
+        if event is not None:
+            event.http_latency = time.perf_counter() - event.started
+            event.response_size = response_size
+        self._request_finished(event, error)
+
+    def _replay(self, method, parameters):
+        """
+        Serve an API call from the cassette
+
+        :returns: The JSON output recorded for the call
+        """
+        r_json = self.json_decoder(self.cassette.play(
+            method, parameters, (self.voip_user, self.voip_api_password)))
+        if r_json is None:
+            return None
+        return self._check_status(r_json)
+
+    def _record(self, method, parameters, r_json, http_method='GET'):
+        """
+        Write an API call to the cassette if one is recording
+        """
+        if self.cassette is not None:
+            self.cassette.record(method, parameters, r_json, http_method,
+                                 (self.voip_user, self.voip_api_password))
+
+    def _build_url(self, method, parameters=None):
+        """
+        Build the authenticated GET url for an API method
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The query string parameters
+        :type parameters: :py:class:`dict`
+        :returns: :py:class:`str`
+        """
+        query_set = {
+            "method": method
+        }
+        if parameters:
+            query_set.update(parameters)
+        return self.base_url + urlencode(query_set, safe='@:').replace('%2F', '/').replace('%3A', ':').replace('%0D%0A', '+').replace('%0A', '+').replace('%21', '+')
+
+    def _build_post_data(self, method, parameters=None):
+        """
+        Build the authenticated POST body for an API method
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The POST parameters
+        :type parameters: :py:class:`dict`
+        :returns: :py:class:`dict`
+        """
+        data = dict(parameters or {})
+        data.update({
+            'api_username' : self.voip_user,
+            'api_password' : self.voip_api_password,
+            "method" : method
+        })
+        if self._is_upload(data):
+            return MultipartBody(data)
+        return data
+
+    def _is_upload(self, parameters):
+        """
+        Whether parameters have a file or a value too long for a URL
+
+        :param parameters: The parameters of the call
+        :type parameters: :py:class:`dict`
+        :returns: :py:class:`bool`
+        """
+        threshold = self.upload_threshold
+        for value in parameters.values():
+            if isinstance(value, Base64File):
+                return True
+            if threshold is not None and isinstance(value, str) and len(value) > threshold:
+                return True
+        return False
+
+    def _post_arguments(self, data):
+        """
+        The arguments of the HTTP request sending a POST body
+
+        :param data: The body from :meth:`_build_post_data`
+        :type data: :py:class:`dict` or :py:class:`voipms.upload.MultipartBody`
+        :returns: :py:class:`dict`
+        """
+        if isinstance(data, MultipartBody):
+            return {'data': data, 'headers': data.headers}
+        return {'data': data}
+
+    def _send(self, method, http_method, url, **kwargs):
+        """
+        Send a single HTTP request for an API method
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param http_method: 'GET' or 'POST'
+        :type http_method: :py:class:`str`
+        :param url: The url of the request
+        :type url: :py:class:`str`
+        :param **kwargs: Additional arguments for :meth:`requests.Session.request`
+        :type **kwargs: :py:class:`dict`
+        :returns: The JSON output from the API
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method)
+        with self._concurrency:
+            self._expire_idle_connections()
+            event = self._request_started(method, http_method, url, kwargs.get('data'))
+            try:
+                r = self.session.request(http_method, url, timeout=self.timeout, **kwargs)
+                if event is not None:
+                    event.http_latency = time.perf_counter() - event.started
+                    event.http_status = r.status_code
+                r_json = self._handle_response(r, event)
+            except Exception as e:
+                self._request_finished(event, e)
+                raise
+            self._request_finished(event)
+            return r_json
+
+    def _request(self, method, http_method, url, **kwargs):
+        """
+        Send an API call, retrying it as configured
+
+        Takes the same arguments as :meth:`_send`.
+
+        :returns: The JSON output from the API
+        """
+        if self.retry is not None:
+            return self.retry.call(method, self._send, method, http_method, url, **kwargs)
+        return self._send(method, http_method, url, **kwargs)
+
+    def _open_stream(self, method, http_method, url, **kwargs):
+        """
+        Send a single HTTP request without reading the response body
+
+        Takes the same arguments as :meth:`_send`. The caller reads the body
+        and ends the event with :meth:`_stream_finished`.
+
+        :returns: :py:class:`tuple` of the :py:class:`requests.Response` with an unread body and the event of the request
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method)
+        with self._concurrency:
+            self._expire_idle_connections()
+            event = self._request_started(method, http_method, url, kwargs.get('data'))
+            try:
+                r = self.session.request(http_method, url, timeout=self.timeout, stream=True, **kwargs)
+            except Exception as e:
+                self._request_finished(event, e)
+                raise
+        if event is not None:
+            event.http_status = r.status_code
+        try:
+            r.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            r.close()
+            self._stream_finished(event, 0, e)
+            raise
+        return r, event
+
+    def _iter_get(self, method, parameters, key):
+        """
+        Handle authenticated GET requests returning a long list
+
+        Yields the items of the list one by one while the response is still
+        being read, so the whole response is never held in memory.
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The query string parameters
+        :type parameters: :py:class:`dict`
+        :param key: Key of the list in the JSON output (Example: 'cdr')
+        :type key: :py:class:`str`
+        :returns: Generator of the items of the list
+        """
+        if self.cassette is not None:
+            for item in (self._get(method, parameters) or {}).get(key, []):
+                yield item
+            return
+
+        url = self._build_url(method, parameters)
+        if self.retry is not None:
+            r, event = self.retry.call(method, self._open_stream, method, 'GET', url)
+        else:
+            r, event = self._open_stream(method, 'GET', url)
+        reader = CountingReader(r.raw)
+        error = None
+        try:
+            if r.status_code != 204:
+                r.raw.decode_content = True
+                for item in iter_items(reader, key, self._stream_status(event)):
+                    yield item
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            r.close()
+            self._stream_finished(event, reader.size, error)
+
+    def _download(self, method, parameters, keys, target):
+        """
+        Handle authenticated GET requests returning a base64 encoded file
+
+        The response is read in chunks and the file is decoded into target
+        while it arrives, neither the response nor the file is held in memory.
+
+        :param method: The method call for the API
+        :type method: :py:class:`str`
+        :param parameters: The query string parameters
+        :type parameters: :py:class:`dict`
+        :param keys: Keys of the file in the JSON output (Example: ('message_base64',))
+        :type keys: :py:class:`tuple`
+        :param target: Path of the file, replaced once it is complete, or a binary file object
+        :type target: :py:class:`str` or :py:class:`io.BufferedIOBase`
+        :returns: :py:class:`int` bytes written
+        """
+        with open_target(target) as output:
+            if self.cassette is not None:
+                return decode_document(self._get(method, parameters), keys, output.write)
+
+            url = self._build_url(method, parameters)
+            if self.retry is not None:
+                r, event = self.retry.call(method, self._open_stream, method, 'GET', url)
+            else:
+                r, event = self._open_stream(method, 'GET', url)
+            size = 0
+            error = None
+            try:
+                extractor = Base64Extractor(keys, output.write, self._stream_status(event))
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    extractor.feed(chunk)
+                return extractor.close()
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                r.close()
+                self._stream_finished(event, size, error)
+
     def _get(self, method, parameters=None):
         """
         Handle authenticated GET requests
@@ -56,26 +543,32 @@ class VoipMsClient(object):
         if isinstance(method, tuple):
             method, parameters = method
 
-        query_set = {
-            "method": method
-        }
-        if parameters:
-            query_set.update(parameters)
-        url = self.base_url + urlencode(query_set, safe='@:').replace('%2F', '/').replace('%3A', ':').replace('%0D%0A', '+').replace('%0A', '+').replace('%21', '+')
+        # Files and long values go in the body, the URL would copy them several times
+        if parameters and not is_safe_method(method) and self._is_upload(parameters):
+            return self._post(method, parameters)
 
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, parameters)
+
+        if self.cache is not None:
+            r_json = self.cache.get(method, parameters)
+            if r_json is not MISSING:
+                return r_json
+
+        url = self._build_url(method, parameters)
         try:
-            r = requests.get(url)
-        except requests.exceptions.RequestException as e:
-            raise e
-        else:
-            r.raise_for_status()
-            if r.status_code == 204:
-                return None
-            r_json = r.json()
-            status = r_json["status"]
-            if status != "success":
-                self._error_code(status)
-            return r_json
+            if self.single_flight is not None and is_safe_method(method):
+                r_json = self.single_flight.do(make_key(method, parameters),
+                                               self._request, method, 'GET', url)
+            else:
+                r_json = self._request(method, 'GET', url)
+        except VoipMsError as e:
+            self._record(method, parameters, {"status": e.status})
+            raise
+        self._record(method, parameters, r_json)
+        if self.cache is not None:
+            self.cache.set(method, parameters, r_json)
+        return r_json
 
     def _post(self, method, parameters=None):
         """
@@ -87,24 +580,14 @@ class VoipMsClient(object):
         :type parameters: :py:class:`str`
         :returns: The JSON output from the API
         """
-        url = self.post_url
-        headers = {
-            'api_username' : self.voip_user,
-            'api_password' : self.voip_api_password,
-            "method" : method
-        }
-        parameters.update(headers)
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, parameters)
 
+        data = self._build_post_data(method, parameters)
         try:
-            r = requests.post(url, data=parameters)
-        except requests.exceptions.RequestException as e:
-            raise e
-        else:
-            r.raise_for_status()
-            if r.status_code == 204:
-                return None
-            r_json = r.json()
-            status = r_json["status"]
-            if status != "success":
-                self._error_code(status)
-            return r_json
+            r_json = self._request(method, 'POST', self.post_url, **self._post_arguments(data))
+        except VoipMsError as e:
+            self._record(method, parameters, {"status": e.status}, 'POST')
+            raise
+        self._record(method, parameters, r_json, 'POST')
+        return r_json